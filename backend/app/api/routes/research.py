@@ -1,19 +1,83 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
 
-from ...schemas.research import ResearchRequest
-from ...services.research_runner import ResearchRunner
+from fastapi import APIRouter, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from ...schemas.research import (
+    ResearchBatchRequest,
+    ResearchBatchResponse,
+    ResearchBatchRun,
+    ResearchBulkStatusRequest,
+    ResearchBulkStatusResponse,
+    ResearchRequest,
+)
+from ...services.payload_stream import (
+    compress_chunks,
+    iter_ndjson,
+    iter_payload_records,
+    negotiate_encoding,
+    parse_fields,
+)
+from ...services.research_runner import BaselineUnavailable, ResearchRunner
+from ...services.run_events import format_sse
+from ...services.run_queue import RunQueueFull
 
 
 router = APIRouter()
 runner = ResearchRunner()
 
+# Idle seconds before an event stream sends a keep-alive.
+EVENT_HEARTBEAT_SECONDS = 15.0
+
+
+def _admission_error(exc: Exception) -> HTTPException:
+    if isinstance(exc, BaselineUnavailable):
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Research queue is full, retry later",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 
 @router.post("/run", status_code=status.HTTP_202_ACCEPTED)
 def start_research(request: ResearchRequest) -> dict:
-    run_id = runner.start_run(request)
+    try:
+        run_id = runner.start_run(request)
+    except (BaselineUnavailable, RunQueueFull) as exc:
+        raise _admission_error(exc)
     return {"run_id": run_id, "status": "queued"}
 
 
+@router.post("/runs:batch", status_code=status.HTTP_202_ACCEPTED, response_model=ResearchBatchResponse)
+def start_research_batch(batch: ResearchBatchRequest) -> ResearchBatchResponse:
+    try:
+        run_ids = runner.start_runs(batch.requests)
+    except (BaselineUnavailable, RunQueueFull) as exc:
+        raise _admission_error(exc)
+    seen = set()
+    runs = []
+    for run_id in run_ids:
+        runs.append(ResearchBatchRun(run_id=run_id, deduplicated=run_id in seen))
+        seen.add(run_id)
+    return ResearchBatchResponse(runs=runs, unique_runs=len(seen))
+
+
+@router.post("/status:bulk", response_model=ResearchBulkStatusResponse)
+def get_research_statuses(query: ResearchBulkStatusRequest) -> ResearchBulkStatusResponse:
+    run_ids = list(dict.fromkeys(query.run_ids))
+    statuses = runner.get_statuses(run_ids)
+    return ResearchBulkStatusResponse(
+        statuses=[statuses[run_id] for run_id in run_ids if run_id in statuses],
+        missing=[run_id for run_id in run_ids if run_id not in statuses],
+    )
+
+
+@router.get("/cache")
+def get_cache_stats() -> dict:
+    return runner.cache_stats()
+
+
 @router.get("/{run_id}/status")
 def get_research_status(run_id: str):
     status_payload = runner.get_status(run_id)
@@ -22,6 +86,60 @@ def get_research_status(run_id: str):
     return status_payload
 
 
+@router.delete("/{run_id}", status_code=status.HTTP_202_ACCEPTED)
+def cancel_research(run_id: str):
+    current = runner.get_status(run_id)
+    if not current:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if current.status in ("completed", "failed"):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Run already {current.status}")
+    # Running runs stop at their next checkpoint; the returned status may still say "running".
+    return runner.cancel(run_id)
+
+
+@router.get("/{run_id}/partial")
+def get_research_partial(run_id: str):
+    partial = runner.get_partial(run_id)
+    if not partial:
+        raise HTTPException(status_code=404, detail="Partial results not available")
+    return partial
+
+
+@router.get("/{run_id}/events")
+async def stream_research_events(run_id: str, request: Request):
+    if runner.get_status(run_id) is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    async def body():
+        async for event in runner.watch(run_id, heartbeat=EVENT_HEARTBEAT_SECONDS):
+            if event is None:
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{run_id}/ws")
+async def research_events_socket(websocket: WebSocket, run_id: str):
+    if runner.get_status(run_id) is None:
+        await websocket.close(code=1008, reason="Run not found")
+        return
+    await websocket.accept()
+    try:
+        async for event in runner.watch(run_id, heartbeat=EVENT_HEARTBEAT_SECONDS):
+            await websocket.send_json(event if event is not None else {"type": "heartbeat"})
+    except WebSocketDisconnect:
+        return
+    await websocket.close()
+
+
 @router.get("/{run_id}/summary")
 def get_research_summary(run_id: str):
     summary = runner.get_summary(run_id)
@@ -36,3 +154,27 @@ def get_research_payload(run_id: str):
     if not payload:
         raise HTTPException(status_code=404, detail="Payload not available")
     return payload
+
+
+@router.get("/{run_id}/json/stream")
+def stream_research_payload(
+    run_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated item and cluster fields to include"),
+    offset: int = Query(0, ge=0, description="Index of the first item to send"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of items to send"),
+    accept_encoding: Optional[str] = Header(None),
+):
+    reader = runner.open_payload(run_id)
+    if reader is None:
+        raise HTTPException(status_code=404, detail="Payload not available")
+
+    encoding = negotiate_encoding(accept_encoding)
+    records = iter_payload_records(reader, parse_fields(fields), offset, limit)
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(
+        compress_chunks(iter_ndjson(records), encoding),
+        media_type="application/x-ndjson",
+        headers=headers,
+    )
@@ -1,11 +1,42 @@
 from pydantic import BaseSettings, Field
 from pathlib import Path
+from typing import Optional
 
 class Settings(BaseSettings):
     APP_NAME: str = Field("Kivo", description="Application name")
     DEBUG: bool = Field(False, description="Debug mode")
     DATA_PATH: str = Field("data", description="Local data directory")
     storage_path: str = Field("storage", description="Where to store research outputs")  # 👈 snake_case
+    RUN_EXECUTOR: str = Field("thread", description="Run pipelines in worker 'thread's or a 'process' pool")
+    RUN_WORKERS: int = Field(4, description="Maximum number of research runs executing at once")
+    RUN_QUEUE_SIZE: int = Field(64, description="Maximum number of queued runs before new ones are rejected")
+    RUN_DEADLINE_SECONDS: float = Field(0, description="Longest a run may execute before it returns a partial result (0 disables); requests can only ask for less")
+    RUN_MAX_ITEMS: int = Field(0, description="Most fetched items a run analyses before it returns a partial result (0 disables); requests can only ask for fewer")
+    RUN_WARM_UP: bool = Field(True, description="Load pipeline modules and models in the background at startup")
+    RUN_STORE: str = Field("sqlite", description="Run store backend: 'sqlite' or 'memory'")
+    RUN_STORE_PATH: Optional[str] = Field(None, description="SQLite run store file, defaults to <storage_path>/runs.db")
+    RUN_PAYLOAD_TTL_SECONDS: int = Field(86400, description="Evict completed run payloads older than this (0 disables)")
+    RUN_PAYLOAD_MAX_ENTRIES: int = Field(256, description="Keep at most this many payloads, least recently read evicted first (0 disables)")
+    RUN_STATUS_FLUSH_INTERVAL: float = Field(0.25, description="Seconds between batched status writes to the run store")
+    RUN_PAYLOAD_FORMAT: str = Field("columnar", description="Stored payload format: 'columnar' files or compressed 'json' rows")
+    RUN_STATE: str = Field("auto", description="Live run state shared by server processes: 'auto' (follows RUN_STORE), 'memory', 'sqlite' or 'redis'")
+    RUN_STATE_REDIS_URL: Optional[str] = Field(None, description="Redis URL used when RUN_STATE is 'redis'")
+    RUN_STATE_TTL_SECONDS: int = Field(3600, description="Drop shared state of runs not updated for this long (0 disables)")
+    RUN_STATE_POLL_INTERVAL: float = Field(0.25, description="Seconds between status polls when streaming events of a run executing in another process")
+    RESULT_CACHE_ENABLED: bool = Field(True, description="Serve identical research requests from cached results")
+    RESULT_CACHE_TTL_SECONDS: int = Field(900, description="How long a cached result may be served")
+    RESULT_CACHE_MAX_ENTRIES: int = Field(128, description="Cached results kept in memory")
+    RESULT_CACHE_MAX_DISK_ENTRIES: int = Field(1024, description="Cached results kept under <storage_path>/cache (0 disables the disk tier)")
+    COLLECTION_ENABLED: bool = Field(False, description="Fetch items from the requested sources (Reddit, X); off by default, when runs analyse no items")
+    COLLECTOR_TIMEOUT_SECONDS: float = Field(10.0, description="HTTP timeout for source API requests")
+    COLLECTOR_MAX_CONNECTIONS: int = Field(20, description="Pooled HTTP connections shared by all source collectors")
+    COLLECTOR_BURST: int = Field(5, description="Requests a source may burst before its rate limit applies")
+    REDDIT_BASE_URL: str = Field("https://www.reddit.com", description="Reddit API base URL")
+    REDDIT_USER_AGENT: str = Field("kivo-research/1.0", description="User-Agent sent to Reddit")
+    REDDIT_RATE_PER_SECOND: float = Field(1.0, description="Average Reddit requests per second (0 disables limiting)")
+    X_API_BASE_URL: str = Field("https://api.twitter.com", description="X API base URL")
+    X_BEARER_TOKEN: Optional[str] = Field(None, description="X API bearer token; the x source is skipped without it")
+    X_RATE_PER_SECOND: float = Field(0.5, description="Average X requests per second (0 disables limiting)")
 
     class Config:
         env_file = ".env"
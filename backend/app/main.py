@@ -1,11 +1,30 @@
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from .api.routes import research
+from .api.routes.metrics import router as metrics_router
 from .api.routes.research import router as research_router
+from .core.config import get_settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Creating the runner opened nothing; it is started here, and again after a previous
+    # lifespan shut it down, since the runner outlives the application.
+    research.runner.start()
+    # Warm up off the event loop so the worker accepts requests straight away.
+    if get_settings().RUN_WARM_UP:
+        threading.Thread(target=research.runner.warm_up, name="runner-warm-up", daemon=True).start()
+    yield
+    research.runner.shutdown()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Kivo Backend", version="0.1.0")
+    app = FastAPI(title="Kivo Backend", version="0.1.0", lifespan=lifespan)
     app.include_router(research_router, prefix="/research", tags=["research"])
+    app.include_router(metrics_router, tags=["metrics"])
     return app
 
 
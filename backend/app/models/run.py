@@ -8,7 +8,31 @@ class ResearchRun(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     run_id: str = Field(index=True, unique=True)
     topic: str
-    status: str = Field(default="queued")
+    status: str = Field(default="queued", index=True)
     request_payload: str
+    progress: float = Field(default=0.0)
+    stage: Optional[str] = None
+    message: Optional[str] = None
+    pipeline_mode: str = Field(default="lite")
+    summary_payload: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ResearchRunPayload(SQLModel, table=True):
+    """Payload of a completed run, kept apart from the small status rows.
+
+    ``json`` payloads live in ``payload`` as compressed JSON; ``columnar`` payloads
+    are files under the store's payload directory and ``payload`` is empty.
+    ``state`` holds the compressed incremental state later runs extend.
+    """
+
+    run_id: str = Field(primary_key=True)
+    format: str = Field(default="json")
+    payload: bytes
+    state: Optional[bytes] = None
+    size_bytes: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    accessed_at: datetime = Field(default_factory=datetime.utcnow, index=True)
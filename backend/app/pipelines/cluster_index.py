@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+from .records import Token
+
+
+class TokenClusterIndex:
+    """Token -> cluster inverted index for greedy first-match clustering.
+
+    ``find`` returns the lowest-numbered cluster whose token set has Jaccard
+    similarity >= ``threshold`` with the item, exactly like a linear scan. Any such
+    cluster must share at least ``ceil(threshold * len(item))`` tokens with the
+    item, so only the rarest ``len(item) - overlap + 1`` item tokens (ordered by
+    cluster document frequency) need their postings probed; very common tokens are
+    never expanded.
+
+    With ``max_candidates`` only the clusters sharing the most probed tokens
+    are scored, so the cost per item stays bounded as clusters accumulate; a
+    match outside them is missed and the item opens a new cluster.
+    """
+
+    def __init__(self, threshold: float, max_candidates: Optional[int] = None) -> None:
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self._postings: Dict[Token, List[int]] = {}
+        self._token_sets: List[Set[Token]] = []
+        self._empty_clusters: List[int] = []
+        # Candidate clusters scored by ``find``, for run metrics.
+        self.comparisons = 0
+
+    def __len__(self) -> int:
+        return len(self._token_sets)
+
+    def tokens(self, cluster_id: int) -> Set[Token]:
+        return self._token_sets[cluster_id]
+
+    def find(self, item_tokens: Set[Token]) -> Optional[int]:
+        if not self._token_sets:
+            return None
+        if self.threshold <= 0.0:
+            return 0
+        if not item_tokens:
+            return self._empty_clusters[0] if self._empty_clusters else None
+
+        postings = self._postings
+        min_overlap = max(1, math.ceil(self.threshold * len(item_tokens) - 1e-9))
+        prefix_size = len(item_tokens) - min_overlap + 1
+        probe = sorted(item_tokens, key=lambda token: len(postings.get(token, ())))[:prefix_size]
+
+        if self.max_candidates is None:
+            candidates: Set[int] = set()
+            for token in probe:
+                candidates.update(postings.get(token, ()))
+            ordered = sorted(candidates)
+        else:
+            token_hits: Counter = Counter()
+            for token in probe:
+                token_hits.update(postings.get(token, ()))
+            ordered = sorted(cluster_id for cluster_id, _ in token_hits.most_common(self.max_candidates))
+        self.comparisons += len(ordered)
+        size = len(item_tokens)
+        threshold = self.threshold
+        for cluster_id in ordered:
+            cluster_tokens = self._token_sets[cluster_id]
+            intersection = len(item_tokens & cluster_tokens)
+            if intersection / (size + len(cluster_tokens) - intersection) >= threshold:
+                return cluster_id
+        return None
+
+    def add_cluster(self, tokens: Set[Token]) -> int:
+        """Register a cluster whose token set is ``tokens`` (kept by reference)."""
+
+        cluster_id = len(self._token_sets)
+        self._token_sets.append(tokens)
+        if not tokens:
+            self._empty_clusters.append(cluster_id)
+        for token in tokens:
+            self._postings.setdefault(token, []).append(cluster_id)
+        return cluster_id
+
+    def extend(self, cluster_id: int, tokens: Iterable[Token]) -> None:
+        cluster_tokens = self._token_sets[cluster_id]
+        was_empty = not cluster_tokens
+        for token in tokens:
+            if token not in cluster_tokens:
+                cluster_tokens.add(token)
+                self._postings.setdefault(token, []).append(cluster_id)
+        if was_empty and cluster_tokens:
+            self._empty_clusters.remove(cluster_id)
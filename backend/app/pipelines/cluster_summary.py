@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from .records import Token
+
+
+# Example URLs listed per cluster.
+EXAMPLE_LIMIT = 2
+
+
+def cluster_entry(
+    cluster_id: int,
+    representative: Dict[str, Any],
+    top_keyword: Optional[str],
+    tags: List[str],
+    count: int,
+    engagement_sum: float,
+    examples: List[str],
+    total_items: int,
+) -> Dict[str, Any]:
+    """A cluster's payload entry from its aggregates."""
+
+    if top_keyword is None:
+        top_keyword = representative.get("clean_text", "")[:50]
+    statements = [
+        f"Users are having challenges related to '{top_keyword}' when discussing {representative.get('source_topic', 'this topic')}."
+    ]
+    avg_engagement = float(engagement_sum / count) if count else 0.0
+    percent_of_total = count / max(total_items, 1)
+    return {
+        "cluster_id": cluster_id,
+        "representative_text": representative.get("text", ""),
+        "statements": statements,
+        "count": count,
+        "percent_of_total": percent_of_total,
+        "avg_engagement": avg_engagement,
+        "confidence": min(1.0, percent_of_total + (avg_engagement / 100.0)),
+        "examples": examples,
+        "tags": tags,
+    }
+
+
+class ClusterAggregate:
+    """Running totals of one cluster, updated as each member arrives.
+
+    Keeps what the cluster's payload entry needs: the member count and
+    engagement sum, the first example URLs, the highest-engagement member
+    (the earliest one on ties) and how often each token occurs across all
+    members. Building the entry then never revisits the members.
+    """
+
+    __slots__ = (
+        "count",
+        "engagement_sum",
+        "examples",
+        "first_text",
+        "representative",
+        "representative_engagement",
+        "representative_tokens",
+        "token_counts",
+    )
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.engagement_sum = 0.0
+        self.examples: List[str] = []
+        self.first_text = ""
+        self.representative: Optional[Dict[str, Any]] = None
+        self.representative_engagement = 0.0
+        self.representative_tokens: Sequence[Token] = ()
+        self.token_counts: Counter = Counter()
+
+    def add(self, item: Dict[str, Any], tokens: Sequence[Token] = ()) -> None:
+        engagement = item.get("engagement_score", 0.0)
+        if self.representative is None:
+            self.first_text = item.get("text", "")
+        if self.representative is None or engagement > self.representative_engagement:
+            self.representative = item
+            self.representative_engagement = engagement
+            self.representative_tokens = tokens
+        self.count += 1
+        self.engagement_sum += engagement
+        url = item.get("url")
+        if url and len(self.examples) < EXAMPLE_LIMIT:
+            self.examples.append(url)
+        self.token_counts.update(tokens)
+
+    def top_tokens(self, limit: int = 5) -> List[Token]:
+        """The ``limit`` most frequent member tokens, earliest seen first on ties."""
+
+        return [token for token, _ in self.token_counts.most_common(limit)]
+
+    def representative_keyword(self) -> Optional[Token]:
+        """The most frequent token of the representative member."""
+
+        counts = Counter(self.representative_tokens)
+        return counts.most_common(1)[0][0] if counts else None
+
+    def entry(
+        self,
+        cluster_id: int,
+        top_keyword: Optional[str],
+        tags: List[str],
+        total_items: int,
+    ) -> Dict[str, Any]:
+        return cluster_entry(
+            cluster_id,
+            self.representative or {},
+            top_keyword,
+            tags,
+            self.count,
+            self.engagement_sum,
+            list(self.examples),
+            total_items,
+        )
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+class RunCancelled(Exception):
+    """Raised at a pipeline checkpoint once its run has been cancelled."""
+
+
+class RunControl:
+    """Cancellation, deadline and item budget of one run, checked cooperatively.
+
+    Pipelines call ``check`` between stages and at checkpoints within them: the
+    lite pipeline once per input batch (through ``take_batches``), the full
+    pipeline once per block of its dedup and cluster loops, and incremental
+    merges once per new item. It raises ``RunCancelled`` once ``cancel`` was
+    called or ``is_cancelled`` (polled at most every ``poll_interval`` seconds)
+    reports a cancellation made elsewhere. Deadlines and item budgets never
+    raise: past them a pipeline stops taking input and summarizes what it has;
+    the full pipeline and incremental merges also cut their remaining loops
+    short with ``stop_early``. ``report`` says what was left out.
+
+    ``deadline_at`` is a ``time.time()`` value so it means the same thing in a
+    worker process; the runner sets it when the run starts executing.
+    """
+
+    def __init__(
+        self,
+        max_items: Optional[int] = None,
+        deadline_at: Optional[float] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+        poll_interval: float = 0.25,
+    ) -> None:
+        self.max_items = max_items
+        self.deadline_at = deadline_at
+        self.items_taken = 0
+        self.truncated: Optional[str] = None
+        self.cut_short: List[str] = []
+        self._cancelled = threading.Event()
+        self._is_cancelled = is_cancelled
+        self._poll_interval = poll_interval
+        self._next_poll = 0.0
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._cancelled.is_set():
+            return True
+        if self._is_cancelled is not None:
+            now = time.monotonic()
+            if now >= self._next_poll:
+                self._next_poll = now + self._poll_interval
+                if self._is_cancelled():
+                    self._cancelled.set()
+                    return True
+        return False
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise RunCancelled("Run was cancelled")
+
+    def exhausted(self) -> bool:
+        """Whether the deadline or item budget has cut the run off; raises once cancelled."""
+
+        self.check()
+        if self.truncated is None and self.deadline_at is not None and time.time() >= self.deadline_at:
+            self.truncated = "deadline"
+        return self.truncated is not None
+
+    def take(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The part of ``batch`` the budget still admits."""
+
+        if self.exhausted():
+            return []
+        if self.max_items is not None and self.items_taken + len(batch) > self.max_items:
+            batch = batch[: self.max_items - self.items_taken]
+            self.truncated = "item_budget"
+        self.items_taken += len(batch)
+        return batch
+
+    def stop_early(self, stage: str) -> bool:
+        """``exhausted``, remembering that ``stage`` was cut short because of it."""
+
+        if not self.exhausted():
+            return False
+        if stage not in self.cut_short:
+            self.cut_short.append(stage)
+        return True
+
+    def report(self) -> Optional[Dict[str, Any]]:
+        if self.truncated is None:
+            return None
+        return {"reason": self.truncated, "items_analysed": self.items_taken, "cut_short": list(self.cut_short)}
+
+
+def take_batches(
+    batches: Iterable[List[Dict[str, Any]]],
+    control: Optional[RunControl],
+) -> Iterator[List[Dict[str, Any]]]:
+    """``batches`` trimmed to the run's budget; stops pulling once it is exhausted."""
+
+    for batch in batches:
+        if control is not None:
+            batch = control.take(batch)
+            if not batch:
+                return
+        yield batch
+        if control is not None and control.exhausted():
+            return
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
+import heapq
 import math
 import re
 from collections import Counter
 from datetime import datetime
+from itertools import islice
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from ..schemas.research import ResearchRequest, ResearchSummary
-
-try:
-    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-except ImportError:  # pragma: no cover - dependency missing only in unsupported envs
-    SentimentIntensityAnalyzer = None
+from .cluster_index import TokenClusterIndex
+from .cluster_summary import EXAMPLE_LIMIT, ClusterAggregate, cluster_entry
+from .control import RunControl, take_batches
+from .minhash import MinHashLSHIndex
+from .metrics import StageMetrics
+from .records import ItemRecord, Vocabulary, build_records
+from .progress import ProgressCallback, StageProgress
+from .sampling import DepthPlan, StratifiedSampler, depth_plan, may_exceed
+from .streaming import PartialCallback, SentimentBatcher, iter_batches, known_length
 
 
 FALLBACK_STOPWORDS = {
@@ -48,6 +54,12 @@ FALLBACK_STOPWORDS = {
     "your",
 }
 
+PIPELINE_DESCRIPTIONS = {
+    "lite": ("fallback pipeline (lite mode)", "lite heuristic pipeline"),
+    "full": ("full pipeline", "vectorized TF-IDF pipeline"),
+    "full+lite": ("full pipeline, extended incrementally", "vectorized TF-IDF pipeline extended with lite heuristics"),
+}
+
 PROBLEM_HINTS = [
     "problem",
     "issue",
@@ -63,17 +75,59 @@ PROBLEM_HINTS = [
 ]
 
 
+URL_PATTERN = re.compile(r"https?://\S+")
+# URLs are tried first at each position, so one pass matches the old URL-then-punctuation passes.
+NORMALIZE_PATTERN = re.compile(r"https?://\S+|[^a-z0-9\s]+")
+# ASCII punctuation and symbols become spaces; letters, digits and whitespace pass through.
+ASCII_NORMALIZE_TABLE = str.maketrans(
+    {chr(code): " " for code in range(128) if not (chr(code).isalnum() or chr(code).isspace())}
+)
+# Whitespace, so it survives normalization and bounds URL matches, but never emitted by it.
+BATCH_SEPARATOR = "\x1e"
+
+
+def _normalize_lowered(lowered: str) -> str:
+    # str.translate only has a fast path for pure-ASCII input; anything else takes the regex.
+    if not lowered.isascii():
+        return NORMALIZE_PATTERN.sub(" ", lowered)
+    if "http" in lowered:
+        lowered = URL_PATTERN.sub(" ", lowered)
+    return lowered.translate(ASCII_NORMALIZE_TABLE)
+
+
 def clean_text(text: str) -> str:
-    normalized = text or ""
-    normalized = normalized.lower()
-    normalized = re.sub(r"https?://\S+", " ", normalized)
-    normalized = re.sub(r"[^a-z0-9\s]", " ", normalized)
-    normalized = re.sub(r"\s+", " ", normalized).strip()
-    return normalized
+    return " ".join(_normalize_lowered((text or "").lower()).split())
+
+
+def clean_texts(texts: Sequence[Optional[str]]) -> List[str]:
+    """Normalize a batch of texts, joining them so each normalization step runs once per batch."""
+
+    if not texts:
+        return []
+    joined = BATCH_SEPARATOR.join(text or "" for text in texts)
+    if joined.count(BATCH_SEPARATOR) != len(texts) - 1:
+        return [clean_text(text) for text in texts]
+    lowered = joined.lower()
+    if lowered.isascii():
+        normalized = _normalize_lowered(lowered).split(BATCH_SEPARATOR)
+    else:
+        # Keep the ASCII majority on the translate path and send only the rest through the regex.
+        normalized = lowered.split(BATCH_SEPARATOR)
+        for is_ascii in (True, False):
+            positions = [idx for idx, part in enumerate(normalized) if part.isascii() is is_ascii]
+            if positions:
+                group = _normalize_lowered(BATCH_SEPARATOR.join(normalized[idx] for idx in positions))
+                for idx, part in zip(positions, group.split(BATCH_SEPARATOR)):
+                    normalized[idx] = part
+    return [" ".join(part.split()) for part in normalized]
+
+
+def tokenize_clean(clean: str) -> List[str]:
+    return [token for token in clean.split() if token not in FALLBACK_STOPWORDS]
 
 
 def tokenize(text: str) -> List[str]:
-    return [token for token in clean_text(text).split() if token and token not in FALLBACK_STOPWORDS]
+    return tokenize_clean(clean_text(text))
 
 
 def extract_keywords(tokens: Iterable[str], max_keywords: int = 5) -> List[str]:
@@ -93,14 +147,14 @@ def jaccard_similarity(a_tokens: Iterable[str], b_tokens: Iterable[str]) -> floa
     return intersection / union
 
 
+def deduplicate_records(records: Sequence[ItemRecord], threshold: float = 0.9) -> List[ItemRecord]:
+    index = MinHashLSHIndex(threshold=threshold)
+    return [record for record in records if index.add(record.token_set)]
+
+
 def deduplicate_items(items: Sequence[Dict[str, Any]], threshold: float = 0.9) -> List[Dict[str, Any]]:
-    unique: List[Dict[str, Any]] = []
-    for candidate in items:
-        candidate_tokens = tokenize(candidate.get("clean_text", ""))
-        if any(jaccard_similarity(candidate_tokens, tokenize(existing.get("clean_text", ""))) >= threshold for existing in unique):
-            continue
-        unique.append(candidate)
-    return unique
+    records = build_records(items, Vocabulary(), tokenize_clean)
+    return [record.item for record in deduplicate_records(records, threshold)]
 
 
 def greedy_cluster_items(
@@ -108,46 +162,110 @@ def greedy_cluster_items(
     topic_tokens: Iterable[str],
     similarity_threshold: float = 0.6,
 ) -> List[Dict[str, Any]]:
-    clusters: List[Dict[str, Any]] = []
-    topic_token_set = set(topic_tokens)
-    for item in items:
-        item_tokens = tokenize(item.get("clean_text", ""))
-        assigned = False
-        for cluster in clusters:
-            if jaccard_similarity(item_tokens, cluster["tokens"]) >= similarity_threshold:
-                cluster["items"].append(item)
-                cluster["tokens"].update(item_tokens)
-                assigned = True
-                break
-        if not assigned:
-            clusters.append({"items": [item], "tokens": set(item_tokens) or set(topic_token_set)})
-
-    cluster_payload: List[Dict[str, Any]] = []
-    for idx, cluster in enumerate(clusters, start=1):
-        cluster_items = cluster["items"]
-        representative = max(cluster_items, key=lambda entry: entry.get("engagement_score", 0.0))
-        token_counts = Counter(tokenize(representative.get("clean_text", "")))
-        top_keyword = token_counts.most_common(1)[0][0] if token_counts else representative.get("clean_text", "")[:50]
-        statements = [
-            f"Users are having challenges related to '{top_keyword}' when discussing {representative.get('source_topic', 'this topic')}."
-        ]
-        engagement_values = [entry.get("engagement_score", 0.0) for entry in cluster_items]
-        avg_engagement = float(sum(engagement_values) / len(engagement_values)) if engagement_values else 0.0
-        percent_of_total = len(cluster_items) / max(len(items), 1)
-        cluster_payload.append(
+    vocabulary = Vocabulary()
+    records = build_records(items, vocabulary, tokenize_clean)
+    return cluster_records(records, vocabulary.encode(topic_tokens), vocabulary, similarity_threshold)
+
+
+def cluster_records(
+    records: Sequence[ItemRecord],
+    topic_token_ids: Iterable[int],
+    vocabulary: Vocabulary,
+    similarity_threshold: float = 0.6,
+) -> List[Dict[str, Any]]:
+    clusterer = RecordClusterer(topic_token_ids, similarity_threshold)
+    for record in records:
+        clusterer.add(record)
+    return clusterer.build(vocabulary)
+
+
+class RecordClusterer:
+    """Greedy first-match clustering that takes records one at a time as they arrive.
+
+    Each cluster is kept as a ``ClusterAggregate`` rather than a list of its
+    records, and items get their ``cluster_id`` as they are assigned.
+    """
+
+    def __init__(
+        self,
+        topic_token_ids: Iterable[int],
+        similarity_threshold: float = 0.6,
+        max_candidates: Optional[int] = None,
+    ) -> None:
+        self._topic_token_set = set(topic_token_ids)
+        self._index = TokenClusterIndex(similarity_threshold, max_candidates)
+        self._clusters: List[ClusterAggregate] = []
+        self.total = 0
+
+    @property
+    def comparisons(self) -> int:
+        return self._index.comparisons
+
+    def __len__(self) -> int:
+        return len(self._clusters)
+
+    def add(self, record: ItemRecord) -> int:
+        """Assign ``record`` to a cluster and return its 1-based cluster id."""
+
+        self.total += 1
+        cluster_id = self._index.find(record.token_set)
+        if cluster_id is not None:
+            self._index.extend(cluster_id, record.token_set)
+        else:
+            cluster_id = self._index.add_cluster(set(record.token_set) or set(self._topic_token_set))
+            self._clusters.append(ClusterAggregate())
+        self._clusters[cluster_id].add(record.item, record.token_ids)
+        record.item["cluster_id"] = cluster_id + 1
+        return cluster_id + 1
+
+    def largest(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Id, size and first text of the biggest clusters so far, for partial results."""
+
+        ranked = heapq.nlargest(limit, range(len(self._clusters)), key=lambda idx: self._clusters[idx].count)
+        return [
             {
-                "cluster_id": idx,
-                "representative_text": representative.get("text", ""),
-                "statements": statements,
-                "count": len(cluster_items),
-                "percent_of_total": percent_of_total,
-                "avg_engagement": avg_engagement,
-                "confidence": min(1.0, percent_of_total + (avg_engagement / 100.0)),
-                "examples": [entry.get("url") for entry in cluster_items if entry.get("url")][:2],
-                "tags": extract_keywords(cluster["tokens"], max_keywords=5),
+                "cluster_id": idx + 1,
+                "count": self._clusters[idx].count,
+                "representative_text": self._clusters[idx].first_text,
             }
-        )
-    return cluster_payload
+            for idx in ranked
+        ]
+
+    def build(self, vocabulary: Vocabulary) -> List[Dict[str, Any]]:
+        cluster_payload: List[Dict[str, Any]] = []
+        for idx, aggregate in enumerate(self._clusters):
+            keyword_id = aggregate.representative_keyword()
+            # Tags rank member tokens by how often they occur; clusters of token-less items fall back to the topic.
+            tags = vocabulary.decode(aggregate.top_tokens(5)) or extract_keywords(vocabulary.decode(self._index.tokens(idx)))
+            cluster_payload.append(
+                aggregate.entry(
+                    idx + 1,
+                    vocabulary.token(keyword_id) if keyword_id is not None else None,
+                    tags,
+                    self.total,
+                )
+            )
+        return cluster_payload
+
+
+def build_cluster_entry(
+    cluster_id: int,
+    cluster_items: Sequence[Dict[str, Any]],
+    representative: Dict[str, Any],
+    top_keyword: Optional[str],
+    tags: List[str],
+    total_items: int,
+) -> Dict[str, Any]:
+    engagement_sum = 0.0
+    examples: List[str] = []
+    for entry in cluster_items:
+        engagement_sum += entry.get("engagement_score", 0.0)
+        url = entry.get("url")
+        if url and len(examples) < EXAMPLE_LIMIT:
+            examples.append(url)
+    return cluster_entry(
+        cluster_id, representative, top_keyword, tags, len(cluster_items), engagement_sum, examples, total_items
+    )
 
 
 def build_summary(
@@ -155,16 +273,19 @@ def build_summary(
     clusters: Sequence[Dict[str, Any]],
     items: Sequence[Dict[str, Any]],
     created_at: datetime,
+    pipeline_mode: str = "lite",
 ) -> Tuple[str, List[str], List[str], List[str], List[str]]:
+    pipeline_name, pipeline_description = PIPELINE_DESCRIPTIONS[pipeline_mode]
     if not clusters:
         summary = (
             f"No publicly available Reddit or X posts were collected for '{topic}' during this run. "
-            "Kivo fallback pipeline (lite mode) executed successfully."
+            f"Kivo {pipeline_name} executed successfully."
         )
         return summary, [], [], [], []
 
-    ranked_clusters = sorted(clusters, key=lambda c: (c["avg_engagement"], c["count"]), reverse=True)
-    pain_points = [cluster["statements"][0] for cluster in ranked_clusters[:5]]
+    # Same order as a stable descending sort, without sorting every cluster.
+    ranked_clusters = heapq.nlargest(5, clusters, key=lambda c: (c["avg_engagement"], c["count"]))
+    pain_points = [cluster["statements"][0] for cluster in ranked_clusters]
     product_hypotheses = [
         f"Consider simplifying workflows related to {cluster['tags'][0]} based on {cluster['count']} signals."
         for cluster in ranked_clusters[:3]
@@ -175,10 +296,10 @@ def build_summary(
         "Schedule community monitoring to verify if pain points persist over the next week.",
         "Share findings with product/support teams to validate feasibility of quick fixes.",
     ]
-    top_sources = [item.get("url") for item in items if item.get("url")] [:10]
+    top_sources = list(islice((item.get("url") for item in items if item.get("url")), 10))
     summary_text = (
         f"Identified {len(clusters)} discussion cluster(s) about '{topic}' on Reddit and X as of {created_at.date()}. "
-        "Insights generated via lite heuristic pipeline."
+        f"Insights generated via {pipeline_description}."
     )
     return summary_text, pain_points, product_hypotheses, recommended_actions, top_sources
 
@@ -199,6 +320,37 @@ def compute_engagement(raw_item: Dict[str, Any]) -> float:
     return float(score + (0.5 * replies) + (0.75 * shares))
 
 
+def build_processed_item(
+    raw_item: Dict[str, Any],
+    clean: str,
+    tokens: Sequence[str],
+    sentiment: Optional[Dict[str, float]],
+    relevance: float,
+    topic: str,
+    created_at: datetime,
+) -> Dict[str, Any]:
+    return {
+        "id": raw_item.get("id", ""),
+        "platform": raw_item.get("platform", "unknown"),
+        "author": raw_item.get("author", ""),
+        "timestamp": raw_item.get("timestamp") if isinstance(raw_item.get("timestamp"), str) else raw_item.get("timestamp", created_at).isoformat() if raw_item.get("timestamp") else created_at.isoformat(),
+        "text": raw_item.get("text", ""),
+        "clean_text": clean,
+        "score": raw_item.get("score"),
+        "replies": raw_item.get("replies"),
+        "retweets_or_shares": raw_item.get("retweets_or_shares"),
+        "url": raw_item.get("url"),
+        "subreddit_or_hashtag": raw_item.get("subreddit_or_hashtag"),
+        "language": raw_item.get("language", "en"),
+        "sentiment": sentiment,
+        "keywords": extract_keywords(tokens),
+        "relevance": round(relevance, 3),
+        "removed_content_flag": bool(raw_item.get("removed_content_flag", False)),
+        "engagement_score": compute_engagement(raw_item),
+        "source_topic": topic,
+    }
+
+
 def build_query_terms(topic: str) -> List[str]:
     base = clean_text(topic)
     if not base:
@@ -212,51 +364,164 @@ def build_query_terms(topic: str) -> List[str]:
     return sorted(expansions)
 
 
+def depth_batches(
+    raw_items: Optional[Iterable[Dict[str, Any]]],
+    plan: DepthPlan,
+    control: Optional[RunControl],
+    metrics: StageMetrics,
+    partial: Optional[PartialCallback] = None,
+) -> Tuple[Iterable[List[Dict[str, Any]]], Optional[int], Dict[str, Any]]:
+    """The batches a run analyses, how many items they hold if known, and how they were chosen.
+
+    Input past ``control``'s budget is never read. When ``plan`` samples and a
+    platform may exceed its share, the whole input goes through a
+    ``StratifiedSampler`` before anything is analysed, and ``partial`` hears how
+    many items were read after every batch; otherwise batches are analysed as
+    they arrive.
+    """
+
+    items = raw_items or ()
+    batches = take_batches(iter_batches(items), control)
+    sampling: Dict[str, Any] = {"depth": plan.depth, "exact": plan.exact}
+    if plan.sample_per_platform is None or not may_exceed(items, plan.sample_per_platform):
+        sampling["method"] = "all"
+        return batches, known_length(items), sampling
+    sampler = StratifiedSampler(plan.sample_per_platform, compute_engagement, plan.seed)
+    for batch in batches:
+        with metrics.stage("normalize"):
+            sampler.extend(batch)
+        if partial is not None:
+            partial({"items_received": sampler.items_seen, "items_kept": None, "clusters": []})
+    with metrics.stage("normalize"):
+        sample = sampler.sample()
+    sampling.update(sampler.report())
+    return iter_batches(sample), len(sample), sampling
+
+
 def run_pipeline(
     run_id: str,
     request: ResearchRequest,
-    raw_items: Optional[Sequence[Dict[str, Any]]] = None,
+    raw_items: Optional[Iterable[Dict[str, Any]]] = None,
+    progress: Optional[ProgressCallback] = None,
+    partial: Optional[PartialCallback] = None,
+    control: Optional[RunControl] = None,
 ) -> Tuple[Dict[str, Any], ResearchSummary]:
+    """Run the lite pipeline over ``raw_items``, which may be a lazy stream.
+
+    Items are pulled in batches and each batch is normalized, deduplicated and
+    clustered before the next is read, so raw items and near-duplicates are
+    never held for the whole run. Sentiment is scored in larger batches since
+    nothing downstream depends on it. ``partial`` receives a snapshot after
+    every batch. Past ``control``'s deadline or item budget no further batch is
+    read and the items so far are summarized. Default-depth runs analyse a
+    stratified sample with candidate-capped dedup and clustering; see
+    ``DepthPlan``.
+    """
+
+    stages = StageProgress(progress)
+    metrics = StageMetrics()
     created_at = datetime.utcnow()
-    analyzer = SentimentIntensityAnalyzer() if SentimentIntensityAnalyzer else None
+    plan = depth_plan(request)
     topic_tokens = tokenize(request.topic)
-    processed_items: List[Dict[str, Any]] = []
-
-    for raw_item in raw_items or []:
-        text = raw_item.get("text", "")
-        clean = clean_text(text)
-        tokens = tokenize(text)
-        sentiment = analyzer.polarity_scores(text) if analyzer else {"compound": 0.0, "pos": 0.0, "neu": 0.0, "neg": 0.0}
-        processed_items.append(
-            {
-                "id": raw_item.get("id", ""),
-                "platform": raw_item.get("platform", "unknown"),
-                "author": raw_item.get("author", ""),
-                "timestamp": raw_item.get("timestamp") if isinstance(raw_item.get("timestamp"), str) else raw_item.get("timestamp", created_at).isoformat() if raw_item.get("timestamp") else created_at.isoformat(),
-                "text": text,
-                "clean_text": clean,
-                "score": raw_item.get("score"),
-                "replies": raw_item.get("replies"),
-                "retweets_or_shares": raw_item.get("retweets_or_shares"),
-                "url": raw_item.get("url"),
-                "subreddit_or_hashtag": raw_item.get("subreddit_or_hashtag"),
-                "language": raw_item.get("language", "en"),
-                "sentiment": sentiment,
-                "keywords": extract_keywords(tokens),
-                "relevance": round(compute_relevance(tokens, topic_tokens), 3),
-                "removed_content_flag": bool(raw_item.get("removed_content_flag", False)),
-                "engagement_score": compute_engagement(raw_item),
-                "source_topic": request.topic,
-            }
-        )
+    vocabulary = Vocabulary()
+    topic_token_ids = vocabulary.encode(topic_tokens)
+    dedup_index = MinHashLSHIndex(threshold=0.9, max_candidates=plan.max_candidates)
+    clusterer = RecordClusterer(topic_token_ids, max_candidates=plan.max_candidates)
+    sentiment = SentimentBatcher()
+    deduped_items: List[Dict[str, Any]] = []
+    batches, total, sampling = depth_batches(raw_items, plan, control, metrics, partial)
+    received = 0
+
+    if total is not None:
+        # A streamed input reports fetch progress until it is exhausted; stages start after that.
+        stages.update("normalize", 0.0)
+    for batch in batches:
+        received += len(batch)
+        with metrics.stage("normalize"):
+            cleaned_texts = clean_texts([raw_item.get("text", "") for raw_item in batch])
+            tokenized = []
+            for clean in cleaned_texts:
+                tokens = tokenize_clean(clean)
+                tokenized.append((clean, tokens, *vocabulary.encode_with_set(tokens)))
+        with metrics.stage("dedup"):
+            kept = [
+                (raw_item, entry)
+                for raw_item, entry in zip(batch, tokenized)
+                if dedup_index.add(entry[3])
+            ]
+        with metrics.stage("cluster"):
+            kept_items = []
+            for raw_item, (clean, tokens, token_ids, token_set) in kept:
+                item = build_processed_item(
+                    raw_item,
+                    clean,
+                    tokens,
+                    None,
+                    compute_relevance(token_set, topic_token_ids),
+                    request.topic,
+                    created_at,
+                )
+                clusterer.add(ItemRecord(item, token_ids, token_set))
+                kept_items.append(item)
+        deduped_items.extend(kept_items)
+        # Sentiment only feeds the payload, so near-duplicates dropped above are never scored.
+        with metrics.stage("sentiment"):
+            sentiment.add(kept_items)
+        if total:
+            stages.update("normalize", received / total)
+        if partial is not None:
+            partial(
+                {
+                    "items_received": sampling.get("items_seen", received),
+                    "items_kept": len(deduped_items),
+                    "clusters": clusterer.largest(),
+                }
+            )
+    stages.update("normalize")
+    stages.update("dedup")
+    with metrics.stage("sentiment"):
+        sentiment_timings = sentiment.timings()
+    stages.update("sentiment")
+    if control is not None:
+        control.check()
+    with metrics.stage("cluster"):
+        clusters = clusterer.build(vocabulary)
+    stages.update("cluster")
+    metrics.record("normalize", items=received)
+    metrics.record("dedup", items_in=received, items_out=len(deduped_items), pairs_compared=dedup_index.comparisons)
+    metrics.record("sentiment", scoring=sentiment_timings)
+    metrics.record("cluster", clusters=len(clusters), pairs_compared=clusterer.comparisons)
+    with metrics.stage("summarize"):
+        payload, summary = build_result(run_id, request, created_at, deduped_items, clusters)
+    payload["metrics"] = metrics.as_dict()
+    payload["sampling"] = finish_sampling(sampling, received)
+    stages.update("summarize")
+    return payload, summary
+
+
+def finish_sampling(sampling: Dict[str, Any], analysed: int) -> Dict[str, Any]:
+    """``sampling`` from ``depth_batches`` with the counts of an unsampled run filled in."""
+
+    sampling.setdefault("items_seen", analysed)
+    sampling.setdefault("items_analysed", analysed)
+    return sampling
 
-    deduped_items = deduplicate_items(processed_items)
-    clusters = greedy_cluster_items(deduped_items, topic_tokens)
+
+def build_result(
+    run_id: str,
+    request: ResearchRequest,
+    created_at: datetime,
+    items: List[Dict[str, Any]],
+    clusters: List[Dict[str, Any]],
+    pipeline_mode: str = "lite",
+    metrics: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], ResearchSummary]:
     summary_text, pain_points, product_hypotheses, recommended_actions, top_sources = build_summary(
         request.topic,
         clusters,
-        deduped_items,
+        items,
         created_at,
+        pipeline_mode,
     )
 
     payload = {
@@ -269,7 +534,7 @@ def run_pipeline(
             "to": request.to_date.isoformat() if request.to_date else None,
         },
         "created_at": created_at.isoformat(),
-        "items": deduped_items,
+        "items": items,
         "clusters": clusters,
         "summary": {
             "top_pain_points": pain_points,
@@ -277,7 +542,8 @@ def run_pipeline(
             "product_hypotheses": product_hypotheses,
             "top_sources": top_sources,
         },
-        "pipeline_mode": "lite",
+        "pipeline_mode": pipeline_mode,
+        "metrics": metrics or {},
     }
 
     summary = ResearchSummary(
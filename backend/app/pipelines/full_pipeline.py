@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from ..schemas.research import ResearchRequest, ResearchSummary
+from .fallback_pipeline import (
+    build_cluster_entry,
+    build_processed_item,
+    build_result,
+    clean_texts,
+    depth_batches,
+    finish_sampling,
+    tokenize,
+    tokenize_clean,
+)
+from .control import RunControl
+from .metrics import StageMetrics
+from .progress import ProgressCallback, StageProgress
+from .sentiment import score_texts
+from .sampling import depth_plan
+from .streaming import PartialCallback
+
+
+DEDUP_THRESHOLD = 0.9
+CLUSTER_THRESHOLD = 0.5
+BLOCK_SIZE = 512
+SVD_COMPONENTS = 128
+# Above this many matrix cells the clustering space is reduced with a truncated SVD.
+DENSE_CELL_LIMIT = 4_000_000
+
+
+def _identity_analyzer(tokens: List[str]) -> List[str]:
+    return tokens
+
+
+def build_tfidf(token_lists: Sequence[List[str]]) -> Tuple[sparse.csr_matrix, Dict[str, int]]:
+    """L2-normalized TF-IDF rows for pre-tokenized items; empty rows stay all-zero."""
+
+    if not any(token_lists):
+        return sparse.csr_matrix((len(token_lists), 0), dtype=np.float32), {}
+    vectorizer = TfidfVectorizer(analyzer=_identity_analyzer, sublinear_tf=True, dtype=np.float32)
+    matrix = vectorizer.fit_transform(token_lists).tocsr()
+    return matrix, vectorizer.vocabulary_
+
+
+def compute_relevance_batch(
+    matrix: sparse.csr_matrix,
+    vocabulary: Dict[str, int],
+    topic_tokens: Sequence[str],
+) -> np.ndarray:
+    """Share of topic tokens present in each row, matching the lite ``compute_relevance``."""
+
+    topic_set = set(topic_tokens)
+    relevance = np.zeros(matrix.shape[0], dtype=np.float64)
+    columns = [vocabulary[token] for token in topic_set if token in vocabulary]
+    if not topic_set or not columns:
+        return relevance
+    present = (matrix[:, columns] > 0).sum(axis=1)
+    return np.asarray(present, dtype=np.float64).ravel() / len(topic_set)
+
+
+def find_near_duplicates(
+    matrix: sparse.csr_matrix,
+    threshold: float = DEDUP_THRESHOLD,
+    stats: Optional[Dict[str, int]] = None,
+    control: Optional[RunControl] = None,
+) -> np.ndarray:
+    """Boolean keep-mask: a row is dropped when an earlier kept row has cosine >= ``threshold``.
+
+    ``stats``, when given, receives ``pairs_compared``: the pairs sharing at least one term.
+    Past ``control``'s deadline the remaining rows are kept without being compared.
+    """
+
+    rows = matrix.shape[0]
+    keep = np.ones(rows, dtype=bool)
+    empty_rows = np.flatnonzero(np.diff(matrix.indptr) == 0)
+    keep[empty_rows[1:]] = False
+    pairs_compared = 0
+    if stats is not None:
+        stats["pairs_compared"] = 0
+    if matrix.shape[1] == 0:
+        return keep
+
+    transposed = matrix.T.tocsc()
+    for start in range(0, rows, BLOCK_SIZE):
+        if control is not None and control.stop_early("dedup"):
+            break
+        stop = min(start + BLOCK_SIZE, rows)
+        similarities = (matrix[start:stop] @ transposed[:, :stop]).tocoo()
+        row_ids = similarities.row + start
+        earlier = similarities.col < row_ids
+        if stats is not None:
+            pairs_compared += int(earlier.sum())
+            stats["pairs_compared"] = pairs_compared
+        mask = earlier & (similarities.data >= threshold - 1e-6)
+        if not mask.any():
+            continue
+        pair_rows = row_ids[mask]
+        pair_cols = similarities.col[mask]
+        order = np.lexsort((pair_cols, pair_rows))
+        pair_rows, pair_cols = pair_rows[order], pair_cols[order]
+        boundaries = np.flatnonzero(np.diff(pair_rows)) + 1
+        # Rows are resolved in order so a duplicate of a dropped row can still be kept.
+        for row_pairs, col_pairs in zip(np.split(pair_rows, boundaries), np.split(pair_cols, boundaries)):
+            if keep[col_pairs].any():
+                keep[row_pairs[0]] = False
+    return keep
+
+
+def build_embeddings(matrix: sparse.csr_matrix) -> np.ndarray:
+    rows, columns = matrix.shape
+    if columns == 0:
+        return np.zeros((rows, 1), dtype=np.float32)
+    if rows * columns <= DENSE_CELL_LIMIT or rows <= SVD_COMPONENTS or columns <= SVD_COMPONENTS:
+        return matrix.toarray()
+    reduced = TruncatedSVD(n_components=SVD_COMPONENTS, random_state=0).fit_transform(matrix)
+    return normalize(reduced).astype(np.float32)
+
+
+def leader_cluster(
+    embeddings: np.ndarray,
+    threshold: float = CLUSTER_THRESHOLD,
+    control: Optional[RunControl] = None,
+) -> np.ndarray:
+    """Assign each row to its most similar centroid above ``threshold``, block by block.
+
+    Each block is scored against all existing centroids in one matrix product; only
+    rows that match none are resolved one at a time against the leaders opened
+    within the same block, again joining the most similar one above the threshold
+    or opening a cluster of their own. Past ``control``'s deadline no cluster is opened and
+    the remaining rows join their most similar existing one.
+    """
+
+    rows = embeddings.shape[0]
+    labels = np.full(rows, -1, dtype=np.int64)
+    sums = np.zeros_like(embeddings)
+    count = 0
+    for start in range(0, rows, BLOCK_SIZE):
+        block = embeddings[start : start + BLOCK_SIZE]
+        assigned = np.full(len(block), -1, dtype=np.int64)
+        if count:
+            similarities = block @ normalize(sums[:count]).T
+            best = similarities.argmax(axis=1)
+            matched = similarities[np.arange(len(block)), best] >= threshold
+            if control is not None and control.stop_early("cluster"):
+                matched[:] = True
+            assigned[matched] = best[matched]
+
+        leaders: List[int] = []
+        opened = np.zeros(len(block), dtype=bool)
+        for offset in np.flatnonzero(assigned < 0):
+            vector = block[offset]
+            if leaders:
+                leader_similarities = normalize(sums[leaders]) @ vector
+                best_leader = int(leader_similarities.argmax())
+                if leader_similarities[best_leader] >= threshold:
+                    assigned[offset] = leaders[best_leader]
+                    continue
+            sums[count] = vector
+            leaders.append(count)
+            opened[offset] = True
+            assigned[offset] = count
+            count += 1
+
+        np.add.at(sums, assigned[~opened], block[~opened])
+        labels[start : start + len(block)] = assigned
+    return labels
+
+
+def top_cluster_terms(
+    matrix: sparse.csr_matrix,
+    labels: np.ndarray,
+    cluster_count: int,
+    vocabulary: Dict[str, int],
+    max_terms: int = 5,
+) -> List[List[str]]:
+    if matrix.shape[1] == 0 or cluster_count == 0:
+        return [[] for _ in range(cluster_count)]
+    membership = sparse.csr_matrix(
+        (np.ones(len(labels), dtype=np.float32), (labels, np.arange(len(labels)))),
+        shape=(cluster_count, len(labels)),
+    )
+    weights = (membership @ matrix).tocsr()
+    terms = np.empty(len(vocabulary), dtype=object)
+    for token, column in vocabulary.items():
+        terms[column] = token
+    tags = []
+    for cluster_id in range(cluster_count):
+        row = weights.getrow(cluster_id)
+        top = row.indices[np.argsort(-row.data, kind="stable")[:max_terms]]
+        tags.append([str(term) for term in terms[top]])
+    return tags
+
+
+def run_pipeline(
+    run_id: str,
+    request: ResearchRequest,
+    raw_items: Optional[Iterable[Dict[str, Any]]] = None,
+    progress: Optional[ProgressCallback] = None,
+    partial: Optional[PartialCallback] = None,
+    control: Optional[RunControl] = None,
+) -> Tuple[Dict[str, Any], ResearchSummary]:
+    """Run the vectorized pipeline over ``raw_items``, which may be a lazy stream.
+
+    TF-IDF weights, deduplication and clustering need the whole corpus, so only
+    normalization runs per batch as items arrive; each raw item is replaced by
+    its processed item straight away. ``partial`` receives the running counts.
+    Past ``control``'s deadline or item budget no further input is read, and
+    dedup and clustering finish their remaining rows the cheap way. Default-depth
+    runs analyse a stratified sample, which bounds the corpus the exact
+    algorithms below see.
+    """
+
+    stages = StageProgress(progress)
+    metrics = StageMetrics()
+    created_at = datetime.utcnow()
+    topic_tokens = tokenize(request.topic)
+    batches, total, sampling = depth_batches(raw_items, depth_plan(request), control, metrics, partial)
+
+    if total is not None:
+        # A streamed input reports fetch progress until it is exhausted; stages start after that.
+        stages.update("normalize", 0.0)
+    processed: List[Dict[str, Any]] = []
+    token_lists: List[List[str]] = []
+    for batch in batches:
+        with metrics.stage("normalize"):
+            cleaned_texts = clean_texts([raw_item.get("text", "") for raw_item in batch])
+            for raw_item, clean in zip(batch, cleaned_texts):
+                tokens = tokenize_clean(clean)
+                token_lists.append(tokens)
+                processed.append(build_processed_item(raw_item, clean, tokens, None, 0.0, request.topic, created_at))
+        if total:
+            stages.update("normalize", 0.5 * len(processed) / total)
+        if partial is not None:
+            partial({"items_received": sampling.get("items_seen", len(processed)), "items_kept": None, "clusters": []})
+    with metrics.stage("normalize"):
+        matrix, vocabulary = build_tfidf(token_lists)
+        relevance = compute_relevance_batch(matrix, vocabulary, topic_tokens)
+    metrics.record("normalize", items=len(processed), vocabulary=len(vocabulary))
+    stages.update("normalize")
+
+    dedup_stats: Dict[str, int] = {}
+    with metrics.stage("dedup"):
+        keep = find_near_duplicates(matrix, stats=dedup_stats, control=control)
+        kept_positions = np.flatnonzero(keep)
+        items: List[Dict[str, Any]] = [processed[position] for position in kept_positions]
+    metrics.record("dedup", items_in=len(processed), items_out=len(items), **dedup_stats)
+    processed = []
+    stages.update("dedup")
+    if control is not None:
+        control.check()
+    with metrics.stage("sentiment"):
+        sentiments, sentiment_timings = score_texts([item.get("text", "") for item in items])
+        for item, position, sentiment in zip(items, kept_positions, sentiments):
+            item["sentiment"] = sentiment
+            item["relevance"] = round(float(relevance[position]), 3)
+    metrics.record("sentiment", scoring=sentiment_timings)
+    stages.update("sentiment")
+
+    with metrics.stage("cluster"):
+        kept_matrix = matrix[kept_positions]
+        labels = (
+            leader_cluster(build_embeddings(kept_matrix), control=control)
+            if len(items)
+            else np.zeros(0, dtype=np.int64)
+        )
+        cluster_count = int(labels.max()) + 1 if len(labels) else 0
+        tags = top_cluster_terms(kept_matrix, labels, cluster_count, vocabulary)
+    stages.update("cluster", 0.5)
+
+    with metrics.stage("cluster"):
+        engagement = np.array([item["engagement_score"] for item in items], dtype=np.float64)
+        order = np.argsort(labels, kind="stable")
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        clusters = []
+        for cluster_id, members in enumerate(np.split(order, boundaries) if len(order) else []):
+            for member in members:
+                items[member]["cluster_id"] = cluster_id + 1
+            representative_position = int(members[np.argmax(engagement[members])])
+            token_counts = Counter(token_lists[kept_positions[representative_position]])
+            top_keyword = token_counts.most_common(1)[0][0] if token_counts else None
+            clusters.append(
+                build_cluster_entry(
+                    cluster_id + 1,
+                    [items[member] for member in members],
+                    items[representative_position],
+                    top_keyword,
+                    tags[cluster_id],
+                    len(items),
+                )
+            )
+    metrics.record("cluster", clusters=len(clusters))
+
+    stages.update("cluster")
+
+    with metrics.stage("summarize"):
+        payload, summary = build_result(run_id, request, created_at, items, clusters, pipeline_mode="full")
+    payload["metrics"] = metrics.as_dict()
+    payload["sampling"] = finish_sampling(sampling, len(token_lists))
+    stages.update("summarize")
+    return payload, summary
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from ..schemas.research import ResearchRequest, ResearchSummary
+from .cluster_index import TokenClusterIndex
+from .cluster_summary import ClusterAggregate
+from .control import RunControl
+from .fallback_pipeline import (
+    build_processed_item,
+    build_result,
+    clean_texts,
+    compute_relevance,
+    tokenize,
+    tokenize_clean,
+)
+from .minhash import MinHashLSHIndex
+from .metrics import StageMetrics
+from .progress import ProgressCallback, StageProgress
+from .sentiment import score_texts
+
+
+STATE_VERSION = 2
+DEDUP_THRESHOLD = 0.9
+CLUSTER_THRESHOLD = 0.6
+# New items are always merged with the lite algorithms; a full-pipeline baseline extended
+# with them is labelled as such.
+MIXED_MODE = "full+lite"
+# Fields of a cluster's representative item its payload entry is built from.
+REPRESENTATIVE_FIELDS = ("text", "clean_text", "source_topic")
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Naive UTC datetime for an ISO string or datetime; ``None`` when it cannot be read."""
+
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def merged_pipeline_mode(baseline_mode: str) -> str:
+    return "lite" if baseline_mode == "lite" else MIXED_MODE
+
+
+def dump_aggregate(aggregate: ClusterAggregate) -> Dict[str, Any]:
+    representative = aggregate.representative or {}
+    return {
+        "count": aggregate.count,
+        "engagement_sum": aggregate.engagement_sum,
+        "examples": list(aggregate.examples),
+        "first_text": aggregate.first_text,
+        "representative": {field: representative[field] for field in REPRESENTATIVE_FIELDS if field in representative},
+        "representative_engagement": aggregate.representative_engagement,
+        "representative_tokens": list(aggregate.representative_tokens),
+        # Pairs rather than a mapping: the order breaks ties between equally frequent tags.
+        "token_counts": [[token, count] for token, count in aggregate.token_counts.items()],
+    }
+
+
+def load_aggregate(data: Dict[str, Any]) -> ClusterAggregate:
+    aggregate = ClusterAggregate()
+    aggregate.count = data["count"]
+    aggregate.engagement_sum = data["engagement_sum"]
+    aggregate.examples = list(data["examples"])
+    aggregate.first_text = data["first_text"]
+    aggregate.representative = dict(data["representative"])
+    aggregate.representative_engagement = data["representative_engagement"]
+    aggregate.representative_tokens = list(data["representative_tokens"])
+    aggregate.token_counts = Counter(dict(data["token_counts"]))
+    return aggregate
+
+
+def build_incremental_state(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """What a later incremental run needs from this one, derived from its payload.
+
+    ``fingerprints`` are the token lists of the payload items and ``band_keys``
+    their MinHash LSH bucket keys (same order), so later runs index them without
+    signing them again. ``clusters`` hold each cluster's token centroid, which
+    new items are matched against, and the aggregates its payload entry is
+    rebuilt from once new items join it. ``high_water_mark`` is the newest item
+    timestamp.
+    """
+
+    items = payload.get("items") or []
+    fingerprints = [tokenize_clean(item.get("clean_text", "")) for item in items]
+    dedup_index = MinHashLSHIndex(threshold=DEDUP_THRESHOLD)
+    band_keys = []
+    centroids: Dict[int, Set[str]] = {}
+    aggregates: Dict[int, ClusterAggregate] = {}
+    for item, tokens in zip(items, fingerprints):
+        token_set = frozenset(tokens)
+        band_keys.append(dedup_index.band_keys(dedup_index.signature(token_set)) if token_set else [])
+        cluster_id = item.get("cluster_id")
+        if cluster_id is not None:
+            centroids.setdefault(cluster_id, set()).update(tokens)
+            aggregates.setdefault(cluster_id, ClusterAggregate()).add(item, tokens)
+
+    timestamps = [parse_timestamp(item.get("timestamp")) for item in items]
+    known = [timestamp for timestamp in timestamps if timestamp is not None]
+    return {
+        "version": STATE_VERSION,
+        "pipeline_mode": payload.get("pipeline_mode", "lite"),
+        "high_water_mark": max(known).isoformat() if known else None,
+        "item_ids": [item.get("id") for item in items],
+        "fingerprints": fingerprints,
+        "band_keys": band_keys,
+        "clusters": [
+            {"cluster_id": cluster_id, "tokens": sorted(tokens), "aggregate": dump_aggregate(aggregates[cluster_id])}
+            for cluster_id, tokens in sorted(centroids.items())
+        ],
+    }
+
+
+def select_new_items(
+    raw_items: Sequence[Dict[str, Any]],
+    state: Dict[str, Any],
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Raw items newer than the baseline's high-water mark and not already in it."""
+
+    high_water_mark = parse_timestamp(state.get("high_water_mark"))
+    seen_ids = {item_id for item_id in state.get("item_ids", []) if item_id}
+    selected = []
+    for raw_item in raw_items:
+        if raw_item.get("id") and raw_item["id"] in seen_ids:
+            continue
+        timestamp = parse_timestamp(raw_item.get("timestamp"))
+        if high_water_mark is not None and timestamp is not None and timestamp <= high_water_mark:
+            continue
+        selected.append(raw_item)
+    return selected, len(raw_items) - len(selected)
+
+
+def run_incremental(
+    run_id: str,
+    request: ResearchRequest,
+    raw_items: Optional[Sequence[Dict[str, Any]]],
+    baseline_payload: Dict[str, Any],
+    baseline_state: Dict[str, Any],
+    progress: Optional[ProgressCallback] = None,
+    control: Optional[RunControl] = None,
+) -> Tuple[Dict[str, Any], ResearchSummary, Dict[str, Any]]:
+    """Extend a baseline run with the raw items it has not seen.
+
+    Only new items are normalized, scored, deduplicated (against the baseline
+    fingerprints as well as each other) and clustered; they join the first
+    baseline cluster whose token centroid they match, or open new clusters.
+    Baseline items are indexed under their stored band keys and only the
+    clusters new items join are rebuilt, from their stored aggregates, so
+    signing, similarity comparisons, scoring and cluster rebuilding grow with
+    the new items rather than the baseline. Loading the baseline still takes
+    time linear in its size, but none of these steps: its items are copied
+    into the merged payload and its band keys are inserted into a fresh
+    index. Past ``control``'s
+    deadline the remaining new items are kept without being compared for
+    duplicates, and each scores at most one candidate cluster. Returns the
+    merged payload, its summary and the state for the merged run.
+    """
+
+    stages = StageProgress(progress)
+    stage_metrics = StageMetrics()
+    created_at = datetime.utcnow()
+    topic_tokens = tokenize(request.topic)
+    pipeline_mode = merged_pipeline_mode(baseline_state.get("pipeline_mode", "lite"))
+
+    stages.update("normalize", 0.0)
+    with stage_metrics.stage("normalize"):
+        new_raw_items, skipped = select_new_items(list(raw_items or []), baseline_state)
+        cleaned_texts = clean_texts([raw_item.get("text", "") for raw_item in new_raw_items])
+        token_lists = [tokenize_clean(clean) for clean in cleaned_texts]
+    stage_metrics.record("normalize", items=len(new_raw_items))
+    stages.update("normalize")
+
+    with stage_metrics.stage("dedup"):
+        dedup_index = MinHashLSHIndex(threshold=DEDUP_THRESHOLD)
+        for fingerprint, keys in zip(baseline_state["fingerprints"], baseline_state["band_keys"]):
+            dedup_index.insert_keys(frozenset(fingerprint), keys)
+        kept: List[int] = []
+        new_band_keys: List[List[int]] = []
+        for position, tokens in enumerate(token_lists):
+            token_set = frozenset(tokens)
+            signature = dedup_index.signature(token_set)
+            compare = control is None or not control.stop_early("dedup")
+            if compare and dedup_index.is_duplicate(token_set, signature):
+                continue
+            keys = dedup_index.band_keys(signature) if token_set else []
+            dedup_index.insert_keys(token_set, keys)
+            kept.append(position)
+            new_band_keys.append(keys)
+    stage_metrics.record(
+        "dedup", items_in=len(new_raw_items), items_out=len(kept), pairs_compared=dedup_index.comparisons
+    )
+    stages.update("dedup")
+
+    with stage_metrics.stage("sentiment"):
+        sentiments, sentiment_timings = score_texts([new_raw_items[position].get("text", "") for position in kept])
+    stage_metrics.record("sentiment", scoring=sentiment_timings)
+    new_items = [
+        build_processed_item(
+            new_raw_items[position],
+            cleaned_texts[position],
+            token_lists[position],
+            sentiment,
+            compute_relevance(token_lists[position], topic_tokens),
+            request.topic,
+            created_at,
+        )
+        for position, sentiment in zip(kept, sentiments)
+    ]
+    new_tokens = [token_lists[position] for position in kept]
+    stages.update("sentiment")
+
+    baseline_clusters = baseline_state["clusters"]
+    cluster_ids: List[int] = []
+    index = TokenClusterIndex(CLUSTER_THRESHOLD)
+    # Aggregates of the clusters new items joined, keyed by cluster position.
+    touched: Dict[int, ClusterAggregate] = {}
+    with stage_metrics.stage("cluster"):
+        for cluster in baseline_clusters:
+            cluster_ids.append(cluster["cluster_id"])
+            index.add_cluster(set(cluster["tokens"]))
+        next_cluster_id = max(cluster_ids, default=0) + 1
+        for item, tokens in zip(new_items, new_tokens):
+            if control is not None and control.stop_early("cluster"):
+                index.max_candidates = 1
+            token_set = set(tokens)
+            position = index.find(token_set)
+            if position is None:
+                position = index.add_cluster(token_set or set(topic_tokens))
+                cluster_ids.append(next_cluster_id)
+                next_cluster_id += 1
+            else:
+                index.extend(position, token_set)
+            item["cluster_id"] = cluster_ids[position]
+            aggregate = touched.get(position)
+            if aggregate is None:
+                aggregate = touched[position] = (
+                    load_aggregate(baseline_clusters[position]["aggregate"])
+                    if position < len(baseline_clusters)
+                    else ClusterAggregate()
+                )
+            aggregate.add(item, tokens)
+    stages.update("cluster", 0.5)
+
+    items = list(baseline_payload.get("items") or []) + new_items
+    with stage_metrics.stage("cluster"):
+        clusters = merge_clusters(baseline_payload.get("clusters") or [], cluster_ids, touched, len(items))
+    stage_metrics.record("cluster", clusters=len(clusters), pairs_compared=index.comparisons)
+    stages.update("cluster")
+
+    metrics = {
+        **stage_metrics.as_dict(),
+        "incremental": {
+            "baseline_run_id": baseline_payload.get("run_id"),
+            "baseline_items": len(items) - len(new_items),
+            "received_items": len(new_raw_items) + skipped,
+            "skipped_items": skipped,
+            "new_items": len(new_items),
+            "near_duplicates": len(new_raw_items) - len(new_items),
+        },
+    }
+    payload, summary = build_result(
+        run_id,
+        request,
+        created_at,
+        items,
+        clusters,
+        pipeline_mode=pipeline_mode,
+        metrics=metrics,
+    )
+    payload["baseline_run_id"] = baseline_payload.get("run_id")
+
+    high_water_mark = baseline_state.get("high_water_mark")
+    for item in new_items:
+        timestamp = parse_timestamp(item.get("timestamp"))
+        if timestamp is not None and (high_water_mark is None or timestamp > parse_timestamp(high_water_mark)):
+            high_water_mark = timestamp.isoformat()
+    state = {
+        **baseline_state,
+        "pipeline_mode": pipeline_mode,
+        "high_water_mark": high_water_mark,
+        "item_ids": baseline_state.get("item_ids", []) + [item.get("id") for item in new_items],
+        "fingerprints": baseline_state["fingerprints"] + new_tokens,
+        "band_keys": baseline_state["band_keys"] + new_band_keys,
+        "clusters": [
+            {
+                "cluster_id": cluster_id,
+                "tokens": sorted(index.tokens(position)),
+                "aggregate": dump_aggregate(touched[position]),
+            }
+            if position in touched
+            else baseline_clusters[position]
+            for position, cluster_id in enumerate(cluster_ids)
+        ],
+    }
+    stages.update("summarize")
+    return payload, summary, state
+
+
+def merge_clusters(
+    baseline_clusters: Sequence[Dict[str, Any]],
+    cluster_ids: Sequence[int],
+    touched: Dict[int, ClusterAggregate],
+    total_items: int,
+) -> List[Dict[str, Any]]:
+    """Cluster entries for the merged items.
+
+    Only clusters that received new items are rebuilt, from their aggregates;
+    the others keep their baseline entry with the share of the grown total
+    updated.
+    """
+
+    baseline_by_id = {cluster["cluster_id"]: cluster for cluster in baseline_clusters}
+    rebuilt = {
+        cluster_ids[position]: aggregate.entry(
+            cluster_ids[position], aggregate.representative_keyword(), aggregate.top_tokens(), total_items
+        )
+        for position, aggregate in touched.items()
+    }
+    clusters = []
+    for cluster_id in sorted(set(baseline_by_id) | set(rebuilt)):
+        entry = rebuilt.get(cluster_id)
+        if entry is None:
+            entry = dict(baseline_by_id[cluster_id])
+            entry["percent_of_total"] = entry["count"] / max(total_items, 1)
+            entry["confidence"] = min(1.0, entry["percent_of_total"] + (entry["avg_engagement"] / 100.0))
+        clusters.append(entry)
+    return clusters
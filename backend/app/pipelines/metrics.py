@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+class StageMetrics:
+    """Wall and CPU time plus item counts per pipeline stage, for the payload's ``metrics``.
+
+    A stage may be entered many times (once per batch in the streaming
+    pipelines); its times accumulate. CPU time is the calling thread's, so runs
+    executing side by side in worker threads do not count each other's work.
+    """
+
+    def __init__(self) -> None:
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._started = time.perf_counter()
+        self._cpu_started = time.thread_time()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        entry = self._entry(name)
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield entry
+        finally:
+            entry["wall_ms"] += (time.perf_counter() - wall) * 1000.0
+            entry["cpu_ms"] += (time.thread_time() - cpu) * 1000.0
+
+    def count(self, name: str, **counts: int) -> None:
+        entry = self._entry(name)
+        for key, value in counts.items():
+            entry[key] = entry.get(key, 0) + value
+
+    def record(self, name: str, **values: Any) -> None:
+        self._entry(name).update(values)
+
+    def as_dict(self) -> Dict[str, Any]:
+        stages = {}
+        for name, entry in self._stages.items():
+            stages[name] = {
+                **entry,
+                "wall_ms": round(entry["wall_ms"], 3),
+                "cpu_ms": round(entry["cpu_ms"], 3),
+            }
+        return {
+            "stages": stages,
+            "wall_ms": round((time.perf_counter() - self._started) * 1000.0, 3),
+            "cpu_ms": round((time.thread_time() - self._cpu_started) * 1000.0, 3),
+        }
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        entry = self._stages.get(name)
+        if entry is None:
+            entry = self._stages[name] = {"wall_ms": 0.0, "cpu_ms": 0.0}
+        return entry
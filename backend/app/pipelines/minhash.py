@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import random
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from .records import Token
+
+
+DEFAULT_NUM_PERM = 64
+# Target probability that a pair at exactly the threshold becomes an LSH candidate.
+MIN_CANDIDATE_RECALL = 0.999999
+
+
+def stable_token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def choose_band_layout(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick the (bands, rows) split with the fewest false candidates that keeps recall at the threshold."""
+
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        recall = 1.0 - (1.0 - threshold**rows) ** bands
+        if recall >= MIN_CANDIDATE_RECALL:
+            best = (bands, rows)
+    return best
+
+
+class MinHashLSHIndex:
+    """Near-duplicate index over token sets.
+
+    Signatures use one-permutation hashing with randomized densification, so each
+    token is hashed once instead of once per permutation. Banded LSH buckets narrow
+    the comparison to a handful of candidates; every candidate is then verified
+    with exact Jaccard similarity, so the index never reports a pair below
+    ``threshold``. With ``max_candidates`` only the candidates sharing the most
+    bands are verified, which bounds the cost per item at the price of missing
+    a duplicate that hides behind more likely ones.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = DEFAULT_NUM_PERM,
+        seed: int = 1,
+        max_candidates: Optional[int] = None,
+    ) -> None:
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.num_perm = num_perm
+        self.seed = seed
+        self.bands, self.rows = choose_band_layout(min(max(threshold, 0.0), 1.0), num_perm)
+        rng = random.Random(seed)
+        self._probe_orders = [rng.sample(range(num_perm), num_perm) for _ in range(num_perm)]
+        self._token_hashes: Dict[Token, int] = {}
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+        self._token_sets: List[FrozenSet[Token]] = []
+        self._exact: Dict[FrozenSet[Token], int] = {}
+        self._has_empty = False
+        # Candidate pairs examined by ``is_duplicate``, for run metrics.
+        self.comparisons = 0
+
+    def __len__(self) -> int:
+        return len(self._token_sets)
+
+    def signature(self, token_set: Iterable[Token]) -> Tuple[int, ...]:
+        token_hashes = self._token_hashes
+        num_perm = self.num_perm
+        bins: List[int] = [-1] * num_perm
+        for token in token_set:
+            value = token_hashes.get(token)
+            if value is None:
+                value = token_hashes[token] = stable_token_hash(f"{self.seed}:{token}")
+            slot = value % num_perm
+            current = bins[slot]
+            if current < 0 or value < current:
+                bins[slot] = value
+        if all(value < 0 for value in bins):
+            return ()
+
+        # Each empty bin borrows from the first filled bin in its own fixed probe order,
+        # so sets that share most tokens also share most borrowed values while small,
+        # unrelated sets do not collapse onto identical bands.
+        signature = list(bins)
+        for slot, value in enumerate(bins):
+            if value >= 0:
+                continue
+            for probe in self._probe_orders[slot]:
+                if bins[probe] >= 0:
+                    signature[slot] = bins[probe]
+                    break
+        return tuple(signature)
+
+    def band_keys(self, signature: Sequence[int]) -> List[int]:
+        """Bucket key of each band; stable across processes, so callers may store them."""
+
+        # Buckets are keyed by the band's hash rather than the band itself; a collision only
+        # adds a candidate, which exact verification then rejects.
+        rows = self.rows
+        return [hash(tuple(signature[band * rows : (band + 1) * rows])) for band in range(self.bands)]
+
+    def is_duplicate(self, token_set: FrozenSet[Token], signature: Sequence[int]) -> bool:
+        if not self._token_sets:
+            return False
+        if self.threshold <= 0.0:
+            return True
+        if not token_set:
+            return self._has_empty
+        if token_set in self._exact:
+            return True
+
+        if self.max_candidates is None:
+            candidates = set()
+            for bucket, key in zip(self._buckets, self.band_keys(signature)):
+                entries = bucket.get(key)
+                if entries:
+                    candidates.update(entries)
+        else:
+            band_hits: Counter = Counter()
+            for bucket, key in zip(self._buckets, self.band_keys(signature)):
+                entries = bucket.get(key)
+                if entries:
+                    band_hits.update(entries)
+            candidates = [candidate_id for candidate_id, _ in band_hits.most_common(self.max_candidates)]
+
+        self.comparisons += len(candidates)
+        size = len(token_set)
+        threshold = self.threshold
+        # Jaccard never exceeds the ratio of the two set sizes, which rules most candidates out unscored.
+        min_size = size * threshold - 1e-9
+        max_size = size / threshold + 1e-9
+        token_sets = self._token_sets
+        for candidate_id in candidates:
+            candidate = token_sets[candidate_id]
+            if not min_size <= len(candidate) <= max_size:
+                continue
+            intersection = len(token_set & candidate)
+            if intersection and intersection / (size + len(candidate) - intersection) >= threshold:
+                return True
+        return False
+
+    def insert(self, token_set: FrozenSet[Token], signature: Sequence[int]) -> int:
+        return self.insert_keys(token_set, self.band_keys(signature) if token_set else ())
+
+    def insert_keys(self, token_set: FrozenSet[Token], band_keys: Sequence[int]) -> int:
+        """Index ``token_set`` under band keys computed earlier, without signing it again."""
+
+        entry_id = len(self._token_sets)
+        self._token_sets.append(token_set)
+        if not token_set:
+            self._has_empty = True
+            return entry_id
+        self._exact.setdefault(token_set, entry_id)
+        for bucket, key in zip(self._buckets, band_keys):
+            bucket.setdefault(key, []).append(entry_id)
+        return entry_id
+
+    def add(self, tokens: Iterable[Token]) -> bool:
+        """Insert ``tokens`` unless a near-duplicate is already indexed; returns whether it was kept."""
+
+        token_set = frozenset(tokens)
+        signature = self.signature(token_set)
+        if self.is_duplicate(token_set, signature):
+            return False
+        self.insert(token_set, signature)
+        return True
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, Optional
+
+
+# Called with the current stage name and the overall run fraction in [0, 1].
+ProgressCallback = Callable[[str, float], None]
+
+# Stages in execution order with their share of the overall progress bar.
+PIPELINE_STAGES = (
+    ("fetch", 0.1),
+    ("normalize", 0.2),
+    ("dedup", 0.2),
+    ("sentiment", 0.25),
+    ("cluster", 0.15),
+    ("summarize", 0.1),
+)
+
+
+class StageProgress:
+    """Maps per-stage fractions onto one monotonically increasing overall fraction."""
+
+    def __init__(self, callback: Optional[ProgressCallback] = None) -> None:
+        self._callback = callback
+        self._offsets: Dict[str, float] = {}
+        self._weights: Dict[str, float] = {}
+        offset = 0.0
+        for stage, weight in PIPELINE_STAGES:
+            self._offsets[stage] = offset
+            self._weights[stage] = weight
+            offset += weight
+        self._last = 0.0
+
+    def update(self, stage: str, fraction: float = 1.0) -> None:
+        if self._callback is None:
+            return
+        fraction = min(max(fraction, 0.0), 1.0)
+        overall = min(1.0, self._offsets[stage] + self._weights[stage] * fraction)
+        if overall < self._last:
+            return
+        self._last = overall
+        self._callback(stage, round(overall, 4))
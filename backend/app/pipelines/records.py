@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+
+# A token as the dedup and clustering indexes see it: a ``Vocabulary`` id within one
+# run, or the token string where state outlives the run (incremental baselines).
+Token = Hashable
+
+
+class Vocabulary:
+    """Interns token strings to dense integer ids for the lifetime of one run."""
+
+    __slots__ = ("_ids", "_tokens")
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._tokens: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def _ids_for(self, tokens: Iterable[str]) -> List[int]:
+        ids = self._ids
+        encoded = []
+        for token in tokens:
+            token_id = ids.get(token)
+            if token_id is None:
+                token_id = ids[token] = len(self._tokens)
+                self._tokens.append(sys.intern(token))
+            encoded.append(token_id)
+        return encoded
+
+    def encode(self, tokens: Iterable[str]) -> array:
+        return array("I", self._ids_for(tokens))
+
+    def encode_with_set(self, tokens: Iterable[str]) -> Tuple[array, FrozenSet[int]]:
+        # The set is built from the vocabulary's own int objects so records share them.
+        token_ids = self._ids_for(tokens)
+        return array("I", token_ids), frozenset(token_ids)
+
+    def token(self, token_id: int) -> str:
+        return self._tokens[token_id]
+
+    def decode(self, token_ids: Iterable[int]) -> List[str]:
+        tokens = self._tokens
+        return [tokens[token_id] for token_id in token_ids]
+
+
+class ItemRecord:
+    """A processed item plus its tokens, computed once and shared by every stage."""
+
+    __slots__ = ("item", "token_ids", "token_set")
+
+    def __init__(self, item: Dict[str, Any], token_ids: array, token_set: Optional[FrozenSet[int]] = None) -> None:
+        self.item = item
+        self.token_ids = token_ids
+        self.token_set: FrozenSet[int] = frozenset(token_ids) if token_set is None else token_set
+
+
+def build_records(
+    items: Sequence[Dict[str, Any]],
+    vocabulary: Vocabulary,
+    tokenizer: Callable[[str], List[str]],
+) -> List[ItemRecord]:
+    records = []
+    for item in items:
+        token_ids, token_set = vocabulary.encode_with_set(tokenizer(item.get("clean_text", "")))
+        records.append(ItemRecord(item, token_ids, token_set))
+    return records
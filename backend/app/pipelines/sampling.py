@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import heapq
+import math
+import random
+import zlib
+from bisect import bisect_right
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from ..schemas.research import ResearchDepth, ResearchRequest
+
+
+# Items per platform a default-depth run analyses, a sample of the up to
+# ``collectors.DEPTH_LIMITS`` items fetched from each source.
+DEFAULT_SAMPLE_PER_PLATFORM = 200
+# Lower engagement bounds of every tier above the first; engagement is heavy-tailed, so tiers grow tenfold.
+ENGAGEMENT_TIERS = (1.0, 10.0, 100.0)
+# Candidates default-depth dedup and clustering score per item before giving up on a match.
+APPROX_CANDIDATES = 32
+
+
+class DepthPlan:
+    """What a run's depth spends on analysis.
+
+    Deep runs analyse every collected item with the exact algorithms. Default
+    runs analyse at most ``sample_per_platform`` items of each platform, drawn
+    by ``StratifiedSampler``, and dedup and clustering score at most
+    ``max_candidates`` candidates per item, so their cost is bounded however
+    much was fetched.
+    """
+
+    __slots__ = ("depth", "sample_per_platform", "max_candidates", "seed")
+
+    def __init__(
+        self,
+        depth: str,
+        sample_per_platform: Optional[int] = None,
+        max_candidates: Optional[int] = None,
+        seed: int = 0,
+    ) -> None:
+        self.depth = depth
+        self.sample_per_platform = sample_per_platform
+        self.max_candidates = max_candidates
+        self.seed = seed
+
+    @property
+    def exact(self) -> bool:
+        return self.max_candidates is None
+
+
+def depth_plan(request: ResearchRequest) -> DepthPlan:
+    if request.depth == ResearchDepth.deep:
+        return DepthPlan(request.depth.value)
+    # Seeded by the topic so a repeated request, and its cached result, sees the same sample.
+    return DepthPlan(
+        request.depth.value,
+        DEFAULT_SAMPLE_PER_PLATFORM,
+        APPROX_CANDIDATES,
+        zlib.crc32(request.topic.encode("utf-8")),
+    )
+
+
+def platform_of(item: Dict[str, Any]) -> str:
+    return str(item.get("platform") or "unknown")
+
+
+def engagement_tier(engagement: float) -> int:
+    return bisect_right(ENGAGEMENT_TIERS, engagement)
+
+
+def may_exceed(items: Iterable[Dict[str, Any]], per_platform: int) -> bool:
+    """Whether some platform in ``items`` may have more than ``per_platform`` items.
+
+    Lists are counted. A stream is trusted when it declares a per-source
+    ``limit`` (as ``CollectionStream`` does); any other stream may exceed.
+    """
+
+    if isinstance(items, Sequence):
+        return max(Counter(platform_of(item) for item in items).values(), default=0) > per_platform
+    limit = getattr(items, "limit", None)
+    return limit is None or limit > per_platform
+
+
+def allocate(counts: Dict[Hashable, int], budget: int) -> Dict[Hashable, int]:
+    """Split ``budget`` over strata in proportion to the square root of their sizes.
+
+    Square-root allocation gives small strata, such as the few posts with high
+    engagement, a larger share than their size would, so the clusters they
+    carry survive sampling. Seats go one at a time to the stratum with the
+    highest ``sqrt(size) / (seats + 1)``, which never overshoots the budget or
+    a stratum's size.
+    """
+
+    if sum(counts.values()) <= budget:
+        return dict(counts)
+    quotas = {key: 0 for key in counts}
+    heap = [(-math.sqrt(count), key) for key, count in sorted(counts.items()) if count]
+    heapq.heapify(heap)
+    for _ in range(budget):
+        _, key = heapq.heappop(heap)
+        quotas[key] += 1
+        if quotas[key] < counts[key]:
+            heapq.heappush(heap, (-math.sqrt(counts[key]) / (quotas[key] + 1), key))
+    return quotas
+
+
+class StratifiedSampler:
+    """Sample of a stream stratified by platform and engagement tier.
+
+    Every (platform, tier) stratum keeps a uniform reservoir of up to
+    ``per_platform`` items, so memory stays bounded however long the stream
+    is. ``sample`` splits each platform's budget over its tiers with
+    ``allocate`` and returns the chosen items in arrival order.
+    """
+
+    def __init__(self, per_platform: int, engagement: Callable[[Dict[str, Any]], float], seed: int = 0) -> None:
+        self.per_platform = per_platform
+        self._engagement = engagement
+        self._rng = random.Random(seed)
+        self._reservoirs: Dict[Tuple[str, int], List[Tuple[int, Dict[str, Any]]]] = {}
+        self._seen: Dict[Tuple[str, int], int] = {}
+        self._quotas: Dict[Tuple[str, int], int] = {}
+        self.items_seen = 0
+
+    def add(self, item: Dict[str, Any]) -> None:
+        key = (platform_of(item), engagement_tier(self._engagement(item)))
+        seen = self._seen.get(key, 0) + 1
+        self._seen[key] = seen
+        reservoir = self._reservoirs.setdefault(key, [])
+        entry = (self.items_seen, item)
+        self.items_seen += 1
+        if len(reservoir) < self.per_platform:
+            reservoir.append(entry)
+        else:
+            slot = self._rng.randrange(seen)
+            if slot < self.per_platform:
+                reservoir[slot] = entry
+
+    def extend(self, items: Iterable[Dict[str, Any]]) -> None:
+        for item in items:
+            self.add(item)
+
+    def sample(self) -> List[Dict[str, Any]]:
+        quotas: Dict[Tuple[str, int], int] = {}
+        for platform in sorted({platform for platform, _ in self._seen}):
+            tiers = {key: count for key, count in self._seen.items() if key[0] == platform}
+            quotas.update(allocate(tiers, self.per_platform))
+        chosen: List[Tuple[int, Dict[str, Any]]] = []
+        for key, quota in sorted(quotas.items()):
+            reservoir = self._reservoirs[key]
+            # A reservoir is a uniform sample of its stratum, and so is a uniform subset of it.
+            chosen.extend(reservoir if quota >= len(reservoir) else self._rng.sample(reservoir, quota))
+        self._quotas = quotas
+        chosen.sort(key=lambda entry: entry[0])
+        return [item for _, item in chosen]
+
+    def report(self) -> Dict[str, Any]:
+        """How the last ``sample`` was drawn, for the run's payload."""
+
+        return {
+            "method": "stratified",
+            "per_platform": self.per_platform,
+            "items_seen": self.items_seen,
+            "items_analysed": sum(self._quotas.values()),
+            "strata": {
+                f"{platform}:{tier}": {"seen": self._seen[(platform, tier)], "sampled": quota}
+                for (platform, tier), quota in sorted(self._quotas.items())
+            },
+        }
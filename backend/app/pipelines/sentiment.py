@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+NEUTRAL_SENTIMENT = {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+# Batches smaller than this are scored inline; pickling and IPC would cost more than they save.
+PROCESS_POOL_MIN_ITEMS = 2000
+CHUNK_SIZE = 250
+# Texts longer than this are always scored; stripping URLs from them is not worth checking.
+SHORT_CIRCUIT_MAX_LENGTH = 2048
+# Worker count used when ``score_texts`` is not given one; ``None`` means one per core.
+# Pipeline worker processes pin this to 1 so they never start a nested pool.
+DEFAULT_WORKERS: Optional[int] = None
+
+_URL_PATTERN = re.compile(r"https?://\S+", re.IGNORECASE)
+
+_analyzer: Any = None
+_analyzer_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_analyzer() -> Any:
+    """Process-wide VADER analyzer, loaded on first use; ``None`` when vaderSentiment is missing."""
+
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                try:
+                    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+                except ImportError:  # pragma: no cover - dependency missing only in unsupported envs
+                    return None
+                _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def needs_scoring(text: Optional[str]) -> bool:
+    if not text or text.isspace():
+        return False
+    if len(text) > SHORT_CIRCUIT_MAX_LENGTH or "http" not in text.lower():
+        return True
+    return bool(_URL_PATTERN.sub("", text).strip())
+
+
+def _score_chunk(texts: Sequence[str]) -> List[Dict[str, float]]:
+    analyzer = get_analyzer()
+    if analyzer is None:
+        return [dict(NEUTRAL_SENTIMENT) for _ in texts]
+    return [analyzer.polarity_scores(text) for text in texts]
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers avoid forking a threaded server; each preloads the lexicon once.
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=get_analyzer,
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the scoring worker processes; the next pooled batch starts new ones."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def score_texts(
+    texts: Sequence[Optional[str]],
+    workers: Optional[int] = None,
+    pool_min_items: int = PROCESS_POOL_MIN_ITEMS,
+) -> Tuple[List[Dict[str, float]], Dict[str, Any]]:
+    """Score a batch of texts, returning the scores and the stage timings."""
+
+    started = time.perf_counter()
+    get_analyzer()
+    init_ms = (time.perf_counter() - started) * 1000.0
+
+    scores: List[Dict[str, float]] = [NEUTRAL_SENTIMENT for _ in texts]
+    positions = [idx for idx, text in enumerate(texts) if needs_scoring(text)]
+    pending = [texts[idx] for idx in positions]
+
+    workers = workers or DEFAULT_WORKERS or os.cpu_count() or 1
+    mode = "inline"
+    scored: List[Dict[str, float]] = []
+    if workers > 1 and len(pending) >= pool_min_items:
+        chunks = [pending[start : start + CHUNK_SIZE] for start in range(0, len(pending), CHUNK_SIZE)]
+        try:
+            for chunk_scores in _get_pool(workers).map(_score_chunk, chunks):
+                scored.extend(chunk_scores)
+            mode = "process_pool"
+        except (BrokenProcessPool, OSError):
+            shutdown_pool()
+            scored = []
+        except (CancelledError, RuntimeError):
+            # The pool was shut down under this batch, by ``shutdown_pool``; score it inline.
+            scored = []
+    if mode == "inline":
+        scored = _score_chunk(pending)
+
+    for idx, score in zip(positions, scored):
+        scores[idx] = score
+    scores = [dict(score) if score is NEUTRAL_SENTIMENT else score for score in scores]
+
+    wall_ms = (time.perf_counter() - started) * 1000.0
+    timings = {
+        "init_ms": round(init_ms, 3),
+        "wall_ms": round(wall_ms, 3),
+        "per_item_us": round((wall_ms - init_ms) * 1000.0 / len(texts), 3) if texts else 0.0,
+        "items": len(texts),
+        "scored": len(pending),
+        "short_circuited": len(texts) - len(pending),
+        "mode": mode,
+    }
+    return scores, timings
+
+
+def merge_timings(timings: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the timings of several ``score_texts`` calls made for one run."""
+
+    items = sum(entry["items"] for entry in timings)
+    init_ms = sum(entry["init_ms"] for entry in timings)
+    wall_ms = sum(entry["wall_ms"] for entry in timings)
+    return {
+        "init_ms": round(init_ms, 3),
+        "wall_ms": round(wall_ms, 3),
+        "per_item_us": round((wall_ms - init_ms) * 1000.0 / items, 3) if items else 0.0,
+        "items": items,
+        "scored": sum(entry["scored"] for entry in timings),
+        "short_circuited": sum(entry["short_circuited"] for entry in timings),
+        "mode": "process_pool" if any(entry["mode"] == "process_pool" for entry in timings) else "inline",
+        "batches": len(timings),
+    }
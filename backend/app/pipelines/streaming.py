@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .sentiment import PROCESS_POOL_MIN_ITEMS, merge_timings, score_texts
+
+
+# Raw items pulled through the per-batch stages at a time.
+BATCH_SIZE = 256
+
+# Called with a snapshot of what a streaming run has produced so far.
+PartialCallback = Callable[[Dict[str, Any]], None]
+
+
+def iter_batches(items: Iterable[Dict[str, Any]], size: int = BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Consecutive lists of up to ``size`` items, pulled lazily so only one batch is held."""
+
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def known_length(items: Optional[Iterable[Any]]) -> Optional[int]:
+    return len(items) if isinstance(items, Sequence) else None
+
+
+class SentimentBatcher:
+    """Buffers kept items and scores them once enough are pending.
+
+    Scoring waits for ``flush_size`` texts so large streams still reach the
+    sentiment process pool instead of paying its overhead per small batch.
+    """
+
+    def __init__(self, flush_size: int = PROCESS_POOL_MIN_ITEMS) -> None:
+        self.flush_size = flush_size
+        self._pending: List[Dict[str, Any]] = []
+        self._timings: List[Dict[str, Any]] = []
+
+    def add(self, items: Iterable[Dict[str, Any]]) -> None:
+        self._pending.extend(items)
+        if len(self._pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        sentiments, timings = score_texts([item.get("text", "") for item in self._pending])
+        for item, sentiment in zip(self._pending, sentiments):
+            item["sentiment"] = sentiment
+        self._timings.append(timings)
+        self._pending = []
+
+    def timings(self) -> Dict[str, Any]:
+        self.flush()
+        if not self._timings:
+            return score_texts([])[1]
+        return merge_timings(self._timings)
@@ -17,15 +17,67 @@ class ResearchRequest(BaseModel):
     depth: ResearchDepth = ResearchDepth.default
     sources: List[Literal["reddit", "x"]] = Field(default_factory=lambda: ["reddit", "x"])
     sample_limit: Optional[int] = Field(None, ge=1, le=1000)
+    baseline_run_id: Optional[str] = Field(
+        None,
+        description="Completed run to extend incrementally; only items newer than it are processed",
+    )
+    profile: Optional[Literal["cprofile", "pyinstrument"]] = Field(
+        None,
+        description="Profile the run's pipeline and attach the report to the payload metrics; bypasses the result cache",
+    )
+    deadline_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        le=3600,
+        description="Stop taking new work this many seconds after the run starts and return what was analysed, marked partial",
+    )
+    max_items: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Analyse at most this many fetched items; the result is marked partial when more were available",
+    )
 
 
 class ResearchRunStatus(BaseModel):
     run_id: str
-    status: Literal["queued", "running", "completed", "failed"]
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
     progress: float = Field(ge=0.0, le=1.0, default=0.0)
+    stage: Optional[str] = Field(None, description="Last pipeline stage that reported progress")
     message: Optional[str] = None
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
+    queue_position: Optional[int] = Field(None, ge=1, description="1-based position while the run is queued")
+
+
+class ResearchBatchRequest(BaseModel):
+    requests: List[ResearchRequest] = Field(..., min_items=1, max_items=256, description="Runs to schedule together")
+
+
+class ResearchBatchRun(BaseModel):
+    run_id: str
+    status: Literal["queued"] = "queued"
+    deduplicated: bool = Field(False, description="An identical request earlier in the batch already owns this run")
+
+
+class ResearchBatchResponse(BaseModel):
+    runs: List[ResearchBatchRun] = Field(default_factory=list, description="One entry per request, in request order")
+    unique_runs: int = Field(0, description="Distinct runs created for the batch")
+
+
+class ResearchBulkStatusRequest(BaseModel):
+    run_ids: List[str] = Field(..., min_items=1, max_items=1000)
+
+
+class ResearchBulkStatusResponse(BaseModel):
+    statuses: List[ResearchRunStatus] = Field(default_factory=list)
+    missing: List[str] = Field(default_factory=list, description="Requested run ids that are not known")
+
+
+class ResearchPartialResult(BaseModel):
+    run_id: str
+    items_received: int = Field(0, description="Raw items the pipeline has read so far")
+    items_kept: Optional[int] = Field(None, description="Items left after deduplication, when already known")
+    clusters: List[dict] = Field(default_factory=list, description="Largest clusters so far")
 
 
 class ResearchSummary(BaseModel):
@@ -38,6 +90,7 @@ class ResearchSummary(BaseModel):
     recommended_actions: List[str] = Field(default_factory=list)
     top_sources: List[str] = Field(default_factory=list)
     confidence: Literal["low", "medium", "high"] = "low"
+    partial: bool = Field(False, description="Cut off by a deadline or item budget, so based on part of the items")
 
 
 class ResearchJSONPayload(BaseModel):
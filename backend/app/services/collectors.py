@@ -0,0 +1,460 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from ..schemas.research import ResearchDepth, ResearchRequest
+
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
+
+
+# Items fetched per source when the request sets no ``sample_limit``. Default runs fetch
+# past the items they analyse (``sampling.DEFAULT_SAMPLE_PER_PLATFORM``) and sample down,
+# but stop well before a deep run.
+DEPTH_LIMITS = {ResearchDepth.default: 500, ResearchDepth.deep: 1000}
+# How often a rate-limited (429) page is retried before the source gives up.
+MAX_RETRIES = 3
+# Pages fetched ahead of the pipeline before the sources are made to wait.
+BUFFER_PAGES = 8
+
+FetchProgress = Callable[[float], None]
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average with bursts of up to ``capacity``.
+
+    One bucket is shared by every run fetching from a source, so concurrent runs
+    together stay inside the source's limits. A ``rate`` of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1.0:
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1.0
+
+    def penalize(self, seconds: float) -> None:
+        """Hold back further requests for ``seconds`` after the source signalled a rate limit."""
+
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+def _in_window(timestamp: datetime, request: ResearchRequest) -> bool:
+    day = timestamp.date()
+    if request.from_date and day < request.from_date:
+        return False
+    if request.to_date and day > request.to_date:
+        return False
+    return True
+
+
+def _older_than_window(timestamp: datetime, from_date: Optional[date]) -> bool:
+    return from_date is not None and timestamp.date() < from_date
+
+
+class Source(ABC):
+    """A paginated search API that yields raw items in the shape the pipelines read."""
+
+    name = ""
+
+    def __init__(self, base_url: str, bucket: TokenBucket, page_size: int = 100) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.bucket = bucket
+        self.page_size = page_size
+
+    def unavailable_reason(self) -> Optional[str]:
+        return None
+
+    @abstractmethod
+    def pages(self, client: httpx.AsyncClient, request: ResearchRequest, limit: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        ...
+
+    async def _get(self, client: httpx.AsyncClient, url: str, **kwargs: Any) -> Dict[str, Any]:
+        for attempt in range(MAX_RETRIES + 1):
+            await self.bucket.acquire()
+            response = await client.get(url, **kwargs)
+            if response.status_code == 429 and attempt < MAX_RETRIES:
+                try:
+                    retry_after = float(response.headers.get("Retry-After", "1"))
+                except ValueError:
+                    retry_after = 1.0
+                self.bucket.penalize(retry_after)
+                continue
+            response.raise_for_status()
+            return response.json()
+        raise RuntimeError("rate limited")  # pragma: no cover - loop always returns or raises
+
+
+class RedditSource(Source):
+    name = "reddit"
+
+    def __init__(self, base_url: str, bucket: TokenBucket, user_agent: str, page_size: int = 100) -> None:
+        super().__init__(base_url, bucket, page_size)
+        self.user_agent = user_agent
+
+    async def pages(self, client: httpx.AsyncClient, request: ResearchRequest, limit: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        after: Optional[str] = None
+        fetched = 0
+        while fetched < limit:
+            params = {"q": request.topic, "sort": "new", "limit": min(self.page_size, limit - fetched), "raw_json": 1}
+            if after:
+                params["after"] = after
+            body = await self._get(
+                client,
+                f"{self.base_url}/search.json",
+                params=params,
+                headers={"User-Agent": self.user_agent},
+            )
+            data = body.get("data") or {}
+            children = data.get("children") or []
+            page = []
+            exhausted = False
+            for child in children:
+                item = self.parse(child.get("data") or {})
+                timestamp = item.pop("_timestamp")
+                # Results are newest first, so nothing after an item older than the window matters.
+                if _older_than_window(timestamp, request.from_date):
+                    exhausted = True
+                    break
+                if _in_window(timestamp, request):
+                    page.append(item)
+            fetched += len(children)
+            if page:
+                yield page
+            after = data.get("after")
+            if exhausted or not children or not after:
+                return
+
+    @staticmethod
+    def parse(post: Dict[str, Any]) -> Dict[str, Any]:
+        timestamp = datetime.fromtimestamp(float(post.get("created_utc") or 0), tz=timezone.utc).replace(tzinfo=None)
+        body = post.get("selftext") or ""
+        permalink = post.get("permalink")
+        return {
+            "id": f"reddit_{post.get('id', '')}",
+            "platform": "reddit",
+            "author": post.get("author") or "",
+            "timestamp": timestamp.isoformat(),
+            "text": f"{post.get('title') or ''}\n{body}".strip(),
+            "score": post.get("score"),
+            "replies": post.get("num_comments"),
+            "url": f"https://www.reddit.com{permalink}" if permalink else post.get("url"),
+            "subreddit_or_hashtag": post.get("subreddit"),
+            "removed_content_flag": body in ("[removed]", "[deleted]"),
+            "_timestamp": timestamp,
+        }
+
+
+class XSource(Source):
+    name = "x"
+
+    def __init__(self, base_url: str, bucket: TokenBucket, bearer_token: Optional[str], page_size: int = 100) -> None:
+        super().__init__(base_url, bucket, page_size)
+        self.bearer_token = bearer_token
+
+    def unavailable_reason(self) -> Optional[str]:
+        return None if self.bearer_token else "X_BEARER_TOKEN is not configured"
+
+    async def pages(self, client: httpx.AsyncClient, request: ResearchRequest, limit: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        next_token: Optional[str] = None
+        fetched = 0
+        while fetched < limit:
+            params: Dict[str, Any] = {
+                "query": request.topic,
+                # The recent search API accepts 10-100 results per page.
+                "max_results": max(10, min(self.page_size, limit - fetched)),
+                "tweet.fields": "created_at,public_metrics,author_id,lang,entities",
+            }
+            if next_token:
+                params["next_token"] = next_token
+            body = await self._get(
+                client,
+                f"{self.base_url}/2/tweets/search/recent",
+                params=params,
+                headers={"Authorization": f"Bearer {self.bearer_token}"},
+            )
+            tweets = body.get("data") or []
+            page = []
+            for tweet in tweets[: limit - fetched]:
+                item = self.parse(tweet)
+                if _in_window(item.pop("_timestamp"), request):
+                    page.append(item)
+            fetched += len(tweets)
+            if page:
+                yield page
+            next_token = (body.get("meta") or {}).get("next_token")
+            if not tweets or not next_token:
+                return
+
+    @staticmethod
+    def parse(tweet: Dict[str, Any]) -> Dict[str, Any]:
+        created_at = tweet.get("created_at")
+        timestamp = (
+            datetime.fromisoformat(created_at.replace("Z", "+00:00")).astimezone(timezone.utc).replace(tzinfo=None)
+            if created_at
+            else datetime.utcnow()
+        )
+        metrics = tweet.get("public_metrics") or {}
+        hashtags = ((tweet.get("entities") or {}).get("hashtags")) or []
+        return {
+            "id": f"x_{tweet.get('id', '')}",
+            "platform": "x",
+            "author": tweet.get("author_id") or "",
+            "timestamp": timestamp.isoformat(),
+            "text": tweet.get("text") or "",
+            "score": metrics.get("like_count"),
+            "replies": metrics.get("reply_count"),
+            "retweets_or_shares": metrics.get("retweet_count"),
+            "url": f"https://x.com/i/web/status/{tweet.get('id', '')}",
+            "subreddit_or_hashtag": f"#{hashtags[0]['tag']}" if hashtags and hashtags[0].get("tag") else None,
+            "language": tweet.get("lang") or "en",
+            "_timestamp": timestamp,
+        }
+
+
+class CollectionFailed(RuntimeError):
+    """Raised when every requested source failed and nothing was collected."""
+
+
+class CollectionStream:
+    """Raw items in the order the sources return them.
+
+    Iterating pulls pages from a bounded buffer that the sources fill
+    concurrently, so a slow consumer holds the sources back instead of letting
+    pages pile up. ``errors`` and ``timings`` are complete once iteration ends.
+    ``limit``, when known, is the most items any one source yields.
+    """
+
+    def __init__(
+        self,
+        pages: Iterable[List[Dict[str, Any]]],
+        sources: Sequence[str] = (),
+        errors: Optional[Dict[str, str]] = None,
+        timings: Optional[Dict[str, float]] = None,
+        limit: Optional[int] = None,
+    ) -> None:
+        self._pages = pages
+        self.limit = limit
+        self.sources = list(dict.fromkeys(sources))
+        self.errors: Dict[str, str] = {} if errors is None else errors
+        self.timings: Dict[str, float] = {} if timings is None else timings
+        self.received = 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for page in self._pages:
+            self.received += len(page)
+            yield from page
+
+    def close(self) -> None:
+        """Stop fetching; pages not yet consumed are discarded."""
+
+        close = getattr(self._pages, "close", None)
+        if close is not None:
+            close()
+
+    def outcome(self) -> Optional[str]:
+        """Note on the sources that failed; raises ``CollectionFailed`` when all of them did."""
+
+        if not self.errors:
+            return None
+        message = "; ".join(f"{source}: {error}" for source, error in sorted(self.errors.items()))
+        if not self.received and self.sources and set(self.sources) <= set(self.errors):
+            raise CollectionFailed(f"Collection failed ({message})")
+        return f"Some sources failed ({message})"
+
+
+def source_limit(request: ResearchRequest) -> int:
+    return request.sample_limit or DEPTH_LIMITS.get(request.depth, DEPTH_LIMITS[ResearchDepth.default])
+
+
+def fetch_metrics(stream: CollectionStream) -> Dict[str, Any]:
+    """The fetch stage's entry for a run's payload metrics; sources are fetched concurrently."""
+
+    return {
+        "wall_ms": round(max(stream.timings.values(), default=0.0) * 1000.0, 3),
+        "items": stream.received,
+        "sources": {source: round(seconds * 1000.0, 3) for source, seconds in sorted(stream.timings.items())},
+        "errors": dict(stream.errors),
+    }
+
+
+# Put on the buffer once the sources are done.
+_DONE: List[Dict[str, Any]] = []
+
+
+def _iter_pages(
+    buffer: "queue.SimpleQueue[List[Dict[str, Any]]]",
+    future: Future,
+    taken: Callable[[], None],
+) -> Iterator[List[Dict[str, Any]]]:
+    try:
+        while True:
+            page = buffer.get()
+            if page is _DONE:
+                future.result()
+                return
+            taken()
+            yield page
+    finally:
+        future.cancel()
+
+
+class SourceCollector:
+    """Fetches items from every requested source concurrently.
+
+    All runs share one event loop on a background thread, one pooled HTTP
+    client and one token bucket per source. ``stream`` hands pages to the
+    calling run worker as they arrive; a failing source is reported in
+    ``errors`` and does not affect the others.
+    """
+
+    def __init__(self, sources: Dict[str, Source], timeout: float = 10.0, max_connections: int = 20) -> None:
+        self.sources = sources
+        self._timeout = timeout
+        self._max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="source-collector", daemon=True)
+        self._thread.start()
+
+    def stream(
+        self,
+        request: ResearchRequest,
+        progress: Optional[FetchProgress] = None,
+        buffer_pages: int = BUFFER_PAGES,
+    ) -> CollectionStream:
+        # The worker blocks on the buffer; the sources wait on ``room``, released as pages are taken.
+        buffer: "queue.SimpleQueue[List[Dict[str, Any]]]" = queue.SimpleQueue()
+        room = asyncio.Semaphore(max(1, buffer_pages))
+        errors: Dict[str, str] = {}
+        timings: Dict[str, float] = {}
+        future = asyncio.run_coroutine_threadsafe(
+            self._produce(request, progress, buffer, room, errors, timings),
+            self._loop,
+        )
+        pages = _iter_pages(buffer, future, lambda: self._make_room(room))
+        return CollectionStream(pages, request.sources, errors, timings, source_limit(request))
+
+    def _make_room(self, room: asyncio.Semaphore) -> None:
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(room.release)
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._client = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _produce(
+        self,
+        request: ResearchRequest,
+        progress: Optional[FetchProgress],
+        buffer: "queue.SimpleQueue[List[Dict[str, Any]]]",
+        room: asyncio.Semaphore,
+        errors: Dict[str, str],
+        timings: Dict[str, float],
+    ) -> None:
+        try:
+            await self._fetch_all(request, progress, buffer, room, errors, timings)
+        finally:
+            buffer.put(_DONE)
+
+    async def _fetch_all(
+        self,
+        request: ResearchRequest,
+        progress: Optional[FetchProgress],
+        buffer: "queue.SimpleQueue[List[Dict[str, Any]]]",
+        room: asyncio.Semaphore,
+        errors: Dict[str, str],
+        timings: Dict[str, float],
+    ) -> None:
+        # httpx is imported with the first collection rather than at application startup.
+        import httpx
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self._timeout,
+                limits=httpx.Limits(max_connections=self._max_connections, max_keepalive_connections=self._max_connections),
+            )
+        limit = source_limit(request)
+        sources = []
+        for name in dict.fromkeys(request.sources):
+            source = self.sources.get(name)
+            reason = "unsupported source" if source is None else source.unavailable_reason()
+            if reason:
+                errors[name] = reason
+            else:
+                sources.append(source)
+
+        seen: set = set()
+        target = max(limit * len(sources), 1)
+
+        async def drain(source: Source) -> None:
+            started = time.perf_counter()
+            try:
+                async for page in source.pages(self._client, request, limit):
+                    fresh = [item for item in page if item["id"] not in seen]
+                    seen.update(item["id"] for item in fresh)
+                    if fresh:
+                        await room.acquire()
+                        buffer.put(fresh)
+                    if progress is not None:
+                        progress(min(len(seen) / target, 1.0))
+            except (httpx.HTTPError, ValueError, KeyError, TypeError) as exc:
+                errors[source.name] = f"{type(exc).__name__}: {exc}"
+            finally:
+                timings[source.name] = round(time.perf_counter() - started, 4)
+
+        await asyncio.gather(*(drain(source) for source in sources))
+
+
+def build_collector(settings: Any) -> SourceCollector:
+    burst = settings.COLLECTOR_BURST
+    sources: Dict[str, Source] = {
+        "reddit": RedditSource(
+            settings.REDDIT_BASE_URL,
+            TokenBucket(settings.REDDIT_RATE_PER_SECOND, burst),
+            settings.REDDIT_USER_AGENT,
+        ),
+        "x": XSource(
+            settings.X_API_BASE_URL,
+            TokenBucket(settings.X_RATE_PER_SECOND, burst),
+            settings.X_BEARER_TOKEN,
+        ),
+    }
+    return SourceCollector(
+        sources,
+        timeout=settings.COLLECTOR_TIMEOUT_SECONDS,
+        max_connections=settings.COLLECTOR_MAX_CONNECTIONS,
+    )
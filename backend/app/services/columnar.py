@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# numpy and pyarrow are imported on first use by ``_load_backends``; both are slow to import
+# and only needed once a payload is written or read.
+np: Any = None
+pa: Any = None
+_backends_loaded = False
+
+
+FORMAT_VERSION = 1
+ITEM_SECTIONS = ("items", "clusters")
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+# Marks a key missing from an item in "json" columns; JSON text is never empty.
+_ABSENT = ""
+
+
+def _load_backends() -> None:
+    global np, pa, _backends_loaded
+    if _backends_loaded:
+        return
+    try:  # pragma: no cover - optional dependency
+        import numpy
+    except ImportError:  # pragma: no cover - lite installs have no numpy
+        numpy = None
+    try:  # pragma: no cover - optional dependency
+        import pyarrow
+    except ImportError:  # pragma: no cover - the numpy layout is used instead
+        pyarrow = None
+    np, pa = numpy, pyarrow
+    _backends_loaded = True
+
+
+def columnar_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None or importlib.util.find_spec("numpy") is not None
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+class PayloadReader(ABC):
+    """Read access to a stored run payload without materializing every item."""
+
+    @abstractmethod
+    def meta(self) -> Dict[str, Any]:
+        """Every payload key except ``items`` and ``clusters``."""
+
+    @abstractmethod
+    def clusters(self) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def item_count(self) -> int:
+        ...
+
+    @abstractmethod
+    def items(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        ...
+
+    def to_payload(self) -> Dict[str, Any]:
+        payload = self.meta()
+        payload["items"] = list(self.items())
+        payload["clusters"] = self.clusters()
+        return payload
+
+    def _bounds(self, offset: int, limit: Optional[int]) -> Tuple[int, int]:
+        count = self.item_count()
+        start = min(max(offset, 0), count)
+        stop = count if limit is None else min(count, start + limit)
+        return start, stop
+
+
+class DictPayloadReader(PayloadReader):
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self._payload = payload
+
+    def meta(self) -> Dict[str, Any]:
+        return {key: value for key, value in self._payload.items() if key not in ITEM_SECTIONS}
+
+    def clusters(self) -> List[Dict[str, Any]]:
+        return list(self._payload.get("clusters") or [])
+
+    def item_count(self) -> int:
+        return len(self._payload.get("items") or [])
+
+    def items(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        items = self._payload.get("items") or []
+        start, stop = self._bounds(offset, limit)
+        for index in range(start, stop):
+            item = items[index]
+            yield item if fields is None else {field: item[field] for field in fields if field in item}
+
+    def to_payload(self) -> Dict[str, Any]:
+        return self._payload
+
+
+def _column_kind(values: List[Any]) -> str:
+    if any(value is None for value in values):
+        return "json"
+    if all(isinstance(value, bool) for value in values):
+        return "bool"
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        return "int64" if all(_INT64_MIN <= value <= _INT64_MAX for value in values) else "json"
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        return "float64"
+    if all(isinstance(value, str) for value in values):
+        return "string"
+    return "json"
+
+
+def _item_columns(items: Sequence[Dict[str, Any]]) -> List[Tuple[str, str, List[Any]]]:
+    names: Dict[str, None] = {}
+    for item in items:
+        for key in item:
+            names.setdefault(key, None)
+    columns = []
+    for name in names:
+        present = all(name in item for item in items)
+        values = [item.get(name) for item in items]
+        kind = _column_kind(values) if present else "json"
+        if kind == "json":
+            values = [_dumps(item[name]) if name in item else _ABSENT for item in items]
+        columns.append((name, kind, values))
+    return columns
+
+
+def _write_strings(directory: Path, stem: str, values: List[str]) -> None:
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(directory / f"{stem}.offsets.npy", offsets)
+    with open(directory / f"{stem}.data", "wb") as handle:
+        for value in encoded:
+            handle.write(value)
+
+
+def write_columnar(directory: Path, payload: Dict[str, Any]) -> int:
+    """Write ``payload`` under ``directory``, replacing any previous copy; returns bytes written.
+
+    Items are stored column by column (Arrow IPC when pyarrow is installed,
+    otherwise one ``.npy`` file per numeric column and offsets + UTF-8 data for
+    text). Values that are not uniform scalars, such as sentiment dicts or token
+    lists, are stored as JSON text. The remaining payload keys and the clusters
+    are small and kept as JSON.
+    """
+
+    _load_backends()
+    items = payload.get("items") or []
+    temporary = directory.with_name(f".{directory.name}.{uuid.uuid4().hex}.tmp")
+    temporary.mkdir(parents=True)
+    try:
+        columns = _item_columns(items)
+        backend = "arrow" if pa is not None else "numpy"
+        if backend == "arrow":
+            _write_arrow(temporary, columns)
+        else:
+            _write_numpy(temporary, columns)
+        schema = {
+            "version": FORMAT_VERSION,
+            "backend": backend,
+            "rows": len(items),
+            "sections": [section for section in ITEM_SECTIONS if section in payload],
+            "columns": [{"name": name, "kind": kind} for name, kind, _ in columns],
+        }
+        (temporary / "schema.json").write_text(_dumps(schema), encoding="utf-8")
+        meta = {key: value for key, value in payload.items() if key not in ITEM_SECTIONS}
+        (temporary / "meta.json").write_text(_dumps(meta), encoding="utf-8")
+        (temporary / "clusters.json").write_text(_dumps(payload.get("clusters") or []), encoding="utf-8")
+
+        if directory.exists():
+            shutil.rmtree(directory)
+        os.replace(temporary, directory)
+    except BaseException:
+        shutil.rmtree(temporary, ignore_errors=True)
+        raise
+    return sum(path.stat().st_size for path in directory.iterdir())
+
+
+def _write_numpy(directory: Path, columns: List[Tuple[str, str, List[Any]]]) -> None:
+    for index, (_, kind, values) in enumerate(columns):
+        if kind in ("string", "json"):
+            _write_strings(directory, str(index), values)
+        else:
+            np.save(directory / f"{index}.npy", np.asarray(values, dtype=kind))
+
+
+def _write_arrow(directory: Path, columns: List[Tuple[str, str, List[Any]]]) -> None:
+    arrow_types = {"bool": pa.bool_(), "int64": pa.int64(), "float64": pa.float64(), "string": pa.string(), "json": pa.string()}
+    table = pa.table(
+        {str(index): pa.array(values, type=arrow_types[kind]) for index, (_, kind, values) in enumerate(columns)}
+    )
+    with pa.OSFile(str(directory / "items.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+class ColumnarPayloadReader(PayloadReader):
+    """Memory-mapped reader for a payload written by ``write_columnar``.
+
+    Only the columns and rows that are asked for are decoded.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        _load_backends()
+        self._directory = directory
+        schema = json.loads((directory / "schema.json").read_text(encoding="utf-8"))
+        if schema.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported payload format version: {schema.get('version')}")
+        self._backend = schema["backend"]
+        self._rows = schema["rows"]
+        self._sections = schema["sections"]
+        self._columns = [(column["name"], column["kind"]) for column in schema["columns"]]
+        self._index = {name: index for index, (name, _) in enumerate(self._columns)}
+        self._loaded: Dict[int, Any] = {}
+        self._table: Any = None
+
+    def meta(self) -> Dict[str, Any]:
+        return json.loads((self._directory / "meta.json").read_text(encoding="utf-8"))
+
+    def clusters(self) -> List[Dict[str, Any]]:
+        return json.loads((self._directory / "clusters.json").read_text(encoding="utf-8"))
+
+    def item_count(self) -> int:
+        return self._rows
+
+    def to_payload(self) -> Dict[str, Any]:
+        payload = super().to_payload()
+        for section in ITEM_SECTIONS:
+            if section not in self._sections:
+                del payload[section]
+        return payload
+
+    def items(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        start, stop = self._bounds(offset, limit)
+        if start >= stop:
+            return
+        selected = range(len(self._columns)) if fields is None else [self._index[f] for f in fields if f in self._index]
+        decoded = [(self._columns[index][0], self._columns[index][1], self._slice(index, start, stop)) for index in selected]
+        for row in range(stop - start):
+            item: Dict[str, Any] = {}
+            for name, kind, values in decoded:
+                value = values[row]
+                if kind == "json":
+                    if value == _ABSENT:
+                        continue
+                    value = json.loads(value)
+                item[name] = value
+            yield item
+
+    def _slice(self, index: int, start: int, stop: int) -> List[Any]:
+        if self._backend == "arrow":
+            return self._arrow_table().column(str(index)).slice(start, stop - start).to_pylist()
+        kind = self._columns[index][1]
+        column = self._load(index)
+        if kind not in ("string", "json"):
+            return column[start:stop].tolist()
+        offsets, data = column
+        bounds = offsets[start : stop + 1].tolist()
+        raw = data[bounds[0] : bounds[-1]].tobytes() if bounds[-1] > bounds[0] else b""
+        base = bounds[0]
+        return [raw[bounds[row] - base : bounds[row + 1] - base].decode("utf-8") for row in range(stop - start)]
+
+    def _load(self, index: int) -> Any:
+        column = self._loaded.get(index)
+        if column is not None:
+            return column
+        kind = self._columns[index][1]
+        if kind in ("string", "json"):
+            offsets = np.load(self._directory / f"{index}.offsets.npy", mmap_mode="r")
+            data_path = self._directory / f"{index}.data"
+            # Empty files cannot be memory-mapped.
+            data = np.memmap(data_path, dtype=np.uint8, mode="r") if data_path.stat().st_size else np.zeros(0, np.uint8)
+            column = (offsets, data)
+        else:
+            column = np.load(self._directory / f"{index}.npy", mmap_mode="r")
+        self._loaded[index] = column
+        return column
+
+    def _arrow_table(self) -> Any:
+        if self._table is None:
+            source = pa.memory_map(str(self._directory / "items.arrow"), "r")
+            self._table = pa.ipc.open_file(source).read_all()
+        return self._table
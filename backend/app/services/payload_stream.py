@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .columnar import PayloadReader
+
+try:  # pragma: no cover - optional dependency
+    import zstandard
+except ImportError:  # pragma: no cover - zstd is only offered when installed
+    zstandard = None
+
+
+# Lines are coalesced into chunks of about this size before being sent or compressed.
+CHUNK_BYTES = 64 * 1024
+
+
+def _dumps(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def iter_payload_records(
+    reader: PayloadReader,
+    fields: Optional[Sequence[str]] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Header, item and cluster records of a payload, one JSON object per NDJSON line.
+
+    The header carries every payload key except the item and cluster lists, plus
+    their totals. ``offset``/``limit`` page through the items; clusters are always
+    sent in full. ``fields`` projects item and cluster records.
+    """
+
+    clusters = reader.clusters()
+    header = reader.meta()
+    header.update(
+        {
+            "type": "run",
+            "items_total": reader.item_count(),
+            "clusters_total": len(clusters),
+            "offset": offset,
+            "limit": limit,
+        }
+    )
+    yield header
+
+    for item in reader.items(offset, limit, fields):
+        yield {"type": "item", **item}
+    for cluster in clusters:
+        if fields is not None:
+            cluster = {field: cluster[field] for field in fields if field in cluster}
+        yield {"type": "cluster", **cluster}
+
+
+def iter_ndjson(records: Iterable[Dict[str, Any]], chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    buffer: List[bytes] = []
+    size = 0
+    for record in records:
+        line = _dumps(record)
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def available_encodings() -> List[str]:
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported content coding from an ``Accept-Encoding`` header."""
+
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+
+    best: Optional[str] = None
+    best_quality = 0.0
+    for encoding in available_encodings():
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_chunks(chunks: Iterable[bytes], encoding: Optional[str]) -> Iterator[bytes]:
+    if encoding is None:
+        yield from chunks
+        return
+    if encoding == "zstd":
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    elif encoding == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    else:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
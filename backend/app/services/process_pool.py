@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import importlib
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..pipelines.control import RunCancelled, RunControl
+from ..schemas.research import ResearchRequest
+from .profiling import run_profiled
+
+
+ProgressFn = Callable[[str, float, str], None]
+
+_STOP = None
+# Seconds between checks for cancellation while a worker process runs a pipeline.
+CANCEL_POLL_SECONDS = 0.1
+
+# Worker-process globals, set once by ``_init_worker``.
+_progress_queue: Any = None
+_pipeline: Optional[Callable[..., Tuple[Dict[str, Any], Any]]] = None
+
+
+def report_progress(run_id: str, fraction: float, stage: str) -> None:
+    """Send a progress event from a worker process back to the parent."""
+
+    if _progress_queue is not None:
+        _progress_queue.put((run_id, fraction, stage))
+
+
+def _init_worker(progress_queue: Any, pipeline_path: str) -> None:
+    global _progress_queue, _pipeline
+
+    _progress_queue = progress_queue
+    module_name, _, func_name = pipeline_path.partition(":")
+    _pipeline = getattr(importlib.import_module(module_name), func_name)
+
+    from ..pipelines import sentiment
+
+    # The pool already spreads runs across cores; scoring stays inline in each worker.
+    sentiment.DEFAULT_WORKERS = 1
+    sentiment.get_analyzer()
+
+
+def _ping() -> bool:
+    return _pipeline is not None
+
+
+def _run_pipeline(
+    run_id: str,
+    request: ResearchRequest,
+    raw_items: Sequence[Dict[str, Any]],
+    max_items: Optional[int] = None,
+    deadline_at: Optional[float] = None,
+    cancel_event: Any = None,
+) -> Tuple[Dict[str, Any], Any]:
+    def progress(stage: str, fraction: float) -> None:
+        report_progress(run_id, fraction, stage)
+
+    control = None
+    if max_items is not None or deadline_at is not None or cancel_event is not None:
+        control = RunControl(
+            max_items,
+            deadline_at,
+            is_cancelled=cancel_event.is_set if cancel_event is not None else None,
+            poll_interval=CANCEL_POLL_SECONDS,
+        )
+    if request.profile:
+        (payload, summary), report = run_profiled(
+            request.profile, _pipeline, run_id, request, raw_items, progress, None, control
+        )
+        payload.setdefault("metrics", {})["profile"] = report
+    else:
+        payload, summary = _pipeline(run_id, request, raw_items, progress, None, control)
+    if control is not None and control.report() is not None:
+        payload["truncated"] = control.report()
+    return payload, summary
+
+
+class PipelineProcessPool:
+    """Warm worker processes that run a pipeline function off the server's GIL.
+
+    Workers are spawned (not forked) and import the pipeline module and the VADER
+    lexicon once in their initializer. Progress events travel back over a
+    multiprocessing queue and are delivered to ``on_progress`` on a listener thread.
+    Cancellations reach a worker through an event held by a manager process,
+    which the worker's pipeline polls at its checkpoints.
+    """
+
+    def __init__(
+        self,
+        pipeline: Union[str, Callable[..., Tuple[Dict[str, Any], Any]]],
+        workers: int,
+        on_progress: Optional[ProgressFn] = None,
+    ) -> None:
+        # Workers import the pipeline themselves, so a ``module:function`` path is enough.
+        pipeline_path = pipeline if isinstance(pipeline, str) else f"{pipeline.__module__}:{pipeline.__name__}"
+        context = multiprocessing.get_context("spawn")
+        self._workers = max(1, workers)
+        self._on_progress = on_progress
+        self._progress_queue = context.Queue()
+        self._context = context
+        self._manager: Any = None
+        self._manager_lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue, pipeline_path),
+        )
+        self._listener = threading.Thread(target=self._listen, name="pipeline-progress", daemon=True)
+        self._listener.start()
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def warm(self) -> List[Future]:
+        """Start every worker now instead of on the first run."""
+
+        return [self._executor.submit(_ping) for _ in range(self._workers)]
+
+    def run(
+        self,
+        run_id: str,
+        request: ResearchRequest,
+        raw_items: Sequence[Dict[str, Any]],
+        control: Optional[RunControl] = None,
+    ) -> Tuple[Dict[str, Any], Any]:
+        """Run the pipeline in a worker and wait for its result.
+
+        The worker applies ``control``'s deadline and item budget itself. A
+        cancellation stops the wait and raises ``RunCancelled`` at once; the
+        worker stops at its pipeline's next checkpoint, which frees it for the
+        next run.
+        """
+
+        if control is None:
+            return self._executor.submit(_run_pipeline, run_id, request, list(raw_items)).result()
+        control.check()
+        cancel_event = self._cancel_event()
+        future = self._executor.submit(
+            _run_pipeline, run_id, request, list(raw_items), control.max_items, control.deadline_at, cancel_event
+        )
+        while True:
+            try:
+                return future.result(timeout=CANCEL_POLL_SECONDS)
+            except FutureTimeout:
+                if control.cancelled:
+                    cancel_event.set()
+                    future.cancel()
+                    raise RunCancelled("Run was cancelled")
+
+    def _cancel_event(self) -> Any:
+        # The manager process starts with the first cancellable run.
+        with self._manager_lock:
+            if self._manager is None:
+                self._manager = self._context.Manager()
+            return self._manager.Event()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+        self._progress_queue.put(_STOP)
+        self._listener.join(timeout=5)
+        with self._manager_lock:
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                event = self._progress_queue.get()
+            except (EOFError, OSError, queue.Empty):  # pragma: no cover - queue torn down
+                return
+            if event is _STOP:
+                return
+            if self._on_progress is not None:
+                try:
+                    self._on_progress(*event)
+                except Exception:  # pragma: no cover - a bad callback must not stop the listener
+                    pass
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+from typing import Any, Callable, Dict, List, Tuple
+
+
+# Functions listed in a cProfile report, by cumulative time.
+PROFILE_TOP_FUNCTIONS = 40
+
+
+def run_profiled(profiler: str, func: Callable[..., Any], *args: Any) -> Tuple[Any, Dict[str, Any]]:
+    """Call ``func(*args)`` under ``profiler`` and return its result with a JSON-ready report.
+
+    ``pyinstrument`` is used when installed and falls back to ``cprofile``
+    otherwise. A profiler that cannot start (only one may be active at a time
+    on some interpreters) leaves the call unprofiled and says so in the report.
+    """
+
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            result, report = _run_cprofile(func, args)
+            report["requested"] = "pyinstrument"
+            return result, report
+        sampler = Profiler()
+        try:
+            sampler.start()
+        except RuntimeError as exc:
+            return func(*args), {"profiler": "pyinstrument", "error": str(exc)}
+        try:
+            result = func(*args)
+        finally:
+            sampler.stop()
+        return result, {"profiler": "pyinstrument", "text": sampler.output_text(unicode=False, color=False)}
+    return _run_cprofile(func, args)
+
+
+def _run_cprofile(func: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, Dict[str, Any]]:
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError as exc:
+        return func(*args), {"profiler": "cprofile", "error": str(exc)}
+    try:
+        result = func(*args)
+    finally:
+        profile.disable()
+    return result, {"profiler": "cprofile", "functions": top_functions(pstats.Stats(profile))}
+
+
+def top_functions(stats: pstats.Stats, limit: int = PROFILE_TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+    entries = sorted(stats.stats.items(), key=lambda entry: entry[1][3], reverse=True)  # type: ignore[attr-defined]
+    return [
+        {
+            "function": f"{name} ({filename}:{line})",
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "tottime_ms": round(tottime * 1000.0, 3),
+            "cumtime_ms": round(cumtime * 1000.0, 3),
+        }
+        for (filename, line, name), (primitive_calls, calls, tottime, cumtime, _) in entries[:limit]
+    ]
@@ -1,116 +1,781 @@
 from __future__ import annotations
 
+import importlib
+import importlib.util
+import json
 import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Dict, Optional, Sequence
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from uuid import uuid4
 
-from ..core.config import get_settings
+from ..core.config import Settings, get_settings
 from ..schemas.research import (
+    ResearchDepth,
     ResearchJSONPayload,
+    ResearchPartialResult,
     ResearchRequest,
     ResearchRunStatus,
     ResearchSummary,
 )
-from ..pipelines import fallback_pipeline
+from ..pipelines import fallback_pipeline, sentiment
+from ..pipelines.control import RunCancelled, RunControl, take_batches
+from ..pipelines.incremental import STATE_VERSION, build_incremental_state, run_incremental
+from ..pipelines.progress import ProgressCallback, StageProgress
+from ..pipelines.streaming import PartialCallback, iter_batches
+from .collectors import CollectionFailed, CollectionStream, SourceCollector, build_collector, fetch_metrics
+from .columnar import PayloadReader
+from .metrics import RunMetrics
+from .process_pool import PipelineProcessPool
+from .profiling import run_profiled
+from .result_cache import ResultCache, rebind_result, request_cache_key
+from .run_events import RunEventBroker
+from .run_state import SharedRunState, build_run_state
+from .run_store import TERMINAL_STATUSES, RunStore, build_run_store
+from .run_queue import RunQueueFull, RunScheduler
 
 
-PipelineFn = Callable[[str, ResearchRequest, Optional[Sequence[Dict[str, object]]]], tuple]
+PipelineFn = Callable[
+    [
+        str,
+        ResearchRequest,
+        Optional[Iterable[Dict[str, object]]],
+        Optional[ProgressCallback],
+        Optional[PartialCallback],
+        Optional[RunControl],
+    ],
+    tuple,
+]
+
+class BaselineUnavailable(Exception):
+    """Raised when an incremental run names a baseline without a stored result."""
+
+    def __init__(self, run_id: str) -> None:
+        super().__init__(f"Baseline run {run_id} has no stored result")
+        self.run_id = run_id
+
+
+PARTIAL_REASONS = {"deadline": "deadline reached", "item_budget": "item budget reached"}
+
+# Cheaper default-depth runs are scheduled ahead of deep ones.
+DEPTH_PRIORITIES = {ResearchDepth.default: 0, ResearchDepth.deep: 1}
+# Installed packages the vectorized pipeline needs; without them runs use the lite pipeline.
+FULL_PIPELINE_DEPENDENCIES = ("numpy", "scipy", "sklearn")
 
 
 class ResearchRunner:
+    """Queues research runs and executes them on worker threads or processes.
+
+    Creating a runner opens nothing; ``start`` reads the settings and opens the
+    run store, shared state and result cache, so an application starts its
+    runner from its lifespan.
+    """
+
     def __init__(self) -> None:
-        self._settings = get_settings()
-        self._runs: Dict[str, Dict[str, object]] = {}
+        self._settings: Settings
         self._lock = threading.Lock()
-        Path(self._settings.storage_path).mkdir(parents=True, exist_ok=True)
+        # Last reported progress and stage of runs executing in this process.
+        self._active: Dict[str, Tuple[float, Optional[str]]] = {}
+        # Cancellation and budgets of runs queued or executing in this process.
+        self._controls: Dict[str, RunControl] = {}
+        # Runs started by this process that have not finished; others execute in another worker.
+        self._local_runs: Set[str] = set()
+        self._events = RunEventBroker()
+        self._cache: Optional[ResultCache] = None
+        self._configured = False
+        # Cache key of each run that owns an execution.
+        self._cache_keys: Dict[str, str] = {}
+        # Cache key of the execution each waiting run follows.
+        self._joined: Dict[str, str] = {}
+        # Cancelled owners whose execution carries on for the identical runs still following it.
+        self._detached: Set[str] = set()
         self._pipeline_mode = "lite"
         self._pipeline_func: PipelineFn = self._select_pipeline()
+        self._store: RunStore
+        # Latest partial-result snapshot of streaming runs, readable from every worker process.
+        self._state: SharedRunState
+        self._process_pool: Optional[PipelineProcessPool] = None
+        self._collector: Optional[SourceCollector] = None
+        self._scheduler: RunScheduler
+        self._metrics: RunMetrics
+        self._started = False
 
-    def start_run(self, request: ResearchRequest) -> str:
-        run_id = str(uuid4())
-        now = datetime.utcnow()
-        with self._lock:
-            self._runs[run_id] = {
-                "request": request,
-                "status": "queued",
-                "progress": 0.0,
-                "message": None,
-                "created_at": now,
-                "started_at": None,
-                "finished_at": None,
-                "summary": None,
-                "payload": None,
-                "pipeline_mode": self._pipeline_mode,
-            }
-
-        worker = threading.Thread(target=self._execute_run, args=(run_id,), daemon=True)
-        worker.start()
-        return run_id
+    def start_run(self, request: ResearchRequest, priority: Optional[int] = None) -> str:
+        """Queue a run.
 
-    def get_status(self, run_id: str) -> Optional[ResearchRunStatus]:
-        run = self._runs.get(run_id)
-        if not run:
-            return None
-        return ResearchRunStatus(
-            run_id=run_id,
-            status=run["status"],
-            progress=run["progress"],
-            message=run["message"],
-            started_at=run["started_at"],
-            finished_at=run["finished_at"],
+        Raises ``RunQueueFull`` when the queue is at capacity and
+        ``BaselineUnavailable`` when ``baseline_run_id`` has no stored result.
+        """
+
+        return self.start_runs([request], priority)[0]
+
+    def start_runs(self, requests: Sequence[ResearchRequest], priority: Optional[int] = None) -> List[str]:
+        """Queue a group of runs; identical requests share one run.
+
+        Returns a run id per request, in order. The group is admitted to the
+        queue as a whole, so ``RunQueueFull`` means none of its runs were queued.
+        """
+
+        # Profiled requests share a run only with identically profiled ones.
+        keys = [
+            request_cache_key(request, self._pipeline_mode) + (f":{request.profile}" if request.profile else "")
+            for request in requests
+        ]
+        unique: Dict[str, ResearchRequest] = {}
+        for key, request in zip(keys, requests):
+            unique.setdefault(key, request)
+        for request in unique.values():
+            if request.baseline_run_id and self._store.open_payload(request.baseline_run_id) is None:
+                raise BaselineUnavailable(request.baseline_run_id)
+
+        run_ids = {key: str(uuid4()) for key in unique}
+        created_at = datetime.utcnow()
+        with self._lock:
+            self._local_runs.update(run_ids.values())
+        self._store.create_many(
+            [(run_ids[key], request, self._pipeline_mode, created_at) for key, request in unique.items()]
         )
 
+        # Nothing is settled until the queue has admitted the batch, so a full queue
+        # leaves no run of it behind.
+        scheduled: List[Tuple[str, int]] = []
+        hits: List[Tuple[str, tuple]] = []
+        lookups: List[str] = []
+        for key, request in unique.items():
+            run_id = run_ids[key]
+            # Profiled runs always execute, and their reports never reach other runs.
+            if self._cache is not None and request.profile is None:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    lookups.append("hit")
+                    hits.append((run_id, cached))
+                    continue
+                if self._cache.join(key, run_id):
+                    lookups.append("shared")
+                    with self._lock:
+                        self._joined[run_id] = key
+                    continue
+                lookups.append("miss")
+                with self._lock:
+                    self._cache_keys[run_id] = key
+            run_priority = priority if priority is not None else DEPTH_PRIORITIES.get(request.depth, 0)
+            scheduled.append((run_id, run_priority))
+            with self._lock:
+                self._controls[run_id] = self._new_control(run_id)
+
+        try:
+            self._scheduler.submit_many(scheduled)
+        except RunQueueFull:
+            for run_id in run_ids.values():
+                self._store.delete(run_id)
+                with self._lock:
+                    joined = self._joined.pop(run_id, None)
+                    self._local_runs.discard(run_id)
+                    self._controls.pop(run_id, None)
+                if joined is not None:
+                    self._cache.leave(joined, run_id)
+                # Runs of other requests that joined this one's flight meanwhile fail with it.
+                self._finish_flight(run_id, None, "Research queue is full, retry later")
+            raise
+        for result in lookups:
+            self._metrics.cache_lookups.inc(result=result)
+        for run_id, cached in hits:
+            self._complete(run_id, *cached, message="Served from cached result")
+        if scheduled:
+            depth = self._scheduler.depth()
+            for _ in scheduled:
+                self._metrics.queue_depth.observe(depth)
+        return [run_ids[key] for key in keys]
+
+    def cancel(self, run_id: str) -> Optional[ResearchRunStatus]:
+        """Ask a run to stop and return its status; ``None`` for unknown runs.
+
+        A run still queued here is cancelled at once. A running one stops at its
+        pipeline's next checkpoint, and a run owned by another worker process
+        once that process sees the request in the shared run state. Finished
+        runs are left as they are.
+
+        An execution shared by identical runs stops only once every one of them
+        is cancelled; until then a cancelled owner is marked cancelled while its
+        execution carries on for the others.
+        """
+
+        status = self.get_status(run_id)
+        if status is None or status.status in TERMINAL_STATUSES:
+            return status
+        with self._lock:
+            control = self._controls.get(run_id)
+            local = run_id in self._local_runs
+        if control is not None:
+            if self._release(run_id):
+                self._stop(run_id)
+        elif local:
+            # Waits on an identical run's execution, which carries on for the others.
+            self._mark_cancelled(run_id)
+            self._leave_flight(run_id)
+        else:
+            self._state.set(run_id, "cancel", True)
+        return self.get_status(run_id)
+
+    def cache_stats(self) -> Dict[str, object]:
+        if self._cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._cache.stats()}
+
+    def get_status(self, run_id: str) -> Optional[ResearchRunStatus]:
+        return self.get_statuses([run_id]).get(run_id)
+
+    def get_statuses(self, run_ids: Sequence[str]) -> Dict[str, ResearchRunStatus]:
+        """Statuses of the known runs among ``run_ids``, read from the store in one pass."""
+
+        records = self._store.get_statuses(run_ids)
+        queued = [run_id for run_id, record in records.items() if record["status"] == "queued"]
+        positions = self._scheduler.positions(queued) if queued else {}
+        return {
+            run_id: ResearchRunStatus(run_id=run_id, queue_position=positions.get(run_id), **record)
+            for run_id, record in records.items()
+        }
+
     def get_summary(self, run_id: str) -> Optional[ResearchSummary]:
-        run = self._runs.get(run_id)
-        if not run or run.get("summary") is None:
-            return None
-        return run["summary"]
+        return self._store.get_summary(run_id)
 
     def get_payload(self, run_id: str) -> Optional[ResearchJSONPayload]:
-        run = self._runs.get(run_id)
-        if not run or run.get("payload") is None:
+        payload = self._store.get_payload(run_id)
+        if payload is None:
+            return None
+        return ResearchJSONPayload(payload=payload)
+
+    async def watch(self, run_id: str, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, object]]]:
+        """A snapshot of the run, then its events as they happen until it finishes.
+
+        Yields ``None`` after ``heartbeat`` idle seconds so callers can keep
+        connections alive. A subscriber that falls behind the event history gets
+        a fresh snapshot instead of the events it missed. Runs executing in
+        another worker process publish nothing here; their subscribers get a
+        new snapshot whenever the shared status changes.
+        """
+
+        poll_interval = self._settings.RUN_STATE_POLL_INTERVAL
+        channel = self._events.acquire(run_id)
+        try:
+            # Read the cursor before the snapshot: later events are replayed, earlier ones are in it.
+            cursor = channel.seq
+            snapshot = self._snapshot(run_id)
+            if snapshot is None:
+                return
+            yield snapshot
+            if snapshot["status"] in TERMINAL_STATUSES:
+                return
+            while True:
+                events, lagged = channel.since(cursor)
+                if lagged:
+                    cursor = channel.seq
+                    snapshot = self._snapshot(run_id)
+                    if snapshot is None:
+                        return
+                    yield snapshot
+                    if snapshot["status"] in TERMINAL_STATUSES:
+                        return
+                    continue
+                for cursor, event in events:
+                    yield event
+                    if event["type"] in TERMINAL_STATUSES:
+                        return
+                with self._lock:
+                    remote = run_id not in self._local_runs
+                if not remote or channel.seq or not poll_interval:
+                    if not await channel.wait(cursor, heartbeat):
+                        yield None
+                    continue
+                idle = 0.0
+                while not await channel.wait(cursor, poll_interval):
+                    idle += poll_interval
+                    latest = self._snapshot(run_id)
+                    if latest is None:
+                        return
+                    if latest != snapshot:
+                        snapshot = latest
+                        yield snapshot
+                        if snapshot["status"] in TERMINAL_STATUSES:
+                            return
+                        idle = 0.0
+                    elif heartbeat is not None and idle >= heartbeat:
+                        yield None
+                        idle = 0.0
+        finally:
+            self._events.release(run_id, channel)
+
+    def _snapshot(self, run_id: str) -> Optional[Dict[str, object]]:
+        status = self.get_status(run_id)
+        if status is None:
+            return None
+        partial = self.get_partial(run_id)
+        return {
+            "type": "snapshot",
+            **json.loads(status.json()),
+            "partial": json.loads(partial.json(exclude={"run_id"})) if partial is not None else None,
+        }
+
+    def event_stats(self) -> Dict[str, int]:
+        return self._events.stats()
+
+    def get_partial(self, run_id: str) -> Optional[ResearchPartialResult]:
+        """What a streaming run has produced so far; ``None`` once it has finished."""
+
+        snapshot = self._state.get(run_id, "partial")
+        if snapshot is None:
             return None
-        return ResearchJSONPayload(payload=run["payload"])
+        return ResearchPartialResult(run_id=run_id, **snapshot)
+
+    def render_metrics(self) -> str:
+        return self._metrics.render()
+
+    def open_payload(self, run_id: str) -> Optional[PayloadReader]:
+        """Lazy access to a stored payload, so parts of it can be served without loading all items."""
+
+        return self._store.open_payload(run_id)
 
     def _execute_run(self, run_id: str) -> None:
         with self._lock:
-            run = self._runs[run_id]
-            run["status"] = "running"
-            run["started_at"] = datetime.utcnow()
+            self._active[run_id] = (0.0, None)
+            control = self._controls.setdefault(run_id, self._new_control(run_id))
+            detached = run_id in self._detached
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        self._metrics.active_at_start.observe(self._scheduler.active())
+        if not detached:
+            self._store.update(run_id, status="running", started_at=started_at)
+            self._events.publish(run_id, {"type": "status", "status": "running", "started_at": started_at.isoformat()})
 
         try:
-            for step in range(1, 4):
-                time.sleep(0.5)
-                with self._lock:
-                    self._runs[run_id]["progress"] = step / 3
+            def progress(stage: str, fraction: float) -> None:
+                self._record_progress(run_id, fraction, stage)
 
-            request: ResearchRequest = self._runs[run_id]["request"]
-            raw_items: Sequence[Dict[str, object]] = []
-            payload, summary = self._pipeline_func(run_id, request, raw_items)
-            payload.setdefault("pipeline_mode", self._pipeline_mode)
+            def pipeline_progress(stage: str, fraction: float) -> None:
+                # Every stage boundary is a cancellation checkpoint.
+                control.check()
+                progress(stage, fraction)
 
+            stages = StageProgress(progress)
+            stages.update("fetch", 0.0)
+            run = self._store.get(run_id)
+            request: ResearchRequest = run["request"]
+            queue_wait = max(0.0, (started_at - run["created_at"]).total_seconds())
+            self._metrics.queue_wait_seconds.observe(queue_wait)
+            control.check()
+            control.max_items = _tightest(request.max_items, self._settings.RUN_MAX_ITEMS)
+            deadline = _tightest(request.deadline_seconds, self._settings.RUN_DEADLINE_SECONDS)
+            control.deadline_at = time.time() + deadline if deadline else None
+            raw_items = self._fetch_items(request, lambda fraction: stages.update("fetch", fraction))
+            profile = None
+            try:
+                if request.baseline_run_id or self._process_pool is not None:
+                    # Worker processes and incremental merges need every item up front.
+                    collected = [item for batch in take_batches(iter_batches(raw_items), control) for item in batch]
+                    stages.update("fetch")
+                    # Nothing to analyse when every source failed.
+                    message = raw_items.outcome()
+                    control.check()
+                    if request.baseline_run_id:
+                        (payload, summary, state), profile = self._call_pipeline(
+                            request, self._run_incremental, run_id, request, collected, pipeline_progress, control
+                        )
+                    else:
+                        # Workers profile the pipeline themselves.
+                        payload, summary = self._process_pool.run(run_id, request, collected, control)
+                else:
+                    pipeline = self._load_pipeline()
+                    if run["pipeline_mode"] != self._pipeline_mode:
+                        # The full pipeline failed to import after this run was queued.
+                        self._store.update(run_id, pipeline_mode=self._pipeline_mode)
+                    # The pipeline pulls items while the sources are still fetching later pages.
+                    (payload, summary), profile = self._call_pipeline(
+                        request,
+                        pipeline,
+                        run_id,
+                        request,
+                        raw_items,
+                        pipeline_progress,
+                        lambda snapshot: self._record_partial(run_id, snapshot),
+                        control,
+                    )
+                    message = raw_items.outcome()
+            finally:
+                raw_items.close()
+            truncated = payload.get("truncated") or control.report()
+            if truncated is not None:
+                payload["truncated"] = truncated
+                summary = summary.copy(update={"partial": True})
+                reason = PARTIAL_REASONS.get(truncated["reason"], truncated["reason"])
+                message = "; ".join(
+                    filter(None, [f"Partial result: {reason} after {truncated['items_analysed']} items", message])
+                )
+            if not request.baseline_run_id:
+                payload.setdefault("pipeline_mode", self._pipeline_mode)
+                state = build_incremental_state(payload)
+            metrics = payload.setdefault("metrics", {})
+            metrics["stages"] = {"fetch": fetch_metrics(raw_items), **(metrics.get("stages") or {})}
+            metrics["queue_wait_ms"] = round(queue_wait * 1000.0, 3)
+            if profile is not None:
+                metrics["profile"] = profile
+            self._metrics.observe_stages(metrics)
+
+            with self._lock:
+                self._active.pop(run_id, None)
+                self._controls.pop(run_id, None)
+                detached = self._pop_detached(run_id)
+            self._state.discard(run_id)
+            if not detached:
+                self._complete(run_id, summary, payload, message=message, state=state)
+            self._finish_flight(run_id, (summary, payload), None)
+            self._metrics.runs.inc(status="completed")
+            self._metrics.run_seconds.observe(time.perf_counter() - started, status="completed")
+        except RunCancelled:
             with self._lock:
-                self._runs[run_id]["status"] = "completed"
-                self._runs[run_id]["finished_at"] = datetime.utcnow()
-                self._runs[run_id]["summary"] = summary
-                self._runs[run_id]["payload"] = payload
+                self._active.pop(run_id, None)
+                self._controls.pop(run_id, None)
+                detached = self._pop_detached(run_id)
+            self._state.discard(run_id)
+            if not detached:
+                self._mark_cancelled(run_id)
+            self._finish_flight(run_id, None, "Shared execution was cancelled")
+            self._metrics.runs.inc(status="cancelled")
+            self._metrics.run_seconds.observe(time.perf_counter() - started, status="cancelled")
         except Exception as exc:  # pragma: no cover - best effort logging placeholder
             with self._lock:
-                self._runs[run_id]["status"] = "failed"
-                self._runs[run_id]["finished_at"] = datetime.utcnow()
-                self._runs[run_id]["message"] = str(exc)
+                _, stage = self._active.pop(run_id, (0.0, None))
+                self._controls.pop(run_id, None)
+                detached = self._pop_detached(run_id)
+            self._state.discard(run_id)
+            # Streaming pipelines only learn that every source failed after running on nothing.
+            stage = "fetch" if isinstance(exc, CollectionFailed) else stage or "fetch"
+            message = f"Failed during {stage}: {exc}"
+            if not detached:
+                self._fail(run_id, message, stage=stage, error=type(exc).__name__)
+            self._finish_flight(run_id, None, message)
+            self._metrics.runs.inc(status="failed")
+            self._metrics.failures.inc(stage=stage, error=type(exc).__name__)
+            self._metrics.run_seconds.observe(time.perf_counter() - started, status="failed")
 
-    def _select_pipeline(self) -> PipelineFn:
-        try:
-            import numpy  # noqa: F401
+    def _call_pipeline(
+        self,
+        request: ResearchRequest,
+        func: Callable[..., tuple],
+        *args: object,
+    ) -> Tuple[tuple, Optional[Dict[str, object]]]:
+        """``func(*args)`` and the profile report when the request asked for one."""
+
+        if request.profile is None:
+            return func(*args), None
+        return run_profiled(request.profile, func, *args)
+
+    def _fetch_items(self, request: ResearchRequest, progress: Callable[[float], None]) -> CollectionStream:
+        if self._collector is None:
+            return CollectionStream([], request.sources)
+        return self._collector.stream(request, progress)
+
+    def _run_incremental(
+        self,
+        run_id: str,
+        request: ResearchRequest,
+        raw_items: Sequence[Dict[str, object]],
+        progress: ProgressCallback,
+        control: RunControl,
+    ) -> tuple:
+        baseline_id = request.baseline_run_id
+        reader = self._store.open_payload(baseline_id)
+        if reader is None:
+            raise BaselineUnavailable(baseline_id)
+        baseline_payload = reader.to_payload()
+        state = self._store.get_state(baseline_id)
+        if state is None or state.get("version") != STATE_VERSION:
+            # Runs served from the cache or a shared execution store no state of their own,
+            # nor do runs stored by an older version; their items are signed once, here.
+            state = build_incremental_state(baseline_payload)
+        return run_incremental(run_id, request, raw_items, baseline_payload, state, progress, control)
 
-            from ..pipelines import full_pipeline
+    def _complete(
+        self,
+        run_id: str,
+        summary: ResearchSummary,
+        payload: Dict[str, object],
+        message: Optional[str] = None,
+        state: Optional[Dict[str, object]] = None,
+    ) -> None:
+        summary, payload = rebind_result(summary, payload, run_id)
+        self._store.complete(
+            run_id,
+            summary,
+            payload,
+            state=state,
+            status="completed",
+            progress=1.0,
+            message=message,
+            finished_at=datetime.utcnow(),
+        )
+        with self._lock:
+            self._local_runs.discard(run_id)
+        self._events.publish(
+            run_id,
+            {"type": "completed", "status": "completed", "progress": 1.0, "message": message},
+            close=True,
+        )
 
+    def _fail(self, run_id: str, message: str, stage: Optional[str] = None, error: Optional[str] = None) -> None:
+        self._store.update(run_id, status="failed", finished_at=datetime.utcnow(), message=message)
+        self._store.flush()
+        with self._lock:
+            self._local_runs.discard(run_id)
+        self._events.publish(
+            run_id,
+            {"type": "failed", "status": "failed", "message": message, "stage": stage, "error": error},
+            close=True,
+        )
+
+    def _mark_cancelled(self, run_id: str) -> None:
+        self._store.update(run_id, status="cancelled", finished_at=datetime.utcnow(), message="Cancelled")
+        self._store.flush()
+        with self._lock:
+            self._local_runs.discard(run_id)
+        self._events.publish(
+            run_id,
+            {"type": "cancelled", "status": "cancelled", "message": "Cancelled"},
+            close=True,
+        )
+
+    def _new_control(self, run_id: str) -> RunControl:
+        # Another worker process asks for a cancellation through the shared state.
+        return RunControl(
+            is_cancelled=lambda: self._state.get(run_id, "cancel") is not None and self._release(run_id),
+            poll_interval=self._settings.RUN_STATE_POLL_INTERVAL,
+        )
+
+    def _release(self, run_id: str) -> bool:
+        """Withdraw a cancelled run from its execution; ``True`` when the execution should stop.
+
+        While identical runs still follow the execution, the run is marked
+        cancelled and detached instead, and the execution carries on for them.
+        """
+
+        with self._lock:
+            key = self._cache_keys.get(run_id)
+        if key is None or self._cache is None or self._cache.abandon(key):
+            with self._lock:
+                self._cache_keys.pop(run_id, None)
+            return True
+        with self._lock:
+            detaching = run_id not in self._detached
+            self._detached.add(run_id)
+        if detaching:
+            self._state.discard(run_id)
+            self._mark_cancelled(run_id)
+        return False
+
+    def _stop(self, run_id: str) -> None:
+        """Drop a released run from the queue, or stop its execution at the next checkpoint."""
+
+        if self._scheduler.remove(run_id):
+            with self._lock:
+                self._controls.pop(run_id, None)
+                detached = self._pop_detached(run_id)
+            if not detached:
+                self._mark_cancelled(run_id)
+            return
+        with self._lock:
+            control = self._controls.get(run_id)
+        if control is not None:
+            control.cancel()
+
+    def _leave_flight(self, run_id: str) -> None:
+        """Detach a cancelled follower; a detached owner left without followers stops."""
+
+        with self._lock:
+            key = self._joined.pop(run_id, None)
+        if key is None or self._cache is None:
+            return
+        self._cache.leave(key, run_id)
+        with self._lock:
+            owner = next(
+                (owner for owner, owner_key in self._cache_keys.items() if owner_key == key and owner in self._detached),
+                None,
+            )
+        if owner is not None and self._release(owner):
+            self._stop(owner)
+
+    def _pop_detached(self, run_id: str) -> bool:
+        detached = run_id in self._detached
+        self._detached.discard(run_id)
+        return detached
+
+    def _finish_flight(self, run_id: str, result: Optional[tuple], error: Optional[str]) -> None:
+        """Cache the owner's result and settle every identical run that waited on it."""
+
+        with self._lock:
+            key = self._cache_keys.pop(run_id, None)
+        if key is None or self._cache is None:
+            return
+        # A result cut off by the deadline depends on timing, so it is not served again.
+        if result is not None and (result[1].get("truncated") or {}).get("reason") != "deadline":
+            self._cache.put(key, *result)
+        followers = self._cache.finish(key)
+        with self._lock:
+            for follower_id in followers:
+                self._joined.pop(follower_id, None)
+        cancelled = {
+            follower_id
+            for follower_id, record in self._store.get_statuses(followers).items()
+            if record["status"] == "cancelled"
+        }
+        for follower_id in followers:
+            if follower_id in cancelled:
+                continue
+            if result is not None:
+                self._complete(follower_id, *result, message=f"Shared execution of run {run_id}")
+            else:
+                self._fail(follower_id, error or "Run failed")
+
+    def _record_partial(self, run_id: str, snapshot: Dict[str, object]) -> None:
+        with self._lock:
+            if run_id not in self._active or run_id in self._detached:
+                return
+        # Only the pipeline thread reports partials, so the run cannot finish in between.
+        self._state.set(run_id, "partial", snapshot)
+        self._events.publish(run_id, {"type": "partial", **snapshot})
+
+    def _record_progress(self, run_id: str, fraction: float, stage: str) -> None:
+        with self._lock:
+            # Events from worker processes can arrive after the run has finished.
+            if run_id not in self._active or fraction < self._active[run_id][0]:
+                return
+            if run_id in self._detached:
+                # Only the followers care about the rest of a cancelled owner's execution.
+                self._active[run_id] = (fraction, stage)
+                return
+            previous_stage = self._active[run_id][1]
+            self._active[run_id] = (fraction, stage)
+            self._store.update(run_id, progress=fraction, stage=stage)
+            if stage != previous_stage:
+                self._events.publish(run_id, {"type": "stage", "stage": stage, "previous": previous_stage})
+            self._events.publish(run_id, {"type": "progress", "progress": fraction, "stage": stage})
+
+    def start(self) -> None:
+        """Open the run store, shared state, collector and worker processes.
+
+        The first call also reads the settings and sets up the result cache and
+        run queue, which outlive ``shutdown``; call this again to reuse the
+        runner after it, as each application lifespan does. Does nothing while
+        the runner is already started.
+        """
+
+        with self._lock:
+            if self._started:
+                return
+            if not self._configured:
+                self._configure()
+            self._store = build_run_store(self._settings)
+            self._state = build_run_state(self._settings)
+            if self._settings.RUN_EXECUTOR == "process":
+                self._process_pool = PipelineProcessPool(
+                    getattr(self._pipeline_func, "path", self._pipeline_func),
+                    workers=self._settings.RUN_WORKERS,
+                    on_progress=self._record_progress,
+                )
+            if self._settings.COLLECTION_ENABLED:
+                self._collector = build_collector(self._settings)
+            self._started = True
+
+    def _configure(self) -> None:
+        self._settings = get_settings()
+        if self._settings.RESULT_CACHE_ENABLED:
+            self._cache = ResultCache(
+                str(Path(self._settings.storage_path) / "cache") if self._settings.RESULT_CACHE_MAX_DISK_ENTRIES else None,
+                ttl=self._settings.RESULT_CACHE_TTL_SECONDS,
+                max_entries=self._settings.RESULT_CACHE_MAX_ENTRIES,
+                max_disk_entries=self._settings.RESULT_CACHE_MAX_DISK_ENTRIES,
+            )
+        self._scheduler = RunScheduler(
+            self._execute_run,
+            workers=self._settings.RUN_WORKERS,
+            max_queue_size=self._settings.RUN_QUEUE_SIZE,
+        )
+        self._metrics = RunMetrics(queue_depth=self._scheduler.depth, active_runs=self._scheduler.active)
+        self._configured = True
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            collector, self._collector = self._collector, None
+            process_pool, self._process_pool = self._process_pool, None
+        if collector is not None:
+            collector.close()
+        if process_pool is not None:
+            process_pool.shutdown()
+        sentiment.shutdown_pool()
+        self._store.close()
+        self._state.close()
+
+    def warm_up(self) -> None:
+        """Load what the first run would otherwise wait for.
+
+        Starts the runner if it was shut down, imports the pipeline module and
+        the VADER lexicon and starts pipeline worker processes. Safe to call
+        from a background thread while runs are already being served.
+        """
+
+        self.start()
+        self._load_pipeline()
+        sentiment.get_analyzer()
+        if self._process_pool is not None:
+            for future in self._process_pool.warm():
+                future.result()
+
+    def _load_pipeline(self) -> PipelineFn:
+        """The pipeline function, imported if need be; the lite one when the import fails."""
+
+        pipeline = self._pipeline_func
+        if isinstance(pipeline, LazyPipeline):
+            try:
+                return pipeline.load()
+            except Exception:
+                # Same fallback as a failed import used to take at construction.
+                self._pipeline_mode = "lite"
+                self._pipeline_func = fallback_pipeline.run_pipeline
+        return self._pipeline_func
+
+    def _select_pipeline(self) -> PipelineFn:
+        # Only look the dependencies up here; importing them takes most of a second.
+        if all(importlib.util.find_spec(name) is not None for name in FULL_PIPELINE_DEPENDENCIES):
             self._pipeline_mode = "full"
-            return full_pipeline.run_pipeline  # type: ignore[attr-defined]
-        except Exception:
-            self._pipeline_mode = "lite"
-            return fallback_pipeline.run_pipeline
+            return LazyPipeline(f"{fallback_pipeline.__package__}.full_pipeline:run_pipeline")
+        self._pipeline_mode = "lite"
+        return fallback_pipeline.run_pipeline
+
+
+def _tightest(requested: Optional[float], configured: float) -> Optional[float]:
+    """The smaller of a request's limit and the server-wide one; ``0`` disables the latter."""
+
+    limits = [limit for limit in (requested, configured) if limit]
+    return min(limits) if limits else None
+
+
+class LazyPipeline:
+    """Pipeline function named by ``module:function``, imported on its first call."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._func: Optional[PipelineFn] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> PipelineFn:
+        if self._func is None:
+            with self._lock:
+                if self._func is None:
+                    module_name, _, func_name = self.path.partition(":")
+                    self._func = getattr(importlib.import_module(module_name), func_name)
+        return self._func
+
+    def __call__(self, *args: object) -> tuple:
+        return self.load()(*args)
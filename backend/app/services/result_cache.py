@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..schemas.research import ResearchRequest, ResearchSummary
+from .run_store import decode_payload, encode_payload
+
+
+# Bump when the pipeline output format changes so stale entries are never served.
+CACHE_VERSION = 6
+
+CachedResult = Tuple[ResearchSummary, Dict[str, Any]]
+
+
+def request_cache_key(request: ResearchRequest, pipeline_mode: str) -> str:
+    """Hash of the normalized request; requests that differ only in formatting share a key."""
+
+    canonical = {
+        "version": CACHE_VERSION,
+        "pipeline_mode": pipeline_mode,
+        "topic": " ".join(request.topic.lower().split()),
+        "from_date": request.from_date.isoformat() if request.from_date else None,
+        "to_date": request.to_date.isoformat() if request.to_date else None,
+        "depth": request.depth.value,
+        "sources": sorted(set(request.sources)),
+        "sample_limit": request.sample_limit,
+        "baseline_run_id": request.baseline_run_id,
+        "deadline_seconds": request.deadline_seconds,
+        "max_items": request.max_items,
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def rebind_result(summary: ResearchSummary, payload: Dict[str, Any], run_id: str) -> CachedResult:
+    """Copy of a cached result that reports ``run_id`` as its own."""
+
+    return summary.copy(update={"run_id": run_id}), {**payload, "run_id": run_id}
+
+
+class ResultCache:
+    """Completed results keyed by request hash, in an in-memory LRU backed by files on disk.
+
+    Entries older than ``ttl`` seconds are never returned. The memory tier holds
+    ``max_entries`` results and the disk tier ``max_disk_entries`` files; the
+    oldest are dropped first. ``join``/``finish`` implement single-flight: the first
+    run for a key executes, later identical runs wait on it.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str],
+        ttl: float,
+        max_entries: int,
+        max_disk_entries: int,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._directory = Path(directory) if directory else None
+        if self._directory is not None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, ResearchSummary, Dict[str, Any]]]" = OrderedDict()
+        self._flights: Dict[str, List[str]] = {}
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "coalesced": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                return entry[1], entry[2]
+            if entry is not None:
+                del self._entries[key]
+                self._stats["evictions"] += 1
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats["disk_hits"] += 1
+            self._remember_locked(key, entry)
+        return entry[1], entry[2]
+
+    def put(self, key: str, summary: ResearchSummary, payload: Dict[str, Any]) -> None:
+        entry = (time.time(), summary, payload)
+        with self._lock:
+            self._remember_locked(key, entry)
+        self._write_disk(key, entry)
+
+    def join(self, key: str, run_id: str) -> bool:
+        """Attach ``run_id`` to an in-flight execution of ``key``.
+
+        Returns ``False`` when nothing is in flight; the caller then owns the
+        execution and must call ``finish`` once it completes or fails.
+        """
+
+        with self._lock:
+            followers = self._flights.get(key)
+            if followers is None:
+                self._flights[key] = []
+                return False
+            followers.append(run_id)
+            self._stats["coalesced"] += 1
+            return True
+
+    def finish(self, key: str) -> List[str]:
+        """End the flight for ``key`` and return the runs that joined it."""
+
+        with self._lock:
+            return self._flights.pop(key, [])
+
+    def leave(self, key: str, run_id: str) -> None:
+        """Detach a follower from the flight for ``key``."""
+
+        with self._lock:
+            followers = self._flights.get(key)
+            if followers is not None and run_id in followers:
+                followers.remove(run_id)
+
+    def abandon(self, key: str) -> bool:
+        """End the flight for ``key`` if no run follows it.
+
+        Returns ``False``, leaving the flight in place, while followers remain.
+        """
+
+        with self._lock:
+            if self._flights.get(key):
+                return False
+            self._flights.pop(key, None)
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["in_flight"] = len(self._flights)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        for path in self._disk_files():
+            path.unlink(missing_ok=True)
+
+    def _remember_locked(self, key: str, entry: Tuple[float, ResearchSummary, Dict[str, Any]]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _path(self, key: str) -> Optional[Path]:
+        if self._directory is None:
+            return None
+        return self._directory / f"{key}.bin"
+
+    def _disk_files(self) -> List[Path]:
+        if self._directory is None:
+            return []
+        return list(self._directory.glob("*.bin"))
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, ResearchSummary, Dict[str, Any]]]:
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            record = decode_payload(path.read_bytes())
+        except (OSError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+        if record.get("version") != CACHE_VERSION or now - record["stored_at"] > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+        return record["stored_at"], ResearchSummary.parse_raw(record["summary"]), record["payload"]
+
+    def _write_disk(self, key: str, entry: Tuple[float, ResearchSummary, Dict[str, Any]]) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        stored_at, summary, payload = entry
+        blob = encode_payload(
+            {"version": CACHE_VERSION, "stored_at": stored_at, "summary": summary.json(), "payload": payload}
+        )
+        # Write then rename so concurrent readers never see a partial file.
+        temporary = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            temporary.write_bytes(blob)
+            os.replace(temporary, path)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+            return
+
+        files = self._disk_files()
+        excess = len(files) - self.max_disk_entries
+        if excess > 0:
+            files.sort(key=lambda item: item.stat().st_mtime if item.exists() else 0.0)
+            for stale in files[:excess]:
+                stale.unlink(missing_ok=True)
+            with self._lock:
+                self._stats["evictions"] += excess
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+# Events kept per run for subscribers that fall behind; older ones are replaced by a snapshot.
+HISTORY_SIZE = 256
+
+Event = Dict[str, Any]
+
+
+class RunChannel:
+    """Ordered events of one run, shared by every subscriber to it.
+
+    Publishers are runner threads; subscribers are coroutines. A publish wakes
+    one ``asyncio.Event`` per subscribing event loop, not one per subscriber,
+    and the event itself is stored once and read by all of them.
+    """
+
+    def __init__(self, history_size: int = HISTORY_SIZE) -> None:
+        self._lock = threading.Lock()
+        self._history: Deque[Tuple[int, Event]] = deque(maxlen=history_size)
+        self._seq = 0
+        self._closed = False
+        self._waiters: Dict[asyncio.AbstractEventLoop, asyncio.Event] = {}
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def publish(self, event: Event, close: bool = False) -> int:
+        with self._lock:
+            if self._closed:
+                return self._seq
+            self._seq += 1
+            self._history.append((self._seq, event))
+            self._closed = close
+            waiters, self._waiters = self._waiters, {}
+            seq = self._seq
+        for loop, waiter in waiters.items():
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:  # the subscriber's loop has shut down
+                pass
+        return seq
+
+    def since(self, cursor: int) -> Tuple[List[Tuple[int, Event]], bool]:
+        """Events after ``cursor`` and whether older ones were already dropped from the history."""
+
+        with self._lock:
+            if not self._history or cursor >= self._seq:
+                return [], False
+            first = self._history[0][0]
+            lagged = cursor < first - 1
+            return [(seq, event) for seq, event in self._history if seq > cursor], lagged
+
+    async def wait(self, cursor: int, timeout: Optional[float] = None) -> bool:
+        """Wait until an event after ``cursor`` exists; ``False`` when ``timeout`` passed first."""
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._seq > cursor or self._closed:
+                return True
+            waiter = self._waiters.get(loop)
+            if waiter is None:
+                waiter = self._waiters[loop] = asyncio.Event()
+        try:
+            await asyncio.wait_for(waiter.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class RunEventBroker:
+    """Per-run channels, created only while someone is subscribed.
+
+    Publishing to a run without a channel does nothing, so runs nobody watches
+    pay a dictionary lookup per event.
+    """
+
+    def __init__(self, history_size: int = HISTORY_SIZE) -> None:
+        self._lock = threading.Lock()
+        self._channels: Dict[str, RunChannel] = {}
+        self._subscribers: Dict[str, int] = {}
+        self._history_size = history_size
+
+    def publish(self, run_id: str, event: Event, close: bool = False) -> None:
+        with self._lock:
+            channel = self._channels.get(run_id)
+            if channel is not None and close:
+                # Later subscribers read the finished run from the store instead.
+                del self._channels[run_id]
+        if channel is not None:
+            channel.publish(event, close=close)
+
+    def acquire(self, run_id: str) -> RunChannel:
+        with self._lock:
+            channel = self._channels.get(run_id)
+            if channel is None:
+                channel = self._channels[run_id] = RunChannel(self._history_size)
+            self._subscribers[run_id] = self._subscribers.get(run_id, 0) + 1
+            return channel
+
+    def release(self, run_id: str, channel: RunChannel) -> None:
+        with self._lock:
+            remaining = self._subscribers.get(run_id, 1) - 1
+            if remaining > 0:
+                self._subscribers[run_id] = remaining
+                return
+            self._subscribers.pop(run_id, None)
+            if self._channels.get(run_id) is channel:
+                del self._channels[run_id]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"channels": len(self._channels), "subscribers": sum(self._subscribers.values())}
+
+
+def format_sse(event: Event) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'), default=str)}\n\n"
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import bisect
+import itertools
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class RunQueueFull(Exception):
+    """Raised when a run cannot be admitted because the queue is at capacity."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Research run queue is full")
+        self.retry_after = retry_after
+
+
+class RunScheduler:
+    """Bounded priority queue drained by a fixed pool of worker threads.
+
+    Lower ``priority`` values run first; ties run in submission order. Workers are
+    started lazily on the first submission and call ``handler(run_id)`` for each run.
+    """
+
+    def __init__(self, handler: Callable[[str], None], workers: int, max_queue_size: int) -> None:
+        self._handler = handler
+        self._workers = max(1, workers)
+        self._max_queue_size = max(1, max_queue_size)
+        self._queue: List[Tuple[int, int, str]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._active = 0
+        self._average_duration: Optional[float] = None
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def submit(self, run_id: str, priority: int = 0) -> None:
+        self.submit_many([(run_id, priority)])
+
+    def submit_many(self, runs: Sequence[Tuple[str, int]]) -> None:
+        """Queue ``(run_id, priority)`` pairs together: either all are admitted or none is."""
+
+        with self._condition:
+            if len(self._queue) + len(runs) > self._max_queue_size:
+                raise RunQueueFull(self._retry_after_locked())
+            for run_id, priority in runs:
+                bisect.insort(self._queue, (priority, next(self._sequence), run_id))
+            self._ensure_workers_locked()
+            self._condition.notify(len(runs))
+
+    def position(self, run_id: str) -> Optional[int]:
+        """1-based position of a queued run, or ``None`` once a worker has picked it up."""
+
+        with self._condition:
+            for index, (_, _, queued_run_id) in enumerate(self._queue):
+                if queued_run_id == run_id:
+                    return index + 1
+        return None
+
+    def positions(self, run_ids: Sequence[str]) -> Dict[str, int]:
+        """1-based positions of those ``run_ids`` that are still queued."""
+
+        wanted = set(run_ids)
+        with self._condition:
+            return {
+                queued_run_id: index + 1
+                for index, (_, _, queued_run_id) in enumerate(self._queue)
+                if queued_run_id in wanted
+            }
+
+    def remove(self, run_id: str) -> bool:
+        with self._condition:
+            for index, (_, _, queued_run_id) in enumerate(self._queue):
+                if queued_run_id == run_id:
+                    del self._queue[index]
+                    return True
+        return False
+
+    def depth(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def active(self) -> int:
+        with self._condition:
+            return self._active
+
+    def _retry_after_locked(self) -> int:
+        # Time for the workers to drain the current backlog, from the moving average run duration.
+        average = self._average_duration if self._average_duration is not None else 1.0
+        return max(1, math.ceil(average * len(self._queue) / self._workers))
+
+    def _ensure_workers_locked(self) -> None:
+        while len(self._threads) < self._workers:
+            worker = threading.Thread(target=self._work, name=f"research-run-{len(self._threads)}", daemon=True)
+            self._threads.append(worker)
+            worker.start()
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                _, _, run_id = self._queue.pop(0)
+                self._active += 1
+
+            started = time.perf_counter()
+            try:
+                self._handler(run_id)
+            except Exception:  # pragma: no cover - handlers record their own failures
+                pass
+            finally:
+                duration = time.perf_counter() - started
+                with self._condition:
+                    self._active -= 1
+                    if self._average_duration is None:
+                        self._average_duration = duration
+                    else:
+                        self._average_duration = 0.8 * self._average_duration + 0.2 * duration
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.config import Settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class SharedRunState(ABC):
+    """Live state of runs that every server process can read.
+
+    With several server workers a run executes in one process while status,
+    partial-result and event requests for it land on any of them. Run status
+    rows already live in the run store; this holds what only the executing
+    process knows, as JSON fields per run. Entries expire ``ttl`` seconds after
+    their last write so the state of a worker that died mid-run does not linger.
+    """
+
+    def __init__(self, ttl: Optional[float] = None) -> None:
+        self.ttl = ttl
+
+    @abstractmethod
+    def set(self, run_id: str, field: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, run_id: str, field: str) -> Any:
+        ...
+
+    @abstractmethod
+    def discard(self, run_id: str) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def _expires_at(self) -> Optional[float]:
+        return time.time() + self.ttl if self.ttl else None
+
+
+class MemoryRunState(SharedRunState):
+    """Process-local state, for single-process deployments and the memory run store."""
+
+    def __init__(self, ttl: Optional[float] = None) -> None:
+        super().__init__(ttl)
+        self._lock = threading.Lock()
+        self._runs: Dict[str, Tuple[Optional[float], Dict[str, Any]]] = {}
+
+    def set(self, run_id: str, field: str, value: Any) -> None:
+        with self._lock:
+            _, fields = self._runs.get(run_id, (None, {}))
+            fields[field] = value
+            self._runs[run_id] = (self._expires_at(), fields)
+
+    def get(self, run_id: str, field: str) -> Any:
+        with self._lock:
+            entry = self._runs.get(run_id)
+            if entry is None:
+                return None
+            expires_at, fields = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._runs[run_id]
+                return None
+            return fields.get(field)
+
+    def discard(self, run_id: str) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+
+class SQLiteRunState(SharedRunState):
+    """State in a small WAL-mode SQLite file, shared by every process on the host.
+
+    Writes go straight to the file in autocommit mode, so a read from another
+    process sees them at once.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None) -> None:
+        super().__init__(ttl)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS run_state ("
+            "run_id TEXT NOT NULL, field TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL, "
+            "PRIMARY KEY (run_id, field))"
+        )
+        self._purge_expired()
+
+    def set(self, run_id: str, field: str, value: Any) -> None:
+        encoded = json.dumps(value, separators=(",", ":"), default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO run_state (run_id, field, value, expires_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (run_id, field) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                (run_id, field, encoded, self._expires_at()),
+            )
+
+    def get(self, run_id: str, field: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM run_state WHERE run_id = ? AND field = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (run_id, field, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def discard(self, run_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM run_state WHERE run_id = ?", (run_id,))
+        self._purge_expired()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _purge_expired(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM run_state WHERE expires_at <= ?", (time.time(),))
+
+
+class RedisRunState(SharedRunState):
+    """State in one Redis hash per run, for deployments that already run Redis.
+
+    Only ``hset``, ``hget``, ``expire`` and ``delete`` are used, so any client
+    with the redis-py interface works, including in-process stand-ins.
+    """
+
+    def __init__(self, client: Any, ttl: Optional[float] = None, prefix: str = "kivo:run:") -> None:
+        super().__init__(ttl)
+        self._client = client
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, ttl: Optional[float] = None) -> "RedisRunState":
+        import redis
+
+        return cls(redis.Redis.from_url(url), ttl)
+
+    def set(self, run_id: str, field: str, value: Any) -> None:
+        key = self._prefix + run_id
+        self._client.hset(key, field, json.dumps(value, separators=(",", ":"), default=str))
+        if self.ttl:
+            self._client.expire(key, max(1, math.ceil(self.ttl)))
+
+    def get(self, run_id: str, field: str) -> Any:
+        value = self._client.hget(self._prefix + run_id, field)
+        return json.loads(value) if value is not None else None
+
+    def discard(self, run_id: str) -> None:
+        self._client.delete(self._prefix + run_id)
+
+    def close(self) -> None:
+        close = getattr(self._client, "close", None)
+        if close is not None:
+            close()
+
+
+def redis_available() -> bool:
+    return importlib.util.find_spec("redis") is not None
+
+
+def build_run_state(settings: Settings) -> SharedRunState:
+    backend = settings.RUN_STATE
+    if backend == "auto":
+        backend = "memory" if settings.RUN_STORE == "memory" else "sqlite"
+    ttl = settings.RUN_STATE_TTL_SECONDS or None
+    if backend == "memory":
+        return MemoryRunState(ttl)
+    if backend == "redis":
+        if settings.RUN_STATE_REDIS_URL and redis_available():
+            return RedisRunState.from_url(settings.RUN_STATE_REDIS_URL, ttl)
+        # Servers on other hosts will not see this host's runs.
+        logger.warning(
+            "RUN_STATE is 'redis' but %s; sharing run state through SQLite on this host only",
+            "RUN_STATE_REDIS_URL is not set" if not settings.RUN_STATE_REDIS_URL else "the redis package is not installed",
+        )
+    # Without Redis, state is still shared by the processes on this host.
+    directory = Path(settings.RUN_STORE_PATH).parent if settings.RUN_STORE_PATH else Path(settings.storage_path)
+    return SQLiteRunState(str(directory / "state.db"), ttl)
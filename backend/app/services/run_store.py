@@ -0,0 +1,495 @@
+from __future__ import annotations
+
+import json
+import shutil
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, event, func, update
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from ..core.config import Settings
+from ..models.run import ResearchRun, ResearchRunPayload
+from ..schemas.research import ResearchRequest, ResearchSummary
+from .columnar import ColumnarPayloadReader, DictPayloadReader, PayloadReader, columnar_available, write_columnar
+
+
+STATUS_FIELDS = ("status", "progress", "stage", "message", "started_at", "finished_at")
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+# Run ids per ``IN (...)`` query when reading many statuses at once.
+STATUS_QUERY_CHUNK = 500
+
+
+def encode_payload(payload: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8"), 1)
+
+
+def decode_payload(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob))
+
+
+class RunStore(ABC):
+    """Where run status, summaries and payloads live.
+
+    Status records are plain dicts with the request, status, progress, stage,
+    message, pipeline mode and timestamps. Payloads of completed runs are evicted
+    once older than ``payload_ttl`` seconds, and the least recently read ones are
+    dropped beyond ``max_payloads``; status rows and summaries are kept.
+    """
+
+    def __init__(self, payload_ttl: Optional[float] = None, max_payloads: Optional[int] = None) -> None:
+        self.payload_ttl = payload_ttl
+        self.max_payloads = max_payloads
+
+    @abstractmethod
+    def create(self, run_id: str, request: ResearchRequest, pipeline_mode: str, created_at: datetime) -> None:
+        ...
+
+    def create_many(self, runs: Sequence[Tuple[str, ResearchRequest, str, datetime]]) -> None:
+        for run_id, request, pipeline_mode, created_at in runs:
+            self.create(run_id, request, pipeline_mode, created_at)
+
+    @abstractmethod
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    def get_statuses(self, run_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """``STATUS_FIELDS`` of each known run, without loading requests; unknown ids are left out."""
+
+        statuses = {}
+        for run_id in run_ids:
+            run = self.get(run_id)
+            if run is not None:
+                statuses[run_id] = {field: run[field] for field in STATUS_FIELDS}
+        return statuses
+
+    @abstractmethod
+    def update(self, run_id: str, **changes: Any) -> None:
+        ...
+
+    @abstractmethod
+    def complete(
+        self,
+        run_id: str,
+        summary: ResearchSummary,
+        payload: Dict[str, Any],
+        state: Optional[Dict[str, Any]] = None,
+        **changes: Any,
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def get_state(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Incremental state saved with the payload; evicted together with it."""
+
+    @abstractmethod
+    def get_summary(self, run_id: str) -> Optional[ResearchSummary]:
+        ...
+
+    @abstractmethod
+    def open_payload(self, run_id: str) -> Optional[PayloadReader]:
+        """Lazy access to a stored payload, for serving parts of it."""
+
+    def get_payload(self, run_id: str) -> Optional[Dict[str, Any]]:
+        reader = self.open_payload(run_id)
+        return reader.to_payload() if reader is not None else None
+
+    @abstractmethod
+    def delete(self, run_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def evict(self, now: Optional[datetime] = None) -> int:
+        """Drop expired and least recently used payloads; returns how many were removed."""
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def _expiry_cutoff(self, now: Optional[datetime]) -> Optional[datetime]:
+        if self.payload_ttl is None:
+            return None
+        return (now or datetime.utcnow()) - timedelta(seconds=self.payload_ttl)
+
+
+class MemoryRunStore(RunStore):
+    def __init__(self, payload_ttl: Optional[float] = None, max_payloads: Optional[int] = None) -> None:
+        super().__init__(payload_ttl, max_payloads)
+        self._lock = threading.Lock()
+        self._runs: Dict[str, Dict[str, Any]] = {}
+        self._summaries: Dict[str, ResearchSummary] = {}
+        self._payloads: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._states: Dict[str, Dict[str, Any]] = {}
+
+    def create(self, run_id: str, request: ResearchRequest, pipeline_mode: str, created_at: datetime) -> None:
+        self.create_many([(run_id, request, pipeline_mode, created_at)])
+
+    def create_many(self, runs: Sequence[Tuple[str, ResearchRequest, str, datetime]]) -> None:
+        with self._lock:
+            for run_id, request, pipeline_mode, created_at in runs:
+                self._runs[run_id] = {
+                    "run_id": run_id,
+                    "request": request,
+                    "status": "queued",
+                    "progress": 0.0,
+                    "stage": None,
+                    "message": None,
+                    "pipeline_mode": pipeline_mode,
+                    "created_at": created_at,
+                    "started_at": None,
+                    "finished_at": None,
+                }
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            run = self._runs.get(run_id)
+            return dict(run) if run is not None else None
+
+    def get_statuses(self, run_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            runs = self._runs
+            return {
+                run_id: {field: runs[run_id][field] for field in STATUS_FIELDS}
+                for run_id in run_ids
+                if run_id in runs
+            }
+
+    def update(self, run_id: str, **changes: Any) -> None:
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None:
+                run.update(changes)
+
+    def complete(
+        self,
+        run_id: str,
+        summary: ResearchSummary,
+        payload: Dict[str, Any],
+        state: Optional[Dict[str, Any]] = None,
+        **changes: Any,
+    ) -> None:
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return
+            run.update(changes)
+            self._summaries[run_id] = summary
+            self._payloads[run_id] = payload
+            if state is not None:
+                self._states[run_id] = state
+        self.evict()
+
+    def get_state(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._states.get(run_id)
+
+    def get_summary(self, run_id: str) -> Optional[ResearchSummary]:
+        with self._lock:
+            return self._summaries.get(run_id)
+
+    def open_payload(self, run_id: str) -> Optional[PayloadReader]:
+        with self._lock:
+            payload = self._payloads.get(run_id)
+            if payload is None:
+                return None
+            self._payloads.move_to_end(run_id)
+            return DictPayloadReader(payload)
+
+    def delete(self, run_id: str) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+            self._summaries.pop(run_id, None)
+            self._payloads.pop(run_id, None)
+            self._states.pop(run_id, None)
+
+    def evict(self, now: Optional[datetime] = None) -> int:
+        cutoff = self._expiry_cutoff(now)
+        removed = 0
+        with self._lock:
+            if cutoff is not None:
+                for run_id in [run_id for run_id in self._payloads if self._runs[run_id]["finished_at"] < cutoff]:
+                    del self._payloads[run_id]
+                    self._states.pop(run_id, None)
+                    removed += 1
+            if self.max_payloads is not None:
+                while len(self._payloads) > self.max_payloads:
+                    run_id, _ = self._payloads.popitem(last=False)
+                    self._states.pop(run_id, None)
+                    removed += 1
+        return removed
+
+
+class SQLiteRunStore(RunStore):
+    """SQLite (WAL) store built on the ``ResearchRun`` and ``ResearchRunPayload`` tables.
+
+    Progress updates are buffered and written in one transaction every
+    ``flush_interval`` seconds; reads in this process see buffered changes
+    immediately. Completion writes the final status, summary and payload at once.
+
+    Flushes, completions and deletes hold one write lock from taking the
+    buffered changes until their commit, so a flush that took a run's progress
+    can never land after that run's final row. Buffered writes also never move
+    a run out of a terminal status.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        payload_ttl: Optional[float] = None,
+        max_payloads: Optional[int] = None,
+        flush_interval: float = 0.25,
+        payload_dir: Optional[str] = None,
+    ) -> None:
+        super().__init__(payload_ttl, max_payloads)
+        self._payload_dir = Path(payload_dir) if payload_dir else None
+        if self._payload_dir is not None:
+            self._payload_dir.mkdir(parents=True, exist_ok=True)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._engine = create_engine(
+            f"sqlite:///{path}",
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+        event.listen(self._engine, "connect", _configure_sqlite)
+        SQLModel.metadata.create_all(
+            self._engine,
+            tables=[ResearchRun.__table__, ResearchRunPayload.__table__],
+        )
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._accessed: Dict[str, datetime] = {}
+        self._flush_interval = flush_interval
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="run-store-flush", daemon=True)
+        self._flusher.start()
+
+    def create(self, run_id: str, request: ResearchRequest, pipeline_mode: str, created_at: datetime) -> None:
+        self.create_many([(run_id, request, pipeline_mode, created_at)])
+
+    def create_many(self, runs: Sequence[Tuple[str, ResearchRequest, str, datetime]]) -> None:
+        with Session(self._engine) as session:
+            session.add_all(
+                [
+                    ResearchRun(
+                        run_id=run_id,
+                        topic=request.topic,
+                        request_payload=request.json(),
+                        pipeline_mode=pipeline_mode,
+                        created_at=created_at,
+                        updated_at=created_at,
+                    )
+                    for run_id, request, pipeline_mode, created_at in runs
+                ]
+            )
+            session.commit()
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with Session(self._engine) as session:
+            row = session.exec(select(ResearchRun).where(ResearchRun.run_id == run_id)).first()
+            if row is None:
+                return None
+            run = {
+                "run_id": row.run_id,
+                "request": ResearchRequest.parse_raw(row.request_payload),
+                "pipeline_mode": row.pipeline_mode,
+                "created_at": row.created_at,
+            }
+            for field in STATUS_FIELDS:
+                run[field] = getattr(row, field)
+        with self._lock:
+            run.update(self._pending.get(run_id, {}))
+        return run
+
+    def get_statuses(self, run_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        unique_ids = list(dict.fromkeys(run_ids))
+        columns = [getattr(ResearchRun, field) for field in STATUS_FIELDS]
+        statuses: Dict[str, Dict[str, Any]] = {}
+        with Session(self._engine) as session:
+            # Chunked to stay under SQLite's bound-parameter limit.
+            for start in range(0, len(unique_ids), STATUS_QUERY_CHUNK):
+                chunk = unique_ids[start : start + STATUS_QUERY_CHUNK]
+                for row in session.exec(select(ResearchRun.run_id, *columns).where(ResearchRun.run_id.in_(chunk))):
+                    statuses[row[0]] = dict(zip(STATUS_FIELDS, row[1:]))
+        with self._lock:
+            for run_id, status in statuses.items():
+                pending = self._pending.get(run_id)
+                if pending:
+                    status.update((field, pending[field]) for field in STATUS_FIELDS if field in pending)
+        return statuses
+
+    def update(self, run_id: str, **changes: Any) -> None:
+        with self._lock:
+            self._pending.setdefault(run_id, {}).update(changes)
+
+    def complete(
+        self,
+        run_id: str,
+        summary: ResearchSummary,
+        payload: Dict[str, Any],
+        state: Optional[Dict[str, Any]] = None,
+        **changes: Any,
+    ) -> None:
+        if self._payload_dir is not None:
+            payload_format, blob = "columnar", b""
+            size_bytes = write_columnar(self._payload_dir / run_id, payload)
+        else:
+            payload_format, blob = "json", encode_payload(payload)
+            size_bytes = len(blob)
+        with self._write_lock:
+            with self._lock:
+                values = self._pending.pop(run_id, {})
+            values.update(changes)
+            now = datetime.utcnow()
+            with Session(self._engine) as session:
+                session.exec(
+                    update(ResearchRun)
+                    .where(ResearchRun.run_id == run_id)
+                    .values(summary_payload=summary.json(), updated_at=now, **values)
+                )
+                session.merge(
+                    ResearchRunPayload(
+                        run_id=run_id,
+                        format=payload_format,
+                        payload=blob,
+                        state=encode_payload(state) if state is not None else None,
+                        size_bytes=size_bytes,
+                        created_at=now,
+                        accessed_at=now,
+                    )
+                )
+                session.commit()
+        self.evict()
+
+    def get_summary(self, run_id: str) -> Optional[ResearchSummary]:
+        with Session(self._engine) as session:
+            summary = session.exec(select(ResearchRun.summary_payload).where(ResearchRun.run_id == run_id)).first()
+        return ResearchSummary.parse_raw(summary) if summary else None
+
+    def get_state(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with Session(self._engine) as session:
+            blob = session.exec(select(ResearchRunPayload.state).where(ResearchRunPayload.run_id == run_id)).first()
+        return decode_payload(blob) if blob else None
+
+    def open_payload(self, run_id: str) -> Optional[PayloadReader]:
+        with Session(self._engine) as session:
+            row = session.exec(
+                select(ResearchRunPayload.format, ResearchRunPayload.payload).where(ResearchRunPayload.run_id == run_id)
+            ).first()
+        if row is None:
+            return None
+        payload_format, blob = row
+        if payload_format == "columnar":
+            directory = self._payload_dir / run_id if self._payload_dir is not None else None
+            if directory is None or not directory.exists():
+                return None
+            reader: PayloadReader = ColumnarPayloadReader(directory)
+        else:
+            reader = DictPayloadReader(decode_payload(blob))
+        with self._lock:
+            self._accessed[run_id] = datetime.utcnow()
+        return reader
+
+    def delete(self, run_id: str) -> None:
+        with self._write_lock:
+            with self._lock:
+                self._pending.pop(run_id, None)
+                self._accessed.pop(run_id, None)
+            with Session(self._engine) as session:
+                session.exec(delete(ResearchRunPayload).where(ResearchRunPayload.run_id == run_id))
+                session.exec(delete(ResearchRun).where(ResearchRun.run_id == run_id))
+                session.commit()
+        self._remove_payload_files([run_id])
+
+    def evict(self, now: Optional[datetime] = None) -> int:
+        self.flush()
+        cutoff = self._expiry_cutoff(now)
+        with Session(self._engine) as session:
+            evicted = []
+            if cutoff is not None:
+                evicted.extend(
+                    session.exec(select(ResearchRunPayload.run_id).where(ResearchRunPayload.created_at < cutoff)).all()
+                )
+            if self.max_payloads is not None:
+                count = session.exec(select(func.count()).select_from(ResearchRunPayload)).one()
+                excess = count - len(evicted) - self.max_payloads
+                if excess > 0:
+                    oldest = (
+                        select(ResearchRunPayload.run_id)
+                        .where(ResearchRunPayload.run_id.not_in(evicted))
+                        .order_by(ResearchRunPayload.accessed_at, ResearchRunPayload.created_at)
+                        .limit(excess)
+                    )
+                    evicted.extend(session.exec(oldest).all())
+            if evicted:
+                session.exec(delete(ResearchRunPayload).where(ResearchRunPayload.run_id.in_(evicted)))
+                session.commit()
+        self._remove_payload_files(evicted)
+        return len(evicted)
+
+    def _remove_payload_files(self, run_ids: List[str]) -> None:
+        if self._payload_dir is None:
+            return
+        for run_id in run_ids:
+            # Open readers keep their memory maps; the files go once those are closed.
+            shutil.rmtree(self._payload_dir / run_id, ignore_errors=True)
+
+    def flush(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                accessed, self._accessed = self._accessed, {}
+            if not pending and not accessed:
+                return
+            now = datetime.utcnow()
+            with Session(self._engine) as session:
+                for run_id, values in pending.items():
+                    statement = update(ResearchRun).where(ResearchRun.run_id == run_id)
+                    if values.get("status") not in TERMINAL_STATUSES:
+                        statement = statement.where(ResearchRun.status.not_in(TERMINAL_STATUSES))
+                    session.exec(statement.values(updated_at=now, **values))
+                for run_id, accessed_at in accessed.items():
+                    session.exec(
+                        update(ResearchRunPayload)
+                        .where(ResearchRunPayload.run_id == run_id)
+                        .values(accessed_at=accessed_at)
+                    )
+                session.commit()
+
+    def close(self) -> None:
+        self._closed.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        self._engine.dispose()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception:  # pragma: no cover - retried on the next tick
+                pass
+
+
+def _configure_sqlite(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def build_run_store(settings: Settings) -> RunStore:
+    ttl = settings.RUN_PAYLOAD_TTL_SECONDS or None
+    max_payloads = settings.RUN_PAYLOAD_MAX_ENTRIES or None
+    if settings.RUN_STORE == "memory":
+        return MemoryRunStore(ttl, max_payloads)
+    path = settings.RUN_STORE_PATH or str(Path(settings.storage_path) / "runs.db")
+    payload_dir = None
+    if settings.RUN_PAYLOAD_FORMAT == "columnar" and columnar_available():
+        payload_dir = str(Path(path).parent / "payloads")
+    return SQLiteRunStore(path, ttl, max_payloads, settings.RUN_STATUS_FLUSH_INTERVAL, payload_dir)
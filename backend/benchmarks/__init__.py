@@ -0,0 +1 @@
+"""Performance benchmarks for Kivo backend pipelines."""
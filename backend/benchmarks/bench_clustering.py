@@ -0,0 +1,86 @@
+"""Compare inverted-index greedy clustering against the original linear scan.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_clustering --sizes 1000 10000 50000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List, Sequence
+
+from app.pipelines.fallback_pipeline import greedy_cluster_items, jaccard_similarity, tokenize
+
+
+def build_items(size: int, seed: int = 13) -> List[Dict[str, Any]]:
+    """Many small themed clusters sharing a pool of very common tokens."""
+
+    rng = random.Random(seed)
+    common = [f"common{idx}" for idx in range(20)]
+    themes = [[f"t{theme}w{idx}" for idx in range(8)] for theme in range(max(size // 4, 1))]
+    items = []
+    for position in range(size):
+        theme = rng.choice(themes)
+        tokens = rng.sample(theme, rng.randint(4, len(theme))) + rng.sample(common, rng.randint(1, 4))
+        text = " ".join(tokens)
+        items.append({"clean_text": text, "text": text, "engagement_score": float(position % 17)})
+    return items
+
+
+def linear_cluster_count(items: Sequence[Dict[str, Any]], topic_tokens: Sequence[str], threshold: float = 0.6) -> int:
+    clusters: List[set] = []
+    for item in items:
+        item_tokens = tokenize(item.get("clean_text", ""))
+        for cluster_tokens in clusters:
+            if jaccard_similarity(item_tokens, cluster_tokens) >= threshold:
+                cluster_tokens.update(item_tokens)
+                break
+        else:
+            clusters.append(set(item_tokens) or set(topic_tokens))
+    return len(clusters)
+
+
+def run(sizes: Sequence[int], baseline_limit: int) -> List[Dict[str, Any]]:
+    results = []
+    for size in sizes:
+        items = build_items(size)
+        started = time.perf_counter()
+        clusters = greedy_cluster_items(items, ["topic"])
+        indexed_seconds = time.perf_counter() - started
+
+        row: Dict[str, Any] = {
+            "items": size,
+            "clusters": len(clusters),
+            "indexed_seconds": round(indexed_seconds, 4),
+            "linear_seconds": None,
+            "speedup": None,
+        }
+        if size <= baseline_limit:
+            started = time.perf_counter()
+            linear_clusters = linear_cluster_count(items, ["topic"])
+            linear_seconds = time.perf_counter() - started
+            assert linear_clusters == len(clusters)
+            row["linear_seconds"] = round(linear_seconds, 4)
+            row["speedup"] = round(linear_seconds / max(indexed_seconds, 1e-9), 1)
+        results.append(row)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument(
+        "--baseline-limit",
+        type=int,
+        default=10000,
+        help="Skip the quadratic linear-scan baseline above this many items.",
+    )
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.baseline_limit), indent=2))
+
+
+if __name__ == "__main__":
+    main()
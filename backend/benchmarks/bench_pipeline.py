@@ -0,0 +1,219 @@
+"""Time every pipeline stage on seeded synthetic corpora and record peak memory.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_pipeline --sizes 1000 10000 100000 --output bench.json
+    python -m benchmarks.bench_pipeline --baseline bench.json   # compare with an earlier commit
+    python -m benchmarks.bench_pipeline --depths default deep   # sampled vs exhaustive runs
+
+Each size runs in a fresh spawned process, so its peak RSS is its own and not
+the high-water mark of a larger case before it. Stage times come from the
+``metrics`` the pipelines embed in their payloads.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from benchmarks.corpus import DEFAULT_DUPLICATE_RATE, generate_posts
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+
+STAGES = ("normalize", "dedup", "sentiment", "cluster", "summarize")
+# Format of the JSON document; bump when fields change meaning.
+SCHEMA_VERSION = 2
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def load_pipeline(name: str):
+    if name == "full":
+        from app.pipelines import full_pipeline
+
+        return full_pipeline.run_pipeline
+    from app.pipelines import fallback_pipeline
+
+    return fallback_pipeline.run_pipeline
+
+
+def run_case(pipeline: str, size: int, seed: int, duplicate_rate: float, depth: str = "deep") -> Dict[str, Any]:
+    from app.schemas.research import ResearchRequest
+
+    run_pipeline = load_pipeline(pipeline)
+    started = time.perf_counter()
+    posts = generate_posts(size, seed=seed, duplicate_rate=duplicate_rate)
+    generate_seconds = time.perf_counter() - started
+    corpus_rss = peak_rss_mb()
+
+    started = time.perf_counter()
+    payload, _ = run_pipeline("bench", ResearchRequest(topic="battery checkout", depth=depth), posts)
+    wall_seconds = time.perf_counter() - started
+
+    metrics = payload.get("metrics") or {}
+    stages = {
+        stage: {key: entry[key] for key in ("wall_ms", "cpu_ms") if key in entry}
+        for stage, entry in (metrics.get("stages") or {}).items()
+    }
+    dedup = (metrics.get("stages") or {}).get("dedup", {})
+    return {
+        "pipeline": pipeline,
+        "depth": depth,
+        "items": size,
+        "items_analysed": (payload.get("sampling") or {}).get("items_analysed", size),
+        "items_kept": len(payload["items"]),
+        "clusters": len(payload["clusters"]),
+        "pairs_compared": dedup.get("pairs_compared"),
+        "generate_seconds": round(generate_seconds, 4),
+        "wall_seconds": round(wall_seconds, 4),
+        "items_per_second": round(size / wall_seconds, 1) if wall_seconds else None,
+        "stages": {stage: stages.get(stage) for stage in STAGES},
+        "corpus_peak_rss_mb": corpus_rss,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_isolated(pipeline: str, size: int, seed: int, duplicate_rate: float, depth: str = "deep") -> Dict[str, Any]:
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(run_case, (pipeline, size, seed, duplicate_rate, depth))
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=10,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run(
+    sizes: Sequence[int],
+    pipelines: Sequence[str] = ("lite",),
+    seed: int = 7,
+    duplicate_rate: float = DEFAULT_DUPLICATE_RATE,
+    isolated: bool = True,
+    depths: Sequence[str] = ("deep",),
+) -> Dict[str, Any]:
+    execute = run_isolated if isolated else run_case
+    results = [
+        execute(pipeline, size, seed, duplicate_rate, depth)
+        for pipeline in pipelines
+        for depth in depths
+        for size in sizes
+    ]
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "benchmark": "pipeline",
+        "created_at": datetime.utcnow().isoformat(),
+        "seed": seed,
+        "duplicate_rate": duplicate_rate,
+        "isolated": isolated,
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Current-over-baseline wall time ratios for each case both documents share."""
+
+    # Reports from before depths were recorded measured deep runs.
+    previous = {(row["pipeline"], row.get("depth", "deep"), row["items"]): row for row in baseline.get("results", [])}
+    rows = []
+    for row in current["results"]:
+        before = previous.get((row["pipeline"], row.get("depth", "deep"), row["items"]))
+        if before is None:
+            continue
+        stages = {}
+        for stage in STAGES:
+            old, new = (before["stages"] or {}).get(stage), (row["stages"] or {}).get(stage)
+            if old and new and old.get("wall_ms"):
+                stages[stage] = round(new["wall_ms"] / old["wall_ms"], 3)
+        rows.append(
+            {
+                "pipeline": row["pipeline"],
+                "depth": row.get("depth", "deep"),
+                "items": row["items"],
+                "wall_ratio": round(row["wall_seconds"] / before["wall_seconds"], 3) if before["wall_seconds"] else None,
+                "peak_rss_delta_mb": (
+                    round(row["peak_rss_mb"] - before["peak_rss_mb"], 1)
+                    if row.get("peak_rss_mb") is not None and before.get("peak_rss_mb") is not None
+                    else None
+                ),
+                "stage_ratios": stages,
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--pipelines", nargs="+", choices=("lite", "full"), default=["lite"])
+    parser.add_argument(
+        "--depths",
+        nargs="+",
+        choices=("default", "deep"),
+        default=["deep"],
+        help="Research depths to run; default-depth runs analyse a stratified sample.",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--duplicate-rate", type=float, default=DEFAULT_DUPLICATE_RATE)
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run every case in this process; faster, but peak RSS becomes a running maximum.",
+    )
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against.")
+    args = parser.parse_args()
+
+    report = run(
+        args.sizes,
+        args.pipelines,
+        args.seed,
+        args.duplicate_rate,
+        isolated=not args.in_process,
+        depths=args.depths,
+    )
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            report["comparison"] = compare(json.load(handle), report)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Seeded synthetic Reddit/X corpora shaped like collector output.
+
+Posts mix a handful of product topics with Zipf-like popularity plus
+off-topic noise. Reddit posts have long, log-normally distributed bodies;
+tweets are short and capped at 280 characters. A configurable share of posts
+are near-duplicates of earlier ones (reposts, quote edits, added hashtags or
+links), so the dedup stage sees a realistic hit rate. The same seed always
+yields the same corpus.
+"""
+from __future__ import annotations
+
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Sequence
+
+
+TOPICS: Dict[str, Sequence[str]] = {
+    "battery": ("battery", "drains", "charge", "charging", "overnight", "percent", "hours", "dies", "cable", "heat"),
+    "checkout": ("checkout", "payment", "card", "declined", "cart", "crash", "page", "error", "paypal", "refund"),
+    "shipping": ("shipping", "delivery", "package", "tracking", "courier", "late", "lost", "warehouse", "weeks", "address"),
+    "support": ("support", "ticket", "agent", "chat", "reply", "waiting", "hold", "email", "escalate", "answer"),
+    "login": ("login", "password", "reset", "account", "locked", "code", "verification", "sso", "session", "logout"),
+    "sync": ("sync", "cloud", "backup", "files", "conflict", "offline", "upload", "folder", "version", "restore"),
+    "pricing": ("price", "subscription", "plan", "tier", "renewal", "discount", "trial", "billing", "expensive", "cancel"),
+    "update": ("update", "version", "release", "bug", "regression", "rollback", "patch", "changelog", "beta", "broke"),
+}
+FILLER = (
+    "i", "the", "my", "it", "this", "after", "since", "again", "every", "time", "just", "really", "still",
+    "anyone", "else", "know", "why", "does", "keep", "when", "today", "yesterday", "week", "phone", "app",
+    "laptop", "store", "team", "they", "we", "have", "tried", "already", "nothing", "works", "seems",
+)
+SENTIMENT = (
+    "love", "great", "awesome", "thanks", "helpful", "hate", "terrible", "awful", "annoying", "frustrating",
+    "worst", "disappointed", "happy", "fine", "ok",
+)
+NOISE = ("weather", "football", "recipe", "movie", "coffee", "weekend", "music", "travel", "garden", "game")
+SUBREDDITS = ("techsupport", "gadgets", "android", "apple", "sysadmin", "smallbusiness", "shopping")
+NON_ASCII = ("café", "naïve", "über", "😡", "🔋", "📦", "—")
+
+# Share of posts that copy an earlier post with small edits.
+DEFAULT_DUPLICATE_RATE = 0.15
+# Share of posts with no product topic at all.
+DEFAULT_NOISE_RATE = 0.1
+REDDIT_SHARE = 0.55
+X_MAX_CHARS = 280
+
+
+def _topic_weights(count: int) -> List[float]:
+    # Zipf-like: the most discussed topic gets about three times the share of the fourth.
+    return [1.0 / (rank + 1) ** 0.8 for rank in range(count)]
+
+
+def _word_count(rng: random.Random, platform: str) -> int:
+    if platform == "reddit":
+        # Median around 45 words with a long tail of essays.
+        return max(4, min(600, int(rng.lognormvariate(math.log(45), 0.8))))
+    return max(3, min(55, int(rng.lognormvariate(math.log(18), 0.5))))
+
+
+def _compose(rng: random.Random, topic: Sequence[str], words: int) -> str:
+    tokens = []
+    for _ in range(words):
+        roll = rng.random()
+        if roll < 0.35:
+            tokens.append(rng.choice(topic))
+        elif roll < 0.42:
+            tokens.append(rng.choice(SENTIMENT))
+        elif roll < 0.43:
+            tokens.append(rng.choice(NON_ASCII))
+        else:
+            tokens.append(rng.choice(FILLER))
+    text = " ".join(tokens)
+    if rng.random() < 0.3:
+        text = text[0].upper() + text[1:] + rng.choice(("!", "?", "...", "."))
+    if rng.random() < 0.08:
+        text += f" https://example.com/{rng.randrange(10**6)}"
+    return text
+
+
+def _near_duplicate(rng: random.Random, text: str) -> str:
+    edit = rng.random()
+    if edit < 0.4:
+        return text
+    tokens = text.split()
+    if edit < 0.7 and len(tokens) > 8:
+        tokens.pop(rng.randrange(len(tokens)))
+    elif edit < 0.85:
+        tokens.append(f"#{rng.choice(('fail', 'help', 'psa', 'rant'))}")
+    else:
+        tokens.append(f"https://example.com/r/{rng.randrange(10**6)}")
+    return " ".join(tokens)
+
+
+def generate_posts(
+    count: int,
+    seed: int = 7,
+    duplicate_rate: float = DEFAULT_DUPLICATE_RATE,
+    noise_rate: float = DEFAULT_NOISE_RATE,
+    topics: Sequence[str] = tuple(TOPICS),
+) -> List[Dict[str, Any]]:
+    """``count`` raw items in the shape the Reddit and X collectors produce."""
+
+    rng = random.Random(seed)
+    weights = _topic_weights(len(topics))
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    posts: List[Dict[str, Any]] = []
+    for idx in range(count):
+        platform = "reddit" if rng.random() < REDDIT_SHARE else "x"
+        if posts and rng.random() < duplicate_rate:
+            source = posts[rng.randrange(len(posts))]
+            text = _near_duplicate(rng, source["text"])
+        elif rng.random() < noise_rate:
+            text = _compose(rng, NOISE, _word_count(rng, platform))
+        else:
+            topic = TOPICS[rng.choices(topics, weights)[0]]
+            text = _compose(rng, topic, _word_count(rng, platform))
+        if platform == "x":
+            text = text[:X_MAX_CHARS]
+        engagement = int(rng.paretovariate(1.3)) - 1
+        posts.append(
+            {
+                "id": f"{'reddit' if platform == 'reddit' else 'x'}_{seed}_{idx}",
+                "platform": platform,
+                "author": f"user{rng.randrange(count // 3 + 1)}",
+                "timestamp": (start + timedelta(seconds=rng.randrange(30 * 86400))).isoformat(),
+                "text": text,
+                "score": engagement,
+                "replies": int(engagement * rng.random() * 0.5),
+                "retweets_or_shares": int(engagement * rng.random() * 0.2) if platform == "x" else None,
+                "url": f"https://example.com/{platform}/{idx}",
+                "subreddit_or_hashtag": rng.choice(SUBREDDITS) if platform == "reddit" else None,
+                "language": "en",
+            }
+        )
+    return posts
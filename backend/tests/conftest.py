@@ -1,5 +1,23 @@
+import os
+
 import pytest
 
+# Tests never reach the real source APIs; collector tests point them at a fake server.
+os.environ.setdefault("COLLECTION_ENABLED", "false")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def storage_path(tmp_path_factory):
+    """Keep the run store, state, cache and payloads of a session in a directory of its own.
+
+    Runners read their settings when started, never at import, so this applies
+    to the runner the routes share as well.
+    """
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("STORAGE_PATH", str(tmp_path_factory.mktemp("storage")))
+        yield
+
 
 @pytest.fixture(scope="session")
 def require_full_pipeline():
@@ -7,3 +25,104 @@ def require_full_pipeline():
 
     for lib in ("numpy", "sklearn", "pandas"):
         pytest.importorskip(lib, reason=f"{lib} is required for full pipeline tests")
+
+
+class FakeSourceServer:
+    """Local HTTP server imitating the Reddit search and X recent-search APIs.
+
+    ``reddit_posts``/``tweets`` are served newest first in pages of the requested
+    size; ``delay`` seconds are slept before every page and ``rate_limited``
+    responses answer 429 before serving normally.
+    """
+
+    def __init__(self):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.reddit_posts = []
+        self.tweets = []
+        self.delay = {"reddit": 0.0, "x": 0.0}
+        self.rate_limited = {"reddit": 0, "x": 0}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.handle(self)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def handle(self, handler):
+        import json
+        import time
+        from urllib.parse import parse_qs, urlparse
+
+        parsed = urlparse(handler.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        source = "reddit" if parsed.path == "/search.json" else "x" if parsed.path == "/2/tweets/search/recent" else None
+        self.requests.append((source, params, dict(handler.headers)))
+
+        status, body, headers = 404, {}, {}
+        if source is not None and self.rate_limited[source] > 0:
+            self.rate_limited[source] -= 1
+            status, headers = 429, {"Retry-After": "0.05"}
+        elif source == "reddit":
+            time.sleep(self.delay["reddit"])
+            start = int(params.get("after") or 0)
+            end = start + int(params.get("limit", 25))
+            page = self.reddit_posts[start:end]
+            status = 200
+            body = {
+                "data": {
+                    "children": [{"kind": "t3", "data": post} for post in page],
+                    "after": str(end) if end < len(self.reddit_posts) else None,
+                }
+            }
+        elif source == "x":
+            time.sleep(self.delay["x"])
+            if handler.headers.get("Authorization") != "Bearer test-token":
+                status = 401
+            else:
+                start = int(params.get("next_token") or 0)
+                end = start + int(params.get("max_results", 10))
+                status = 200
+                body = {"data": self.tweets[start:end], "meta": {"result_count": len(self.tweets[start:end])}}
+                if end < len(self.tweets):
+                    body["meta"]["next_token"] = str(end)
+
+        encoded = json.dumps(body).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(encoded)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(encoded)
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def fake_sources(monkeypatch):
+    """Fake Reddit and X APIs, with the settings pointing collectors at them."""
+
+    server = FakeSourceServer()
+    monkeypatch.setenv("COLLECTION_ENABLED", "true")
+    monkeypatch.setenv("REDDIT_BASE_URL", server.url)
+    monkeypatch.setenv("X_API_BASE_URL", server.url)
+    monkeypatch.setenv("X_BEARER_TOKEN", "test-token")
+    monkeypatch.setenv("REDDIT_RATE_PER_SECOND", "0")
+    monkeypatch.setenv("X_RATE_PER_SECOND", "0")
+    yield server
+    server.close()
@@ -1,12 +1,20 @@
 import time
 
+import pytest
 from fastapi.testclient import TestClient
 
+from app.api.routes.research import runner
 from app.main import app
 
 
 client = TestClient(app)
 
+@pytest.fixture(autouse=True, scope="module")
+def lifespan():
+    # The application's lifespan starts the research runner the routes use.
+    with client:
+        yield
+
 
 def test_run_lifecycle_pipeline():
     response = client.post(
@@ -36,4 +44,4 @@ def test_run_lifecycle_pipeline():
     payload_response = client.get(f"/research/{run_id}/json")
     assert payload_response.status_code == 200
     payload_json = payload_response.json()
-    assert payload_json["payload"]["pipeline_mode"] == "lite"
+    assert payload_json["payload"]["pipeline_mode"] == runner._pipeline_mode
@@ -0,0 +1,73 @@
+"""Tests for the synthetic corpus and the pipeline benchmark harness."""
+import json
+import statistics
+
+from benchmarks import bench_pipeline
+from benchmarks.corpus import X_MAX_CHARS, generate_posts
+from app.pipelines import fallback_pipeline
+from app.schemas.research import ResearchRequest
+
+
+def test_corpus_is_reproducible():
+    assert generate_posts(200, seed=3) == generate_posts(200, seed=3)
+    assert generate_posts(200, seed=3) != generate_posts(200, seed=4)
+
+
+def test_corpus_shape():
+    posts = generate_posts(2000, seed=11)
+    reddit = [len(post["text"].split()) for post in posts if post["platform"] == "reddit"]
+    tweets = [post["text"] for post in posts if post["platform"] == "x"]
+
+    assert len({post["id"] for post in posts}) == 2000
+    assert reddit and tweets
+    assert all(len(text) <= X_MAX_CHARS for text in tweets)
+    assert statistics.median(reddit) > statistics.median(len(text.split()) for text in tweets)
+
+
+def _kept(posts):
+    payload, _ = fallback_pipeline.run_pipeline("run", ResearchRequest(topic="battery", depth="deep"), posts)
+    return len(payload["items"])
+
+
+def test_corpus_duplicate_rate_controls_near_duplicates():
+    few = generate_posts(1000, seed=5, duplicate_rate=0.0)
+    many = generate_posts(1000, seed=5, duplicate_rate=0.4)
+
+    assert _kept(few) > 990
+    assert _kept(many) < 800
+
+
+def test_benchmark_report_is_json_with_every_stage():
+    report = bench_pipeline.run([300], ["lite"], seed=1, isolated=False)
+    row = report["results"][0]
+
+    assert json.loads(json.dumps(report)) == report
+    assert row["items"] == 300
+    assert set(row["stages"]) == set(bench_pipeline.STAGES)
+    assert all(row["stages"][stage]["wall_ms"] >= 0 for stage in bench_pipeline.STAGES)
+    assert row["peak_rss_mb"] is None or row["peak_rss_mb"] > 0
+
+
+def test_compare_reports_ratios_for_shared_cases():
+    baseline = {
+        "results": [
+            {"pipeline": "lite", "items": 100, "wall_seconds": 2.0, "peak_rss_mb": 50.0, "stages": {"dedup": {"wall_ms": 10.0}}},
+            {"pipeline": "lite", "items": 999, "wall_seconds": 1.0, "peak_rss_mb": 50.0, "stages": {}},
+        ]
+    }
+    current = {
+        "results": [
+            {"pipeline": "lite", "items": 100, "wall_seconds": 1.0, "peak_rss_mb": 40.0, "stages": {"dedup": {"wall_ms": 5.0}}},
+        ]
+    }
+
+    assert bench_pipeline.compare(baseline, current) == [
+        {
+            "pipeline": "lite",
+            "depth": "deep",
+            "items": 100,
+            "wall_ratio": 0.5,
+            "peak_rss_delta_mb": -10.0,
+            "stage_ratios": {"dedup": 0.5},
+        }
+    ]
@@ -0,0 +1,101 @@
+"""Tests for the inverted-index greedy clustering."""
+import random
+
+from app.pipelines.cluster_index import TokenClusterIndex
+from app.pipelines.fallback_pipeline import greedy_cluster_items, jaccard_similarity, tokenize
+
+
+def linear_assignments(items, topic_tokens, similarity_threshold=0.6):
+    clusters = []
+    assignments = []
+    for item in items:
+        item_tokens = tokenize(item.get("clean_text", ""))
+        for cluster_id, cluster_tokens in enumerate(clusters):
+            if jaccard_similarity(item_tokens, cluster_tokens) >= similarity_threshold:
+                cluster_tokens.update(item_tokens)
+                assignments.append(cluster_id)
+                break
+        else:
+            clusters.append(set(item_tokens) or set(topic_tokens))
+            assignments.append(len(clusters) - 1)
+    return assignments
+
+
+def build_items(size, seed=3):
+    rng = random.Random(seed)
+    common = [f"common{idx}" for idx in range(8)]
+    themes = [[f"theme{theme}word{idx}" for idx in range(6)] for theme in range(max(size // 6, 1))]
+    items = []
+    for position in range(size):
+        theme = rng.choice(themes)
+        tokens = rng.sample(theme, rng.randint(2, len(theme))) + rng.sample(common, rng.randint(0, 3))
+        if rng.random() < 0.05:
+            tokens = []
+        items.append({"clean_text": " ".join(tokens), "text": " ".join(tokens), "url": f"https://example.com/{position}"})
+    return items
+
+
+class TestTokenClusterIndex:
+    def test_find_returns_first_matching_cluster(self):
+        index = TokenClusterIndex(0.5)
+        index.add_cluster({"alpha", "beta"})
+        index.add_cluster({"alpha", "beta", "gamma"})
+        assert index.find({"alpha", "beta"}) == 0
+
+    def test_find_ignores_clusters_without_shared_tokens(self):
+        index = TokenClusterIndex(0.5)
+        index.add_cluster({"alpha"})
+        assert index.find({"gamma"}) is None
+
+    def test_extend_updates_postings(self):
+        index = TokenClusterIndex(0.6)
+        cluster_id = index.add_cluster({"alpha"})
+        index.extend(cluster_id, {"beta"})
+        assert index.tokens(cluster_id) == {"alpha", "beta"}
+        assert index.find({"alpha", "beta"}) == cluster_id
+
+    def test_empty_items_match_empty_clusters(self):
+        index = TokenClusterIndex(0.6)
+        index.add_cluster({"alpha"})
+        assert index.find(set()) is None
+        empty_id = index.add_cluster(set())
+        assert index.find(set()) == empty_id
+
+
+class TestCappedCandidates:
+    def test_only_clusters_sharing_most_probed_tokens_are_scored(self):
+        index = TokenClusterIndex(0.5, max_candidates=1)
+        index.add_cluster({"alpha", "zeta"})
+        index.add_cluster({"alpha", "beta", "gamma"})
+        assert index.find({"alpha", "beta", "gamma", "delta"}) == 1
+        assert index.comparisons == 1
+
+    def test_cap_keeps_most_assignments(self):
+        items = build_items(600, seed=4)
+        tokens = [set(tokenize(item["clean_text"])) for item in items]
+        exact, capped = TokenClusterIndex(0.6), TokenClusterIndex(0.6, max_candidates=8)
+        for index in (exact, capped):
+            for item_tokens in tokens:
+                cluster_id = index.find(item_tokens)
+                if cluster_id is None:
+                    index.add_cluster(set(item_tokens))
+                else:
+                    index.extend(cluster_id, item_tokens)
+        assert capped.comparisons < exact.comparisons
+        assert len(capped) <= len(exact) * 1.1
+
+
+class TestGreedyClusterMatchesLinearScan:
+    def test_assignments_match_linear_scan(self):
+        for seed in range(5):
+            items = build_items(600, seed=seed)
+            expected = linear_assignments(items, ["topic"])
+            clusters = greedy_cluster_items(items, ["topic"])
+            assert len(clusters) == max(expected) + 1
+            assert [cluster["count"] for cluster in clusters] == [expected.count(idx) for idx in range(len(clusters))]
+
+    def test_assignments_match_with_empty_topic(self):
+        items = build_items(300, seed=9)
+        expected = linear_assignments(items, [])
+        clusters = greedy_cluster_items(items, [])
+        assert [cluster["count"] for cluster in clusters] == [expected.count(idx) for idx in range(len(clusters))]
@@ -0,0 +1,99 @@
+"""Tests for per-cluster running aggregates and top-k summary selection."""
+import random
+from datetime import datetime
+
+from app.pipelines.cluster_summary import ClusterAggregate
+from app.pipelines.fallback_pipeline import (
+    RecordClusterer,
+    build_cluster_entry,
+    build_summary,
+    greedy_cluster_items,
+)
+from app.pipelines.records import ItemRecord, Vocabulary
+
+
+def _items(count, seed=5):
+    rng = random.Random(seed)
+    return [
+        {
+            "text": f"post {idx}",
+            "clean_text": f"post {idx}",
+            "engagement_score": float(rng.choice([0, 1, 5, 5, 12])),
+            "url": f"https://example.com/{idx}" if idx % 3 else None,
+            "source_topic": "battery",
+        }
+        for idx in range(count)
+    ]
+
+
+def test_aggregate_matches_an_entry_built_from_the_members():
+    items = _items(40)
+    aggregate = ClusterAggregate()
+    for item in items:
+        aggregate.add(item)
+
+    representative = max(items, key=lambda item: item["engagement_score"])
+    assert aggregate.representative is representative
+    assert aggregate.first_text == "post 0"
+    assert aggregate.entry(3, "battery", ["battery"], 100) == build_cluster_entry(
+        3, items, representative, "battery", ["battery"], 100
+    )
+
+
+def test_tags_rank_tokens_by_how_often_members_use_them():
+    items = [
+        {"text": "screen flicker battery", "clean_text": "screen flicker battery"},
+        {"text": "battery drain screen", "clean_text": "battery drain screen"},
+        {"text": "battery drain charger screen", "clean_text": "battery drain charger screen"},
+        {"text": "battery drain", "clean_text": "battery drain"},
+    ]
+
+    clusters = greedy_cluster_items(items, ["battery"], similarity_threshold=0.3)
+
+    assert len(clusters) == 1
+    assert clusters[0]["tags"] == ["battery", "screen", "drain", "flicker", "charger"]
+
+
+def test_token_less_clusters_are_tagged_with_the_topic():
+    vocabulary = Vocabulary()
+    clusterer = RecordClusterer(vocabulary.encode(["battery"]))
+    item = {"text": "", "clean_text": ""}
+    clusterer.add(ItemRecord(item, vocabulary.encode([])))
+
+    assert item["cluster_id"] == 1
+    assert clusterer.build(vocabulary)[0]["tags"] == ["battery"]
+
+
+def test_largest_keeps_earlier_clusters_first_on_ties():
+    vocabulary = Vocabulary()
+    clusterer = RecordClusterer([])
+    for tokens in (["a"], ["b"], ["b"], ["c"], ["c"], ["d"]):
+        clusterer.add(ItemRecord({"text": tokens[0]}, vocabulary.encode(tokens)))
+
+    assert [cluster["cluster_id"] for cluster in clusterer.largest(3)] == [2, 3, 1]
+    assert clusterer.largest(1)[0] == {"cluster_id": 2, "count": 2, "representative_text": "b"}
+
+
+def test_summary_ranks_clusters_like_a_stable_sort():
+    rng = random.Random(2)
+    clusters = [
+        {
+            "cluster_id": idx,
+            "avg_engagement": float(rng.choice([1, 2, 3])),
+            "count": rng.choice([1, 2]),
+            "statements": [f"statement {idx}"],
+            "tags": [f"tag{idx}"],
+        }
+        for idx in range(50)
+    ]
+    items = [{"url": f"https://example.com/{idx}" if idx % 2 else None} for idx in range(40)]
+
+    _, pain_points, hypotheses, _, sources = build_summary("battery", clusters, items, datetime(2024, 3, 1))
+
+    ranked = sorted(clusters, key=lambda c: (c["avg_engagement"], c["count"]), reverse=True)
+    assert pain_points == [cluster["statements"][0] for cluster in ranked[:5]]
+    assert hypotheses == [
+        f"Consider simplifying workflows related to {cluster['tags'][0]} based on {cluster['count']} signals."
+        for cluster in ranked[:3]
+    ]
+    assert sources == [f"https://example.com/{idx}" for idx in range(1, 20, 2)]
@@ -0,0 +1,230 @@
+"""Tests for the source collectors."""
+import asyncio
+import time
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.core.config import get_settings
+from app.pipelines.sampling import DEFAULT_SAMPLE_PER_PLATFORM
+from app.schemas.research import ResearchDepth, ResearchRequest
+from app.services.collectors import DEPTH_LIMITS, Source, TokenBucket, build_collector
+from app.services.research_runner import ResearchRunner
+
+
+def _posts(count, start=datetime(2024, 3, 10, tzinfo=timezone.utc)):
+    return [
+        {
+            "id": f"p{index}",
+            "title": f"post {index} about battery life",
+            "selftext": "the battery drains too fast",
+            "author": "someone",
+            "created_utc": start.timestamp() - index * 3600,
+            "score": index,
+            "num_comments": 2,
+            "permalink": f"/r/phones/comments/p{index}/",
+            "subreddit": "phones",
+        }
+        for index in range(count)
+    ]
+
+
+def _tweets(count):
+    return [
+        {
+            "id": f"{1000 + index}",
+            "text": f"tweet {index} about battery life",
+            "author_id": "42",
+            "created_at": "2024-03-10T12:00:00.000Z",
+            "lang": "en",
+            "public_metrics": {"like_count": 3, "reply_count": 1, "retweet_count": 0},
+            "entities": {"hashtags": [{"tag": "battery"}]},
+        }
+        for index in range(count)
+    ]
+
+
+def _collect(collector, request):
+    stream = collector.stream(request)
+    return list(stream), stream.errors
+
+
+@pytest.fixture
+def collector(fake_sources):
+    collector = build_collector(get_settings())
+    yield collector
+    collector.close()
+
+
+def test_collects_all_pages_from_every_source(fake_sources, collector):
+    fake_sources.reddit_posts = _posts(250)
+    fake_sources.tweets = _tweets(30)
+
+    items, errors = _collect(collector, ResearchRequest(topic="battery life", sample_limit=220))
+
+    platforms = [item["platform"] for item in items]
+    assert platforms.count("reddit") == 220
+    assert platforms.count("x") == 30
+    assert errors == {}
+    reddit_pages = [params for source, params, _ in fake_sources.requests if source == "reddit"]
+    assert [params.get("after") for params in reddit_pages] == [None, "100", "200"]
+    assert reddit_pages[-1]["limit"] == "20"
+
+
+def test_items_match_the_pipeline_schema(fake_sources, collector):
+    fake_sources.reddit_posts = _posts(1)
+    fake_sources.tweets = _tweets(1)
+
+    items, errors = _collect(collector, ResearchRequest(topic="battery life"))
+
+    reddit, tweet = sorted(items, key=lambda item: item["platform"])
+    assert reddit["id"] == "reddit_p0"
+    assert reddit["timestamp"] == "2024-03-10T00:00:00"
+    assert reddit["replies"] == 2
+    assert reddit["subreddit_or_hashtag"] == "phones"
+    assert tweet["id"] == "x_1000"
+    assert tweet["retweets_or_shares"] == 0
+    assert tweet["subreddit_or_hashtag"] == "#battery"
+
+
+def test_sources_are_fetched_concurrently(fake_sources, collector):
+    fake_sources.reddit_posts = _posts(200)
+    fake_sources.tweets = _tweets(200)
+    fake_sources.delay = {"reddit": 0.15, "x": 0.15}
+
+    started = time.perf_counter()
+    items, errors = _collect(collector, ResearchRequest(topic="battery life", sample_limit=200))
+    elapsed = time.perf_counter() - started
+
+    assert len(items) == 400
+    # Two pages per source: 0.6s when fetched one after another.
+    assert elapsed < 0.5
+
+
+def test_date_window_stops_pagination(fake_sources, collector):
+    fake_sources.reddit_posts = _posts(300)
+
+    items, errors = _collect(
+        collector,
+        ResearchRequest(topic="battery life", sources=["reddit"], from_date=date(2024, 3, 9), to_date=date(2024, 3, 9)),
+    )
+
+    assert len(items) == 24
+    assert all(item["timestamp"].startswith("2024-03-09") for item in items)
+    assert len(fake_sources.requests) == 1
+
+
+def test_rate_limited_pages_are_retried(fake_sources, collector):
+    fake_sources.reddit_posts = _posts(5)
+    fake_sources.rate_limited["reddit"] = 2
+
+    items, errors = _collect(collector, ResearchRequest(topic="battery life", sources=["reddit"]))
+
+    assert len(items) == 5
+    assert len(fake_sources.requests) == 3
+
+
+def test_failing_source_does_not_stop_others(fake_sources, monkeypatch):
+    monkeypatch.setenv("X_BEARER_TOKEN", "wrong")
+    fake_sources.reddit_posts = _posts(3)
+    collector = build_collector(get_settings())
+    try:
+        items, errors = _collect(collector, ResearchRequest(topic="battery life"))
+    finally:
+        collector.close()
+
+    assert len(items) == 3
+    assert "401" in errors["x"]
+
+
+def test_x_needs_a_bearer_token(fake_sources, monkeypatch):
+    monkeypatch.delenv("X_BEARER_TOKEN")
+    collector = build_collector(get_settings())
+    try:
+        items, errors = _collect(collector, ResearchRequest(topic="battery life", sources=["x"]))
+    finally:
+        collector.close()
+
+    assert items == []
+    assert "X_BEARER_TOKEN" in errors["x"]
+    assert fake_sources.requests == []
+
+
+def test_sources_must_implement_pages():
+    class Partial(Source):
+        name = "partial"
+
+    with pytest.raises(TypeError):
+        Partial("http://localhost", TokenBucket(0, 1))
+
+
+def test_token_bucket_limits_request_rate():
+    bucket = TokenBucket(rate=20.0, capacity=2)
+
+    async def acquire_all():
+        started = time.perf_counter()
+        for _ in range(6):
+            await bucket.acquire()
+        return time.perf_counter() - started
+
+    # Two requests pass on the burst, the other four wait 50ms each.
+    assert asyncio.run(acquire_all()) >= 0.18
+
+
+def test_runner_analyses_collected_items(fake_sources, monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    fake_sources.reddit_posts = _posts(20)
+    fake_sources.tweets = _tweets(5)
+    runner = ResearchRunner()
+    runner.start()
+    try:
+        run_id = runner.start_run(ResearchRequest(topic="battery life"))
+        for _ in range(600):
+            if runner.get_status(run_id).status in ("completed", "failed"):
+                break
+            time.sleep(0.01)
+        status = runner.get_status(run_id)
+        assert status.status == "completed", status.message
+        assert status.message is None
+        assert runner.get_payload(run_id).payload["items"]
+    finally:
+        runner.shutdown()
+
+
+def test_runner_fails_when_every_source_fails(fake_sources, monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    monkeypatch.setenv("X_BEARER_TOKEN", "wrong")
+    runner = ResearchRunner()
+    runner.start()
+    try:
+        run_id = runner.start_run(ResearchRequest(topic="battery life", sources=["x"]))
+        for _ in range(600):
+            if runner.get_status(run_id).status in ("completed", "failed"):
+                break
+            time.sleep(0.01)
+        status = runner.get_status(run_id)
+        assert status.status == "failed"
+        assert status.message.startswith("Failed during fetch: Collection failed")
+        assert 'kivo_run_failures_total{stage="fetch",error="CollectionFailed"} 1' in runner.render_metrics()
+    finally:
+        runner.shutdown()
+
+
+def test_default_depth_samples_what_it_collects(fake_sources, monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    fake_sources.reddit_posts = _posts(600)
+    runner = ResearchRunner()
+    runner.start()
+    try:
+        run_id = runner.start_run(ResearchRequest(topic="battery life", sources=["reddit"]))
+        for _ in range(600):
+            if runner.get_status(run_id).status in ("completed", "failed"):
+                break
+            time.sleep(0.01)
+        assert runner.get_status(run_id).status == "completed", runner.get_status(run_id).message
+        sampling = runner.get_payload(run_id).payload["sampling"]
+        assert sampling["method"] == "stratified"
+        assert sampling["items_seen"] == DEPTH_LIMITS[ResearchDepth.default]
+        assert sampling["items_analysed"] == DEFAULT_SAMPLE_PER_PLATFORM
+    finally:
+        runner.shutdown()
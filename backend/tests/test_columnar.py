@@ -0,0 +1,125 @@
+"""Tests for the columnar payload format."""
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.services import columnar
+from app.services.columnar import ColumnarPayloadReader, DictPayloadReader, PayloadReader, write_columnar
+
+
+def make_payload(item_count=6):
+    items = []
+    for idx in range(item_count):
+        item = {
+            "id": str(idx),
+            "text": f"Ünïcode item {idx} 🚀",
+            "relevance": idx / 3,
+            "score": idx,
+            "is_question": idx % 2 == 0,
+            "sentiment": {"compound": 0.5, "neg": 0.0},
+            "tokens": ["battery", str(idx)],
+            "timestamp": None if idx == 1 else "2024-01-01T00:00:00",
+        }
+        if idx == 2:
+            item["extra"] = ""
+        items.append(item)
+    return {
+        "run_id": "run-1",
+        "topic": "battery",
+        "items": items,
+        "clusters": [{"cluster_id": 1, "count": item_count}],
+        "summary": {"top_pain_points": ["battery drain"]},
+    }
+
+
+def _without_arrow(monkeypatch):
+    # Loaded first, or the first write would load pyarrow over the patch.
+    columnar._load_backends()
+    monkeypatch.setattr(columnar, "pa", None)
+
+
+@pytest.fixture(params=["numpy", "arrow"])
+def backend(request, monkeypatch):
+    if request.param == "arrow":
+        pytest.importorskip("pyarrow")
+    else:
+        _without_arrow(monkeypatch)
+    return request.param
+
+
+def test_round_trip_preserves_payload(tmp_path, backend):
+    payload = make_payload()
+    write_columnar(tmp_path / "run-1", payload)
+    reader = ColumnarPayloadReader(tmp_path / "run-1")
+    assert reader.to_payload() == payload
+    assert reader.item_count() == 6
+
+
+def test_slices_and_projection_match_dict_reader(tmp_path, backend):
+    payload = make_payload()
+    write_columnar(tmp_path / "run-1", payload)
+    reader = ColumnarPayloadReader(tmp_path / "run-1")
+    expected = DictPayloadReader(payload)
+    for offset, limit, fields in [(0, 2, None), (2, 3, ["id", "extra"]), (5, None, ["sentiment"]), (9, 2, None)]:
+        assert list(reader.items(offset, limit, fields)) == list(expected.items(offset, limit, fields))
+
+
+def test_summary_and_clusters_without_items(tmp_path, backend):
+    write_columnar(tmp_path / "run-1", make_payload())
+    reader = ColumnarPayloadReader(tmp_path / "run-1")
+    assert reader.meta()["summary"] == {"top_pain_points": ["battery drain"]}
+    assert "items" not in reader.meta()
+    assert reader.clusters() == [{"cluster_id": 1, "count": 6}]
+
+
+def test_empty_payload(tmp_path, backend):
+    payload = {"run_id": "run-1", "items": [], "clusters": []}
+    write_columnar(tmp_path / "run-1", payload)
+    assert ColumnarPayloadReader(tmp_path / "run-1").to_payload() == payload
+
+
+def test_numpy_columns_are_memory_mapped(tmp_path, monkeypatch):
+    import numpy as np
+
+    _without_arrow(monkeypatch)
+    write_columnar(tmp_path / "run-1", make_payload())
+    reader = ColumnarPayloadReader(tmp_path / "run-1")
+    list(reader.items(0, 1, ["relevance", "text"]))
+    loaded = list(reader._loaded.values())
+    assert len(loaded) == 2
+    assert any(isinstance(column, np.memmap) for column in loaded)
+
+
+def test_arrow_items_are_one_memory_mapped_ipc_file(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+
+    columnar._load_backends()
+    write_columnar(tmp_path / "run-1", make_payload())
+    assert sorted(path.name for path in (tmp_path / "run-1").iterdir()) == [
+        "clusters.json",
+        "items.arrow",
+        "meta.json",
+        "schema.json",
+    ]
+    reader = ColumnarPayloadReader(tmp_path / "run-1")
+    assert list(reader.items(1, 2, ["text", "timestamp"])) == [
+        {"text": "Ünïcode item 1 🚀", "timestamp": None},
+        {"text": "Ünïcode item 2 🚀", "timestamp": "2024-01-01T00:00:00"},
+    ]
+    assert isinstance(reader._table, pa.Table)
+
+
+def test_rewrite_replaces_previous_copy(tmp_path, backend):
+    write_columnar(tmp_path / "run-1", make_payload(6))
+    write_columnar(tmp_path / "run-1", make_payload(2))
+    assert ColumnarPayloadReader(tmp_path / "run-1").item_count() == 2
+    assert [path.name for path in tmp_path.iterdir()] == ["run-1"]
+
+
+def test_readers_must_implement_every_section():
+    class Partial(PayloadReader):
+        def meta(self):
+            return {}
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,140 @@
+"""Tests for run cancellation, deadlines and item budgets inside the pipelines."""
+import time
+
+import pytest
+
+from app.pipelines import fallback_pipeline
+from app.pipelines.control import RunCancelled, RunControl, take_batches
+from app.schemas.research import ResearchRequest
+
+
+def _raw_items(count):
+    return [
+        {"id": str(idx), "platform": "reddit", "timestamp": "2024-03-01T00:00:00", "text": f"battery issue number {idx} today"}
+        for idx in range(count)
+    ]
+
+
+def test_take_trims_to_the_item_budget():
+    control = RunControl(max_items=5)
+
+    assert len(control.take(_raw_items(3))) == 3
+    assert len(control.take(_raw_items(3))) == 2
+    assert control.truncated == "item_budget"
+    assert control.take(_raw_items(3)) == []
+    assert control.report() == {"reason": "item_budget", "items_analysed": 5, "cut_short": []}
+
+
+def test_budget_that_fits_every_item_is_not_a_truncation():
+    control = RunControl(max_items=6)
+    batches = list(take_batches([_raw_items(3), _raw_items(3)], control))
+
+    assert sum(len(batch) for batch in batches) == 6
+    assert control.report() is None
+
+
+def test_take_batches_stops_pulling_at_the_deadline():
+    control = RunControl(deadline_at=time.time() + 60)
+    pulled = []
+
+    def batches():
+        for idx in range(5):
+            pulled.append(idx)
+            if idx == 2:
+                control.deadline_at = time.time() - 1
+            yield _raw_items(2)
+
+    taken = list(take_batches(batches(), control))
+
+    # The batch pulled after the deadline is dropped and nothing further is read.
+    assert len(taken) == 2
+    assert pulled == [0, 1, 2]
+    assert control.report()["reason"] == "deadline"
+
+
+def test_cancel_raises_at_the_next_check():
+    control = RunControl()
+    control.check()
+    control.cancel()
+
+    with pytest.raises(RunCancelled):
+        control.check()
+    with pytest.raises(RunCancelled):
+        control.take(_raw_items(1))
+
+
+def test_cancellation_from_elsewhere_is_polled():
+    requested = []
+    control = RunControl(is_cancelled=lambda: bool(requested), poll_interval=0.0)
+    control.check()
+    requested.append(True)
+
+    with pytest.raises(RunCancelled):
+        control.check()
+
+
+def test_lite_pipeline_summarizes_items_within_budget():
+    request = ResearchRequest(topic="battery issue", depth="deep")
+    control = RunControl(max_items=300)
+
+    payload, summary = fallback_pipeline.run_pipeline("run", request, iter(_raw_items(1000)), control=control)
+
+    assert payload["metrics"]["stages"]["normalize"]["items"] == 300
+    assert control.report()["items_analysed"] == 300
+    assert summary.summary_text
+
+
+def test_lite_pipeline_stops_when_cancelled_between_batches():
+    control = RunControl()
+
+    def stream():
+        yield from _raw_items(256)
+        control.cancel()
+        yield from _raw_items(256)
+
+    with pytest.raises(RunCancelled):
+        fallback_pipeline.run_pipeline("run", ResearchRequest(topic="battery issue"), stream(), control=control)
+
+
+def test_full_dedup_keeps_unchecked_rows_past_the_deadline(require_full_pipeline):
+    from app.pipelines import full_pipeline
+
+    texts = [["battery", "drains", "fast"]] * 1200
+    matrix, _ = full_pipeline.build_tfidf(texts)
+    control = RunControl(deadline_at=time.time() - 1)
+
+    keep = full_pipeline.find_near_duplicates(matrix, control=control)
+
+    assert keep.all()
+    assert control.cut_short == ["dedup"]
+    assert full_pipeline.find_near_duplicates(matrix).sum() == 1
+
+
+def test_full_clustering_opens_no_clusters_past_the_deadline(require_full_pipeline):
+    import numpy as np
+
+    from app.pipelines import full_pipeline
+
+    # The first block uses two directions; later rows point in six new ones.
+    directions = np.where(np.arange(1200) < full_pipeline.BLOCK_SIZE, np.arange(1200) % 2, 2 + np.arange(1200) % 6)
+    embeddings = np.eye(8, dtype=np.float32)[directions]
+    control = RunControl(deadline_at=time.time() - 1)
+
+    assert full_pipeline.leader_cluster(embeddings).max() == 7
+    labels = full_pipeline.leader_cluster(embeddings, control=control)
+    assert labels.max() == 1
+    assert (labels >= 0).all()
+    assert control.cut_short == ["cluster"]
+
+
+def test_full_pipeline_stops_when_cancelled(require_full_pipeline):
+    from app.pipelines import full_pipeline
+
+    control = RunControl()
+
+    def progress(stage, fraction):
+        if stage == "dedup":
+            control.cancel()
+
+    with pytest.raises(RunCancelled):
+        full_pipeline.run_pipeline("run", ResearchRequest(topic="battery issue"), _raw_items(600), progress, None, control)
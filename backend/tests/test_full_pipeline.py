@@ -0,0 +1,94 @@
+"""Tests for the vectorized full pipeline."""
+import pytest
+
+from app.pipelines import fallback_pipeline
+from app.schemas.research import ResearchRequest
+
+
+@pytest.fixture
+def full_pipeline(require_full_pipeline):
+    from app.pipelines import full_pipeline
+
+    return full_pipeline
+
+
+def make_items(texts):
+    return [
+        {"id": str(idx), "platform": "reddit", "text": text, "score": idx, "url": f"https://example.com/{idx}"}
+        for idx, text in enumerate(texts)
+    ]
+
+
+RAW_ITEMS = make_items(
+    [
+        "Login keeps failing with a password reset error on mobile",
+        "Login keeps failing with a password reset error on mobile!!",
+        "Password reset error makes login fail on mobile again",
+        "Invoice export to PDF is missing the tax column",
+        "PDF invoice export drops the tax column entirely",
+        "",
+    ]
+)
+
+
+class TestFullPipeline:
+    def test_payload_schema_matches_lite(self, full_pipeline):
+        request = ResearchRequest(topic="login password reset")
+        full_payload, full_summary = full_pipeline.run_pipeline("run-full", request, RAW_ITEMS)
+        lite_payload, _ = fallback_pipeline.run_pipeline("run-lite", request, RAW_ITEMS)
+
+        assert full_payload["pipeline_mode"] == "full"
+        assert set(full_payload) == set(lite_payload)
+        assert set(full_payload["items"][0]) == set(lite_payload["items"][0])
+        assert set(full_payload["clusters"][0]) == set(lite_payload["clusters"][0])
+        assert full_summary.run_id == "run-full"
+
+    def test_near_duplicates_are_removed(self, full_pipeline):
+        payload, _ = full_pipeline.run_pipeline("run-1", ResearchRequest(topic="login"), RAW_ITEMS)
+        ids = [item["id"] for item in payload["items"]]
+        assert "0" in ids
+        assert "1" not in ids
+
+    def test_similar_items_share_a_cluster(self, full_pipeline):
+        payload, _ = full_pipeline.run_pipeline("run-1", ResearchRequest(topic="login"), RAW_ITEMS)
+        counts = sorted(cluster["count"] for cluster in payload["clusters"])
+        assert counts[-1] >= 2
+        assert sum(counts) == len(payload["items"])
+
+    def test_relevance_matches_lite_metric(self, full_pipeline):
+        request = ResearchRequest(topic="password reset invoice")
+        payload, _ = full_pipeline.run_pipeline("run-1", request, RAW_ITEMS)
+        topic_tokens = fallback_pipeline.tokenize(request.topic)
+        for item in payload["items"]:
+            expected = fallback_pipeline.compute_relevance(fallback_pipeline.tokenize(item["text"]), topic_tokens)
+            assert item["relevance"] == round(expected, 3)
+
+    def test_empty_run(self, full_pipeline):
+        payload, summary = full_pipeline.run_pipeline("run-1", ResearchRequest(topic="nothing here"), [])
+        assert payload["items"] == []
+        assert payload["clusters"] == []
+        assert summary.confidence == "low"
+
+    @pytest.mark.slow
+    def test_large_run_finishes_quickly(self, full_pipeline):
+        import time
+
+        texts = [f"topic{idx % 50} detail{idx % 7} report{idx} about widget{idx % 13}" for idx in range(10000)]
+        started = time.perf_counter()
+        payload, _ = full_pipeline.run_pipeline("run-big", ResearchRequest(topic="widget report"), make_items(texts))
+        assert time.perf_counter() - started < 30
+        assert payload["clusters"]
+
+
+def test_full_pipeline_reports_progress(full_pipeline):
+    events = []
+    raw_items = make_items([f"Checkout flow step {idx} keeps failing" for idx in range(10)])
+    full_pipeline.run_pipeline(
+        "run-1",
+        ResearchRequest(topic="checkout failures"),
+        raw_items,
+        progress=lambda stage, fraction: events.append((stage, fraction)),
+    )
+    fractions = [fraction for _, fraction in events]
+    assert fractions == sorted(fractions)
+    assert events[-1] == ("summarize", 1.0)
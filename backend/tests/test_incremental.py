@@ -0,0 +1,247 @@
+"""Tests for incremental runs."""
+import time
+from collections import Counter
+
+import pytest
+
+from app.pipelines import fallback_pipeline, incremental
+from app.pipelines.control import RunCancelled, RunControl
+from app.pipelines.incremental import (
+    build_incremental_state,
+    run_incremental,
+    select_new_items,
+)
+from app.pipelines.minhash import MinHashLSHIndex
+from app.schemas.research import ResearchRequest
+from app.services.collectors import CollectionStream
+from app.services.research_runner import BaselineUnavailable, ResearchRunner
+
+
+BASELINE_ITEMS = [
+    {
+        "id": "a1",
+        "platform": "reddit",
+        "timestamp": "2024-01-01T10:00:00",
+        "text": "battery drains fast on the new phone after the update",
+    },
+    {
+        "id": "a2",
+        "platform": "reddit",
+        "timestamp": "2024-01-02T10:00:00",
+        "text": "checkout page keeps crashing when paying with a card",
+    },
+]
+
+
+def _baseline():
+    request = ResearchRequest(topic="phone issues")
+    payload, summary = fallback_pipeline.run_pipeline("base", request, BASELINE_ITEMS)
+    return request, payload, build_incremental_state(payload)
+
+
+def _wait(runner, run_id):
+    for _ in range(600):
+        status = runner.get_status(run_id)
+        if status.status in ("completed", "failed"):
+            return status
+        time.sleep(0.01)
+    raise AssertionError("run did not finish")
+
+
+def test_state_records_baseline():
+    _, payload, state = _baseline()
+
+    assert state["item_ids"] == ["a1", "a2"]
+    assert state["high_water_mark"] == "2024-01-02T10:00:00"
+    assert len(state["fingerprints"]) == 2
+    assert len(state["band_keys"]) == 2
+    assert {cluster["cluster_id"] for cluster in state["clusters"]} == {
+        item["cluster_id"] for item in payload["items"]
+    }
+    assert sum(cluster["aggregate"]["count"] for cluster in state["clusters"]) == 2
+
+
+def _posts(count, start_day=1, seed=0):
+    topics = ["battery drains fast", "checkout page crashes", "shipping is slow", "support never answers"]
+    return [
+        {
+            "id": f"p{seed}-{idx}",
+            "platform": "reddit",
+            "timestamp": f"2024-02-{start_day + idx % 20:02d}T{idx % 24:02d}:00:00",
+            "text": f"{topics[(idx * 7 + seed) % len(topics)]} again with order {idx % 13} and item {idx % 5} in batch {seed}",
+            "score": (idx * 31 + seed) % 17,
+            "url": f"https://example.com/{seed}/{idx}",
+        }
+        for idx in range(count)
+    ]
+
+
+def test_rebuilt_clusters_match_their_members():
+    request = ResearchRequest(topic="orders", depth="deep")
+    payload, _ = fallback_pipeline.run_pipeline("base", request, _posts(120))
+    state = build_incremental_state(payload)
+
+    merged, _, new_state = run_incremental("next", request, _posts(40, start_day=25, seed=1), payload, state)
+
+    items = merged["items"]
+    new_ids = {item["cluster_id"] for item in items[len(payload["items"]) :]}
+    assert new_ids
+    baseline_entries = {cluster["cluster_id"]: cluster for cluster in payload["clusters"]}
+    for cluster in merged["clusters"]:
+        members = [item for item in items if item["cluster_id"] == cluster["cluster_id"]]
+        tokens = [fallback_pipeline.tokenize_clean(item["clean_text"]) for item in members]
+        if cluster["cluster_id"] not in new_ids:
+            assert cluster["count"] == baseline_entries[cluster["cluster_id"]]["count"]
+            continue
+        representative = max(range(len(members)), key=lambda position: members[position]["engagement_score"])
+        expected = fallback_pipeline.build_cluster_entry(
+            cluster["cluster_id"],
+            members,
+            members[representative],
+            Counter(tokens[representative]).most_common(1)[0][0],
+            fallback_pipeline.extract_keywords(token for member in tokens for token in member),
+            len(items),
+        )
+        assert cluster == expected
+    assert new_state == build_incremental_state(merged) | {"clusters": new_state["clusters"]}
+
+
+def test_work_grows_with_the_new_items_only(monkeypatch):
+    request = ResearchRequest(topic="orders", depth="deep")
+    payload, _ = fallback_pipeline.run_pipeline("base", request, _posts(300))
+    state = build_incremental_state(payload)
+    signed = []
+    loaded = []
+    signature = MinHashLSHIndex.signature
+    load_aggregate = incremental.load_aggregate
+    monkeypatch.setattr(MinHashLSHIndex, "signature", lambda self, tokens: signed.append(1) or signature(self, tokens))
+    monkeypatch.setattr(incremental, "load_aggregate", lambda data: loaded.append(1) or load_aggregate(data))
+
+    merged, _, _ = run_incremental("next", request, _posts(5, start_day=25, seed=1), payload, state)
+
+    assert len(signed) == 5
+    assert len(loaded) <= 5
+    assert len(merged["items"]) > len(payload["items"])
+
+
+def test_full_baselines_are_labelled_as_extended_with_lite():
+    request, payload, state = _baseline()
+    payload["pipeline_mode"] = "full"
+    state = build_incremental_state(payload)
+    raw_items = [{"id": "b1", "timestamp": "2024-01-03T00:00:00", "text": "shipping took three weeks"}]
+
+    merged, summary, new_state = run_incremental("next", request, raw_items, payload, state)
+    assert merged["pipeline_mode"] == new_state["pipeline_mode"] == incremental.MIXED_MODE
+
+    raw_items = [{"id": "c1", "timestamp": "2024-01-04T00:00:00", "text": "support never answered"}]
+    again, _, _ = run_incremental("last", request, raw_items, merged, new_state)
+    assert again["pipeline_mode"] == incremental.MIXED_MODE
+
+    _, lite, _ = run_incremental("next", request, raw_items, *_baseline()[1:])
+    assert lite.summary_text != summary.summary_text
+
+
+def test_select_new_items_filters_seen_and_old():
+    _, _, state = _baseline()
+    raw_items = [
+        {"id": "a1", "timestamp": "2024-01-05T00:00:00", "text": "seen id"},
+        {"id": "b1", "timestamp": "2024-01-01T00:00:00", "text": "older than baseline"},
+        {"id": "b2", "timestamp": "2024-01-03T00:00:00", "text": "new"},
+        {"id": "b3", "text": "no timestamp"},
+    ]
+
+    selected, skipped = select_new_items(raw_items, state)
+
+    assert [item["id"] for item in selected] == ["b2", "b3"]
+    assert skipped == 2
+
+
+def test_new_items_join_existing_or_new_clusters():
+    request, payload, state = _baseline()
+    battery_cluster = next(item["cluster_id"] for item in payload["items"] if item["id"] == "a1")
+    raw_items = [
+        {"id": "b1", "timestamp": "2024-01-03T00:00:00", "text": "battery drains fast on the new phone after the update today"},
+        {"id": "b2", "timestamp": "2024-01-04T00:00:00", "text": "shipping took three weeks and support never answered"},
+    ]
+
+    merged, summary, new_state = run_incremental("next", request, raw_items, payload, state)
+
+    items = {item["id"]: item for item in merged["items"]}
+    assert set(items) == {"a1", "a2", "b1", "b2"}
+    assert items["b1"]["cluster_id"] == battery_cluster
+    assert items["b2"]["cluster_id"] not in {cluster["cluster_id"] for cluster in state["clusters"]}
+    assert sum(cluster["count"] for cluster in merged["clusters"]) == 4
+    assert merged["baseline_run_id"] == "base"
+    assert merged["metrics"]["incremental"]["new_items"] == 2
+    assert summary.run_id == "next"
+    assert new_state["high_water_mark"] == "2024-01-04T00:00:00"
+    assert new_state["item_ids"] == ["a1", "a2", "b1", "b2"]
+
+
+def test_near_duplicates_of_baseline_are_dropped():
+    request, payload, state = _baseline()
+    raw_items = [
+        {"id": "b1", "timestamp": "2024-01-03T00:00:00", "text": "Battery drains fast on the new phone after the update!"},
+    ]
+
+    merged, _, _ = run_incremental("next", request, raw_items, payload, state)
+
+    assert [item["id"] for item in merged["items"]] == ["a1", "a2"]
+    assert merged["metrics"]["incremental"]["near_duplicates"] == 1
+
+
+def test_cancelled_merges_stop():
+    request, payload, state = _baseline()
+    control = RunControl()
+    control.cancel()
+
+    with pytest.raises(RunCancelled):
+        run_incremental("next", request, _posts(5, start_day=25), payload, state, control=control)
+
+
+def test_merges_past_the_deadline_skip_comparisons():
+    request, payload, state = _baseline()
+    raw_items = [
+        {"id": "b1", "timestamp": "2024-01-03T00:00:00", "text": "Battery drains fast on the new phone after the update!"},
+    ]
+    control = RunControl(deadline_at=time.time() - 1)
+
+    merged, _, _ = run_incremental("next", request, raw_items, payload, state, control=control)
+
+    assert [item["id"] for item in merged["items"]] == ["a1", "a2", "b1"]
+    assert merged["metrics"]["incremental"]["near_duplicates"] == 0
+    assert control.report()["cut_short"] == ["dedup", "cluster"]
+
+
+def test_runner_extends_baseline(monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    runner = ResearchRunner()
+    runner.start()
+    batches = iter([BASELINE_ITEMS, BASELINE_ITEMS + [
+        {"id": "b1", "timestamp": "2024-01-03T00:00:00", "text": "shipping took three weeks and support never answered"},
+    ]])
+    monkeypatch.setattr(runner, "_fetch_items", lambda request, progress: CollectionStream([next(batches)]))
+    try:
+        baseline_id = runner.start_run(ResearchRequest(topic="phone issues"))
+        assert _wait(runner, baseline_id).status == "completed"
+
+        run_id = runner.start_run(ResearchRequest(topic="phone issues", baseline_run_id=baseline_id))
+        status = _wait(runner, run_id)
+        assert status.status == "completed", status.message
+
+        payload = runner.get_payload(run_id).payload
+        assert [item["id"] for item in payload["items"]] == ["a1", "a2", "b1"]
+        assert payload["metrics"]["incremental"]["skipped_items"] == 2
+    finally:
+        runner.shutdown()
+
+
+def test_runner_rejects_unknown_baseline(monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    runner = ResearchRunner()
+    runner.start()
+    try:
+        with pytest.raises(BaselineUnavailable):
+            runner.start_run(ResearchRequest(topic="phone issues", baseline_run_id="missing"))
+    finally:
+        runner.shutdown()
@@ -0,0 +1,195 @@
+"""Tests for run metrics, the Prometheus endpoint and run profiling."""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import research
+from app.main import app
+from app.pipelines import fallback_pipeline
+from app.pipelines.metrics import StageMetrics
+from app.schemas.research import ResearchRequest
+from app.services.collectors import CollectionStream
+from app.services.metrics import Metric, MetricsRegistry
+from app.services.profiling import run_profiled
+from app.services.research_runner import ResearchRunner
+
+
+client = TestClient(app)
+
+
+def _raw_items(count):
+    texts = ["battery drains fast", "battery drains fast", "checkout page crashes", "shipping is slow"]
+    return [
+        {"id": str(idx), "platform": "reddit", "timestamp": "2024-03-01T00:00:00", "text": f"{texts[idx % 4]} {idx // 4}"}
+        for idx in range(count)
+    ]
+
+
+def _wait(runner, run_id):
+    for _ in range(500):
+        status = runner.get_status(run_id)
+        if status.status in ("completed", "failed"):
+            return status
+        time.sleep(0.01)
+    raise AssertionError("run did not finish")
+
+
+def test_stage_metrics_accumulate_across_entries():
+    metrics = StageMetrics()
+    for _ in range(3):
+        with metrics.stage("dedup"):
+            sum(range(20000))
+    metrics.count("dedup", pairs_compared=2)
+    metrics.count("dedup", pairs_compared=3)
+    metrics.record("dedup", items_out=7)
+
+    dedup = metrics.as_dict()["stages"]["dedup"]
+    assert dedup["wall_ms"] > 0
+    assert dedup["cpu_ms"] >= 0
+    assert dedup["pairs_compared"] == 5
+    assert dedup["items_out"] == 7
+
+
+def test_lite_payload_reports_stage_metrics():
+    payload, _ = fallback_pipeline.run_pipeline("run", ResearchRequest(topic="battery drains"), _raw_items(40))
+
+    stages = payload["metrics"]["stages"]
+    assert list(stages) == ["normalize", "dedup", "cluster", "sentiment", "summarize"]
+    assert stages["normalize"]["items"] == 40
+    assert stages["dedup"]["items_in"] == 40
+    assert stages["dedup"]["items_out"] == len(payload["items"])
+    assert stages["dedup"]["pairs_compared"] > 0
+    assert stages["cluster"]["clusters"] == len(payload["clusters"])
+    assert stages["sentiment"]["scoring"]["items"] == len(payload["items"])
+    assert payload["metrics"]["wall_ms"] >= stages["dedup"]["wall_ms"]
+
+
+def test_full_payload_reports_stage_metrics(require_full_pipeline):
+    from app.pipelines import full_pipeline
+
+    payload, _ = full_pipeline.run_pipeline("run", ResearchRequest(topic="battery drains"), _raw_items(40))
+
+    stages = payload["metrics"]["stages"]
+    assert stages["dedup"]["items_out"] == len(payload["items"])
+    assert stages["dedup"]["pairs_compared"] > 0
+    assert stages["cluster"]["clusters"] == len(payload["clusters"])
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    runs = registry.counter("runs_total", "Finished runs", ("status",))
+    latency = registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    registry.gauge("queued", "Queued runs", lambda: 3)
+    runs.inc(status="completed")
+    runs.inc(2, status="completed")
+    latency.observe(0.05, stage="dedup")
+    latency.observe(0.5, stage="dedup")
+    latency.observe(5, stage="dedup")
+
+    text = registry.render()
+    assert "# TYPE runs_total counter" in text
+    assert 'runs_total{status="completed"} 3' in text
+    assert 'latency_seconds_bucket{stage="dedup",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="dedup",le="1"} 2' in text
+    assert 'latency_seconds_bucket{stage="dedup",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{stage="dedup"} 3' in text
+    assert "queued 3" in text
+    with pytest.raises(ValueError):
+        runs.inc(outcome="completed")
+
+
+def test_metrics_must_render_their_samples():
+    class Partial(Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        Partial("kivo_partial", "Never rendered")
+
+
+def test_metrics_endpoint_reports_executed_runs():
+    with client:
+        run_id = research.runner.start_run(ResearchRequest(topic="metrics topic"))
+        _wait(research.runner, run_id)
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'kivo_stage_duration_seconds_bucket{stage="normalize",le="+Inf"}' in response.text
+    assert 'kivo_runs_total{status="completed"}' in response.text
+    assert "kivo_run_queue_wait_seconds_count" in response.text
+    assert "\nkivo_runs_active " in response.text
+
+
+def test_runner_adds_fetch_and_queue_metrics(monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    runner = ResearchRunner()
+    runner.start()
+    monkeypatch.setattr(runner, "_fetch_items", lambda request, progress: CollectionStream([_raw_items(12)]))
+    try:
+        run_id = runner.start_run(ResearchRequest(topic="battery drains"))
+        assert _wait(runner, run_id).status == "completed"
+        metrics = runner.get_payload(run_id).payload["metrics"]
+        assert list(metrics["stages"])[0] == "fetch"
+        assert metrics["stages"]["fetch"]["items"] == 12
+        assert metrics["queue_wait_ms"] >= 0
+        assert "profile" not in metrics
+    finally:
+        runner.shutdown()
+
+
+def test_failed_run_names_its_stage(monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    runner = ResearchRunner()
+    runner.start()
+
+    def broken(run_id, request, raw_items, progress, partial, control=None):
+        progress("dedup", 0.4)
+        raise RuntimeError("index corrupted")
+
+    monkeypatch.setattr(runner, "_pipeline_func", broken)
+    try:
+        status = _wait(runner, runner.start_run(ResearchRequest(topic="corrupted index")))
+        assert status.status == "failed"
+        assert status.message == "Failed during dedup: index corrupted"
+        assert runner._metrics.failures.value(stage="dedup", error="RuntimeError") == 1
+    finally:
+        runner.shutdown()
+
+
+def test_profiled_run_attaches_report(monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    runner = ResearchRunner()
+    runner.start()
+    monkeypatch.setattr(runner, "_fetch_items", lambda request, progress: CollectionStream([_raw_items(20)]))
+    try:
+        plain = runner.start_run(ResearchRequest(topic="battery drains"))
+        _wait(runner, plain)
+        profiled = runner.start_run(ResearchRequest(topic="battery drains", profile="cprofile"))
+        status = _wait(runner, profiled)
+
+        # The cached result of the identical unprofiled run is not reused.
+        assert status.message != "Served from cached result"
+        report = runner.get_payload(profiled).payload["metrics"]["profile"]
+        assert report["profiler"] == "cprofile"
+        assert any("run_pipeline" in entry["function"] for entry in report["functions"])
+    finally:
+        runner.shutdown()
+
+
+def test_pyinstrument_falls_back_to_cprofile_when_missing(monkeypatch):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def no_pyinstrument(name, *args, **kwargs):
+        if name == "pyinstrument":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", no_pyinstrument)
+    result, report = run_profiled("pyinstrument", sorted, [3, 1, 2])
+
+    assert result == [1, 2, 3]
+    assert report["profiler"] == "cprofile"
+    assert report["requested"] == "pyinstrument"
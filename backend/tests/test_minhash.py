@@ -0,0 +1,89 @@
+"""Tests for the MinHash/LSH near-duplicate index."""
+import random
+
+from app.pipelines.fallback_pipeline import deduplicate_items, jaccard_similarity, tokenize
+from app.pipelines.minhash import MinHashLSHIndex, choose_band_layout
+
+
+def exact_deduplicate(items, threshold=0.9):
+    unique = []
+    for candidate in items:
+        candidate_tokens = tokenize(candidate.get("clean_text", ""))
+        if any(jaccard_similarity(candidate_tokens, tokenize(existing.get("clean_text", ""))) >= threshold for existing in unique):
+            continue
+        unique.append(candidate)
+    return unique
+
+
+def build_corpus(size, seed=7):
+    rng = random.Random(seed)
+    vocabulary = [f"word{idx}" for idx in range(400)]
+    items = []
+    for _ in range(size):
+        if items and rng.random() < 0.35:
+            tokens = items[rng.randrange(len(items))]["clean_text"].split()
+            edits = rng.choice([0, 1, 1, 2, 5])
+            for _ in range(edits):
+                tokens[rng.randrange(len(tokens))] = rng.choice(vocabulary)
+            if rng.random() < 0.3:
+                tokens.append(rng.choice(vocabulary))
+        else:
+            tokens = rng.sample(vocabulary, rng.randint(1, 30))
+        items.append({"clean_text": " ".join(tokens)})
+    items.append({"clean_text": ""})
+    items.append({"clean_text": "the and of"})
+    return items
+
+
+class TestBandLayout:
+    def test_high_threshold_uses_multi_row_bands(self):
+        bands, rows = choose_band_layout(0.9, 64)
+        assert bands * rows == 64
+        assert rows > 1
+
+    def test_low_threshold_keeps_recall(self):
+        bands, rows = choose_band_layout(0.3, 64)
+        assert 1.0 - (1.0 - 0.3**rows) ** bands >= 0.999
+
+
+class TestMinHashLSHIndex:
+    def test_identical_sets_are_duplicates(self):
+        index = MinHashLSHIndex()
+        assert index.add(["alpha", "beta", "gamma"]) is True
+        assert index.add(["gamma", "beta", "alpha"]) is False
+        assert len(index) == 1
+
+    def test_dissimilar_sets_are_kept(self):
+        index = MinHashLSHIndex()
+        assert index.add(["alpha", "beta"]) is True
+        assert index.add(["gamma", "delta"]) is True
+
+    def test_empty_sets_match_each_other_only(self):
+        index = MinHashLSHIndex()
+        assert index.add([]) is True
+        assert index.add(["alpha"]) is True
+        assert index.add([]) is False
+
+    def test_signature_is_deterministic(self):
+        first = MinHashLSHIndex(seed=3).signature({"alpha", "beta"})
+        second = MinHashLSHIndex(seed=3).signature({"beta", "alpha"})
+        assert first == second
+
+    def test_capped_candidates_verify_the_most_similar(self):
+        index = MinHashLSHIndex(max_candidates=1)
+        base = [f"word{idx}" for idx in range(30)]
+        assert index.add(base[:20] + ["left"]) is True
+        assert index.add(base) is True
+        compared = index.comparisons
+        assert index.add(base[:29] + ["other"]) is False
+        assert index.comparisons == compared + 1
+
+
+class TestDeduplicateMatchesExact:
+    def test_matches_exact_method_on_corpus(self):
+        items = build_corpus(1500)
+        assert deduplicate_items(items) == exact_deduplicate(items)
+
+    def test_matches_exact_method_at_lower_threshold(self):
+        items = build_corpus(600, seed=11)
+        assert deduplicate_items(items, threshold=0.6) == exact_deduplicate(items, threshold=0.6)
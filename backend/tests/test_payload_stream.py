@@ -0,0 +1,105 @@
+"""Tests for NDJSON payload streaming."""
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import research
+from app.main import app
+from app.services import payload_stream
+from app.services.columnar import DictPayloadReader
+from app.services.payload_stream import (
+    compress_chunks,
+    iter_ndjson,
+    iter_payload_records,
+    negotiate_encoding,
+    parse_fields,
+)
+
+
+def make_payload(item_count=5):
+    return {
+        "run_id": "run-1",
+        "topic": "battery life",
+        "items": [{"id": str(idx), "text": f"item {idx}", "sentiment": {"compound": 0.1}} for idx in range(item_count)],
+        "clusters": [{"cluster_id": 1, "count": item_count, "tags": ["battery"]}],
+        "summary": {"top_pain_points": []},
+    }
+
+
+def read_lines(body):
+    return [json.loads(line) for line in body.decode("utf-8").splitlines()]
+
+
+class TestPayloadRecords:
+    def test_header_items_then_clusters(self):
+        records = list(iter_payload_records(DictPayloadReader(make_payload())))
+        assert records[0]["type"] == "run"
+        assert records[0]["items_total"] == 5
+        assert "items" not in records[0] and "clusters" not in records[0]
+        assert [record["type"] for record in records[1:]] == ["item"] * 5 + ["cluster"]
+
+    def test_pagination(self):
+        records = list(iter_payload_records(DictPayloadReader(make_payload()), offset=2, limit=2))
+        assert [record["id"] for record in records if record["type"] == "item"] == ["2", "3"]
+        assert list(iter_payload_records(DictPayloadReader(make_payload()), offset=10))[1]["type"] == "cluster"
+
+    def test_field_projection(self):
+        records = list(iter_payload_records(DictPayloadReader(make_payload()), fields=parse_fields("id, count")))
+        assert records[1] == {"type": "item", "id": "0"}
+        assert records[-1] == {"type": "cluster", "count": 5}
+
+    def test_ndjson_chunks_split_on_line_boundaries(self):
+        chunks = list(iter_ndjson(iter_payload_records(DictPayloadReader(make_payload(50))), chunk_bytes=256))
+        assert len(chunks) > 1
+        assert all(chunk.endswith(b"\n") for chunk in chunks)
+        assert len(read_lines(b"".join(chunks))) == 52
+
+
+class TestEncoding:
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            (None, None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("br, gzip;q=0.5", "gzip"),
+            ("gzip;q=0", None),
+            ("*", "gzip"),
+        ],
+    )
+    def test_negotiate_without_zstd(self, monkeypatch, header, expected):
+        monkeypatch.setattr(payload_stream, "zstandard", None)
+        assert negotiate_encoding(header) == expected
+
+    def test_zstd_preferred_when_available(self):
+        pytest.importorskip("zstandard")
+        assert negotiate_encoding("gzip, zstd") == "zstd"
+
+    def test_gzip_round_trip(self):
+        body = b"".join(compress_chunks(iter([b'{"a":1}\n', b'{"b":2}\n']), "gzip"))
+        assert gzip.decompress(body) == b'{"a":1}\n{"b":2}\n'
+
+
+class TestStreamRoute:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        readers = {"run-1": DictPayloadReader(make_payload(20))}
+        monkeypatch.setattr(research.runner, "open_payload", readers.get)
+        return TestClient(app)
+
+    def test_streams_ndjson(self, client):
+        response = client.get("/research/run-1/json/stream", params={"offset": 5, "limit": 3, "fields": "id"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = read_lines(response.content)
+        assert [line["id"] for line in lines if line["type"] == "item"] == ["5", "6", "7"]
+
+    def test_gzip_when_accepted(self, client):
+        response = client.get("/research/run-1/json/stream", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(read_lines(response.content)) == 22
+
+    def test_missing_payload(self, client):
+        assert client.get("/research/missing/json/stream").status_code == 404
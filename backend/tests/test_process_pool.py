@@ -0,0 +1,81 @@
+"""Tests for the warm pipeline process pool."""
+import threading
+import time
+
+import pytest
+
+from app.pipelines import fallback_pipeline
+from app.pipelines.control import RunCancelled, RunControl
+from app.schemas.research import ResearchRequest
+from app.services.process_pool import PipelineProcessPool
+
+
+def test_pipeline_runs_in_worker_process_and_reports_progress():
+    events = []
+    completed = threading.Event()
+
+    def on_progress(run_id, fraction, stage):
+        events.append((run_id, fraction, stage))
+        if fraction == 1.0:
+            completed.set()
+
+    pool = PipelineProcessPool(fallback_pipeline.run_pipeline, workers=1, on_progress=on_progress)
+    try:
+        assert all(future.result(timeout=60) for future in pool.warm())
+        raw_items = [{"id": "1", "text": "Great launch for the new phone", "source": "reddit"}]
+        payload, summary = pool.run("run-1", ResearchRequest(topic="phone launch"), raw_items)
+        assert completed.wait(timeout=10)
+    finally:
+        pool.shutdown()
+
+    assert payload["run_id"] == "run-1"
+    assert summary.run_id == "run-1"
+    assert len(payload["items"]) == 1
+    assert [stage for _, _, stage in events][0] == "normalize"
+    assert events[-1] == ("run-1", 1.0, "summarize")
+    assert [fraction for _, fraction, _ in events] == sorted(fraction for _, fraction, _ in events)
+
+
+def test_worker_applies_deadline_and_cancellation_stops_the_wait():
+    pool = PipelineProcessPool(fallback_pipeline.run_pipeline, workers=1)
+    raw_items = [{"id": str(idx), "text": f"battery drains {idx}", "source": "reddit"} for idx in range(600)]
+    try:
+        assert all(future.result(timeout=60) for future in pool.warm())
+        payload, _ = pool.run("run-1", ResearchRequest(topic="battery"), raw_items, RunControl(deadline_at=time.time() - 1))
+        assert payload["truncated"]["reason"] == "deadline"
+        assert payload["items"] == []
+
+        control = RunControl()
+        cancel = threading.Timer(0.2, control.cancel)
+        cancel.start()
+        # A deep run analyses every item, so it is still going when the cancellation lands.
+        with pytest.raises(RunCancelled):
+            pool.run("run-2", ResearchRequest(topic="battery", depth="deep"), raw_items * 20, control)
+        cancel.join()
+
+        with pytest.raises(RunCancelled):
+            pool.run("run-3", ResearchRequest(topic="battery"), raw_items, control)
+    finally:
+        pool.shutdown()
+
+
+def test_cancellation_stops_the_worker():
+    pool = PipelineProcessPool(fallback_pipeline.run_pipeline, workers=1)
+    # One deep run over these keeps a worker busy for far longer than the test waits.
+    raw_items = [
+        {"id": str(idx), "text": f"battery drains {idx} when {idx % 7} apps {idx % 13}", "source": "reddit"}
+        for idx in range(30000)
+    ]
+    try:
+        assert all(future.result(timeout=60) for future in pool.warm())
+        control = RunControl()
+        cancel = threading.Timer(1.0, control.cancel)
+        cancel.start()
+        with pytest.raises(RunCancelled):
+            pool.run("run-1", ResearchRequest(topic="battery", depth="deep"), raw_items, control)
+        cancel.join()
+
+        # The only worker is free again once it has seen the cancellation.
+        assert all(future.result(timeout=10) for future in pool.warm())
+    finally:
+        pool.shutdown()
@@ -0,0 +1,42 @@
+"""Tests for pipeline stage progress reporting."""
+from app.pipelines import fallback_pipeline
+from app.pipelines.progress import PIPELINE_STAGES, StageProgress
+from app.schemas.research import ResearchRequest
+
+
+def test_stage_weights_cover_the_whole_run():
+    assert abs(sum(weight for _, weight in PIPELINE_STAGES) - 1.0) < 1e-9
+
+
+def test_stage_progress_is_monotonic():
+    events = []
+    stages = StageProgress(lambda stage, fraction: events.append((stage, fraction)))
+    stages.update("fetch")
+    stages.update("dedup", 0.5)
+    stages.update("normalize", 1.0)  # behind the dedup update, so dropped
+    stages.update("summarize")
+    assert events == [("fetch", 0.1), ("dedup", 0.4), ("summarize", 1.0)]
+
+
+def test_stage_progress_without_callback_is_a_no_op():
+    StageProgress().update("cluster", 0.5)
+
+
+def test_lite_pipeline_reports_every_stage_in_order():
+    events = []
+    raw_items = [
+        {"id": str(idx), "text": f"Battery life on model {idx} is poor", "source": "reddit"}
+        for idx in range(20)
+    ]
+    fallback_pipeline.run_pipeline(
+        "run-1",
+        ResearchRequest(topic="battery life"),
+        raw_items,
+        progress=lambda stage, fraction: events.append((stage, fraction)),
+    )
+    stages = []
+    for stage, _ in events:
+        if not stages or stages[-1] != stage:
+            stages.append(stage)
+    assert stages == ["normalize", "dedup", "sentiment", "cluster", "summarize"]
+    assert events[-1] == ("summarize", 1.0)
@@ -0,0 +1,61 @@
+"""Tests for the shared per-item token records."""
+from app.pipelines import fallback_pipeline
+from app.pipelines.records import ItemRecord, Vocabulary, build_records
+from app.schemas.research import ResearchRequest
+
+
+class TestVocabulary:
+    def test_encode_interns_repeated_tokens(self):
+        vocabulary = Vocabulary()
+        encoded = vocabulary.encode(["alpha", "beta", "alpha"])
+        assert list(encoded) == [0, 1, 0]
+        assert len(vocabulary) == 2
+
+    def test_decode_round_trips(self):
+        vocabulary = Vocabulary()
+        encoded = vocabulary.encode(["alpha", "beta"])
+        assert vocabulary.decode(encoded) == ["alpha", "beta"]
+
+    def test_encode_with_set_matches_encode(self):
+        vocabulary = Vocabulary()
+        token_ids, token_set = vocabulary.encode_with_set(["alpha", "beta", "alpha"])
+        assert list(token_ids) == [0, 1, 0]
+        assert token_set == frozenset({0, 1})
+
+
+class TestItemRecord:
+    def test_record_uses_slots(self):
+        record = ItemRecord({"clean_text": "alpha"}, Vocabulary().encode(["alpha"]))
+        assert not hasattr(record, "__dict__")
+        assert record.token_set == frozenset({0})
+
+    def test_build_records_tokenizes_clean_text(self):
+        vocabulary = Vocabulary()
+        records = build_records([{"clean_text": "the alpha beta"}], vocabulary, fallback_pipeline.tokenize_clean)
+        assert vocabulary.decode(records[0].token_ids) == ["alpha", "beta"]
+
+
+def test_run_pipeline_cleans_each_item_once(monkeypatch):
+    calls = []
+    original_clean_text = fallback_pipeline.clean_text
+    original_clean_texts = fallback_pipeline.clean_texts
+
+    def counting_clean_text(text):
+        calls.append(text)
+        return original_clean_text(text)
+
+    def counting_clean_texts(texts):
+        calls.extend(texts)
+        return original_clean_texts(texts)
+
+    monkeypatch.setattr(fallback_pipeline, "clean_text", counting_clean_text)
+    monkeypatch.setattr(fallback_pipeline, "clean_texts", counting_clean_texts)
+    raw_items = [
+        {"id": str(idx), "text": f"Login bug number {idx} keeps crashing the app", "url": f"https://example.com/{idx}"}
+        for idx in range(5)
+    ]
+    payload, _ = fallback_pipeline.run_pipeline("run-1", ResearchRequest(topic="login bug"), raw_items)
+
+    item_calls = [text for text in calls if text.startswith("Login bug")]
+    assert len(item_calls) == len(raw_items)
+    assert payload["clusters"]
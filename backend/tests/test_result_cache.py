@@ -0,0 +1,239 @@
+"""Tests for the content-addressed result cache."""
+import threading
+import time
+from datetime import date, datetime
+
+import pytest
+
+from app.schemas.research import ResearchRequest, ResearchSummary
+from app.services.research_runner import ResearchRunner
+from app.services.run_queue import RunQueueFull
+from app.services.result_cache import ResultCache, rebind_result, request_cache_key
+
+
+def make_result(run_id="run-1"):
+    summary = ResearchSummary(run_id=run_id, topic="battery life", created_at=datetime.utcnow(), summary_text="done")
+    return summary, {"run_id": run_id, "items": [{"id": "1"}]}
+
+
+def wait_until_done(runner, run_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = runner.get_status(run_id)
+        if status.status in ("completed", "failed"):
+            return status
+        time.sleep(0.01)
+    raise AssertionError("run did not finish")
+
+
+class TestRequestCacheKey:
+    def test_equivalent_requests_share_a_key(self):
+        first = ResearchRequest(topic="Battery  Life", sources=["x", "reddit"])
+        second = ResearchRequest(topic="battery life", sources=["reddit", "x", "x"])
+        assert request_cache_key(first, "lite") == request_cache_key(second, "lite")
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"topic": "battery health"},
+            {"from_date": date(2024, 1, 1)},
+            {"to_date": date(2024, 2, 1)},
+            {"depth": "deep"},
+            {"sources": ["reddit"]},
+            {"sample_limit": 50},
+        ],
+    )
+    def test_each_request_field_changes_the_key(self, changes):
+        base = ResearchRequest(topic="battery life")
+        changed = ResearchRequest(**{"topic": "battery life", **changes})
+        assert request_cache_key(base, "lite") != request_cache_key(changed, "lite")
+
+    def test_pipeline_mode_changes_the_key(self):
+        request = ResearchRequest(topic="battery life")
+        assert request_cache_key(request, "lite") != request_cache_key(request, "full")
+
+
+class TestResultCache:
+    def test_miss_then_memory_hit(self):
+        cache = ResultCache(None, ttl=60, max_entries=4, max_disk_entries=0)
+        assert cache.get("key") is None
+        cache.put("key", *make_result())
+        summary, payload = cache.get("key")
+        assert summary.summary_text == "done"
+        assert payload["items"] == [{"id": "1"}]
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["memory_hits"]) == (1, 1, 1)
+
+    def test_disk_tier_survives_a_new_instance(self, tmp_path):
+        ResultCache(str(tmp_path), ttl=60, max_entries=4, max_disk_entries=4).put("key", *make_result())
+        cache = ResultCache(str(tmp_path), ttl=60, max_entries=4, max_disk_entries=4)
+        summary, payload = cache.get("key")
+        assert summary.run_id == "run-1"
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_expired_entries_are_not_served(self, tmp_path):
+        cache = ResultCache(str(tmp_path), ttl=0.05, max_entries=4, max_disk_entries=4)
+        cache.put("key", *make_result())
+        time.sleep(0.1)
+        assert cache.get("key") is None
+        assert not list(tmp_path.glob("*.bin"))
+
+    def test_size_bounded_eviction(self, tmp_path):
+        cache = ResultCache(str(tmp_path), ttl=60, max_entries=2, max_disk_entries=2)
+        for index in range(3):
+            cache.put(f"key-{index}", *make_result())
+            time.sleep(0.01)
+        assert len(cache._entries) == 2
+        assert sorted(path.stem for path in tmp_path.glob("*.bin")) == ["key-1", "key-2"]
+
+    def test_single_flight(self):
+        cache = ResultCache(None, ttl=60, max_entries=4, max_disk_entries=0)
+        assert cache.join("key", "owner") is False
+        assert cache.join("key", "follower-1") is True
+        assert cache.join("key", "follower-2") is True
+        assert cache.finish("key") == ["follower-1", "follower-2"]
+        assert cache.join("key", "next-owner") is False
+
+    def test_a_flight_is_abandoned_only_without_followers(self):
+        cache = ResultCache(None, ttl=60, max_entries=4, max_disk_entries=0)
+        cache.join("key", "owner")
+        cache.join("key", "follower")
+        assert cache.abandon("key") is False
+        cache.leave("key", "follower")
+        assert cache.abandon("key") is True
+        assert cache.join("key", "next-owner") is False
+
+    def test_rebind_result_does_not_mutate_the_cached_copy(self):
+        summary, payload = make_result("run-1")
+        rebound_summary, rebound_payload = rebind_result(summary, payload, "run-2")
+        assert (rebound_summary.run_id, rebound_payload["run_id"]) == ("run-2", "run-2")
+        assert (summary.run_id, payload["run_id"]) == ("run-1", "run-1")
+
+
+class TestRunnerCaching:
+    @pytest.fixture
+    def runner(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("RUN_STORE", "memory")
+        monkeypatch.setenv("STORAGE_PATH", str(tmp_path))
+        runner = ResearchRunner()
+        runner.start()
+        yield runner
+        runner.shutdown()
+
+    def test_identical_request_is_served_from_cache(self, runner):
+        first = runner.start_run(ResearchRequest(topic="battery life"))
+        assert wait_until_done(runner, first).status == "completed"
+
+        second = runner.start_run(ResearchRequest(topic="Battery life"))
+        status = runner.get_status(second)
+        assert status.status == "completed"
+        assert status.message == "Served from cached result"
+        assert runner.get_payload(second).payload["run_id"] == second
+        assert runner.get_summary(second).run_id == second
+        assert runner.cache_stats()["hits"] == 1
+
+    def test_concurrent_identical_requests_share_one_execution(self, runner, monkeypatch):
+        release = threading.Event()
+        executed = []
+        original = runner._execute_run
+
+        def blocked(run_id):
+            executed.append(run_id)
+            release.wait(5)
+            original(run_id)
+
+        monkeypatch.setattr(runner._scheduler, "_handler", blocked)
+        owner = runner.start_run(ResearchRequest(topic="battery life"))
+        followers = [runner.start_run(ResearchRequest(topic="battery life")) for _ in range(3)]
+        release.set()
+
+        for run_id in [owner, *followers]:
+            assert wait_until_done(runner, run_id).status == "completed"
+        assert executed == [owner]
+        assert runner.get_status(followers[0]).message == f"Shared execution of run {owner}"
+        assert runner.cache_stats()["coalesced"] == 3
+
+    def test_a_full_queue_leaves_no_run_of_the_batch_behind(self, runner, monkeypatch):
+        release = threading.Event()
+        original = runner._execute_run
+        monkeypatch.setattr(runner._scheduler, "_handler", lambda run_id: (release.wait(5), original(run_id)))
+        cached = runner.start_run(ResearchRequest(topic="battery life"))
+        release.set()
+        assert wait_until_done(runner, cached).status == "completed"
+        release.clear()
+        owner = runner.start_run(ResearchRequest(topic="checkout crashes"))
+
+        def full(runs):
+            raise RunQueueFull(retry_after=1)
+
+        monkeypatch.setattr(runner._scheduler, "submit_many", full)
+        batch = [
+            ResearchRequest(topic="battery life"),
+            ResearchRequest(topic="checkout crashes"),
+            ResearchRequest(topic="shipping delays"),
+        ]
+        with pytest.raises(RunQueueFull):
+            runner.start_runs(batch)
+        release.set()
+
+        assert set(runner._store._runs) == {cached, owner}
+        assert runner._joined == {} and runner._local_runs <= {owner}
+        assert set(runner._cache_keys) <= {owner}
+        assert wait_until_done(runner, owner).status == "completed"
+        assert runner.cache_stats()["in_flight"] == 0
+
+    def test_cancelling_the_owner_keeps_the_execution_for_followers(self, runner, monkeypatch):
+        release = threading.Event()
+        executed = []
+        original = runner._execute_run
+
+        def blocked(run_id):
+            executed.append(run_id)
+            release.wait(5)
+            original(run_id)
+
+        monkeypatch.setattr(runner._scheduler, "_handler", blocked)
+        owner = runner.start_run(ResearchRequest(topic="battery life"))
+        followers = [runner.start_run(ResearchRequest(topic="battery life")) for _ in range(2)]
+
+        assert runner.cancel(owner).status == "cancelled"
+        assert runner.cancel(followers[0]).status == "cancelled"
+        release.set()
+
+        assert wait_until_done(runner, followers[1]).status == "completed"
+        assert runner.get_status(followers[1]).message == f"Shared execution of run {owner}"
+        assert runner.get_status(owner).status == "cancelled"
+        assert runner.get_status(followers[0]).status == "cancelled"
+        assert executed == [owner]
+        assert runner.cache_stats()["in_flight"] == 0
+
+    def test_execution_stops_once_every_sharing_run_is_cancelled(self, runner, monkeypatch):
+        started = threading.Event()
+        release = threading.Event()
+        finished = threading.Event()
+        original = runner._execute_run
+
+        def blocked(run_id):
+            started.set()
+            release.wait(5)
+            original(run_id)
+            finished.set()
+
+        monkeypatch.setattr(runner._scheduler, "_handler", blocked)
+        owner = runner.start_run(ResearchRequest(topic="battery life"))
+        follower = runner.start_run(ResearchRequest(topic="battery life"))
+        # Running, so the last cancellation has to stop the pipeline rather than dequeue it.
+        assert started.wait(5)
+
+        runner.cancel(owner)
+        runner.cancel(follower)
+        release.set()
+
+        assert finished.wait(5)
+        assert runner.get_status(owner).status == "cancelled"
+        assert runner.get_status(follower).status == "cancelled"
+        assert runner.get_payload(owner) is None
+        assert 'kivo_runs_total{status="cancelled"} 1' in runner.render_metrics()
+        assert runner.cache_stats()["in_flight"] == 0
+        # The next identical request starts a fresh execution.
+        assert wait_until_done(runner, runner.start_run(ResearchRequest(topic="battery life"))).status == "completed"
@@ -7,6 +7,12 @@ from app.schemas.research import ResearchRequest
 
 client = TestClient(app)
 
+@pytest.fixture(autouse=True, scope="module")
+def lifespan():
+    # The application's lifespan starts the research runner the routes use.
+    with client:
+        yield
+
 
 class TestResearchRoutes:
     """Test research API endpoints."""
@@ -67,6 +73,105 @@ class TestResearchRoutes:
         response = client.get("/research/nonexistent-id/json")
         assert response.status_code == 404
 
+    def test_get_research_partial_not_found(self):
+        """Test partial results for a run that is not executing."""
+        response = client.get("/research/nonexistent-id/partial")
+        assert response.status_code == 404
+
+    def test_cancel_research_not_found(self):
+        """Test cancelling a run that does not exist."""
+        response = client.delete("/research/nonexistent-id")
+        assert response.status_code == 404
+
+    def test_cancel_finished_research_conflicts(self):
+        """Test that a finished run cannot be cancelled."""
+        import time
+
+        run_id = client.post("/research/run", json={"topic": "finished cancel"}).json()["run_id"]
+        for _ in range(500):
+            if client.get(f"/research/{run_id}/status").json()["status"] == "completed":
+                break
+            time.sleep(0.01)
+
+        response = client.delete(f"/research/{run_id}")
+        assert response.status_code == 409
+        assert response.json()["detail"] == "Run already completed"
+
+    def test_cancel_research_stops_run(self, monkeypatch):
+        """Test that a cancelled run ends as cancelled before doing any work."""
+        import threading
+        import time
+
+        from app.api.routes import research
+
+        release = threading.Event()
+        original = research.runner._execute_run
+        monkeypatch.setattr(research.runner._scheduler, "_handler", lambda run_id: (release.wait(5), original(run_id)))
+        run_id = client.post("/research/run", json={"topic": "cancel me"}).json()["run_id"]
+
+        response = client.delete(f"/research/{run_id}")
+        assert response.status_code == 202
+        assert response.json()["run_id"] == run_id
+        release.set()
+        for _ in range(500):
+            status = client.get(f"/research/{run_id}/status").json()
+            if status["status"] == "cancelled":
+                break
+            time.sleep(0.01)
+        assert status["status"] == "cancelled"
+        assert client.get(f"/research/{run_id}/summary").status_code == 404
+
+    def test_start_research_queue_full(self, monkeypatch):
+        """Test admission control when the run queue is full."""
+        from app.api.routes import research
+        from app.services.run_queue import RunQueueFull
+
+        def reject(request):
+            raise RunQueueFull(retry_after=7)
+
+        monkeypatch.setattr(research.runner, "start_run", reject)
+        response = client.post("/research/run", json={"topic": "test topic"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
+
+    def test_start_research_unknown_baseline(self):
+        """Test that incremental runs need a completed baseline."""
+        response = client.post("/research/run", json={"topic": "test topic", "baseline_run_id": "missing"})
+        assert response.status_code == 404
+
+    def test_start_research_batch(self):
+        """Test that identical requests in a batch share a run."""
+        payload = {"requests": [{"topic": "batch topic"}, {"topic": "other topic"}, {"topic": "batch topic"}]}
+        response = client.post("/research/runs:batch", json=payload)
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["unique_runs"] == 2
+        runs = data["runs"]
+        assert runs[0]["run_id"] == runs[2]["run_id"]
+        assert [run["deduplicated"] for run in runs] == [False, False, True]
+
+    def test_start_research_batch_empty(self):
+        """Test that a batch needs at least one request."""
+        response = client.post("/research/runs:batch", json={"requests": []})
+        assert response.status_code == 422
+
+    def test_bulk_status(self):
+        """Test reading many statuses at once."""
+        run_id = client.post("/research/run", json={"topic": "test topic"}).json()["run_id"]
+        response = client.post("/research/status:bulk", json={"run_ids": [run_id, "missing", run_id]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [status["run_id"] for status in data["statuses"]] == [run_id]
+        assert data["missing"] == ["missing"]
+
+    def test_cache_stats(self):
+        """Test result cache statistics endpoint."""
+        response = client.get("/research/cache")
+        assert response.status_code == 200
+        assert "enabled" in response.json()
+
     def test_health_check(self):
         """Test root endpoint."""
         response = client.get("/")
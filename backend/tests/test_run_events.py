@@ -0,0 +1,167 @@
+"""Tests for run event fan-out and the SSE/WebSocket endpoints."""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.routes import research
+from app.main import app
+from app.schemas.research import ResearchRequest
+from app.services.run_events import RunChannel, RunEventBroker, format_sse
+
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True, scope="module")
+def lifespan():
+    # The application's lifespan starts the research runner the routes use.
+    with client:
+        yield
+
+
+def test_one_wakeup_per_loop_for_many_subscribers():
+    channel = RunChannel()
+
+    async def subscriber(received):
+        assert await channel.wait(0, timeout=5)
+        events, _ = channel.since(0)
+        received.append(events[0][1])
+
+    async def main():
+        received = []
+        tasks = [asyncio.create_task(subscriber(received)) for _ in range(200)]
+        await asyncio.sleep(0.05)
+        assert len(channel._waiters) == 1
+        threading.Thread(target=channel.publish, args=({"type": "progress"},)).start()
+        await asyncio.gather(*tasks)
+        return received
+
+    received = asyncio.run(main())
+    assert len(received) == 200
+    # Every subscriber reads the same stored event.
+    assert all(event is received[0] for event in received)
+
+
+def test_wait_times_out_without_events():
+    channel = RunChannel()
+    assert asyncio.run(channel.wait(0, timeout=0.05)) is False
+
+
+def test_lagging_subscribers_are_told_to_resync():
+    channel = RunChannel(history_size=3)
+    for idx in range(5):
+        channel.publish({"type": "progress", "idx": idx})
+
+    events, lagged = channel.since(0)
+    assert lagged
+    assert [event["idx"] for _, event in events] == [2, 3, 4]
+    assert channel.since(2) == (events, False)
+
+
+def test_broker_only_keeps_channels_with_subscribers():
+    broker = RunEventBroker()
+    broker.publish("run", {"type": "progress"})
+    assert broker.stats() == {"channels": 0, "subscribers": 0}
+
+    channel = broker.acquire("run")
+    same = broker.acquire("run")
+    assert channel is same
+    broker.publish("run", {"type": "completed"}, close=True)
+    assert channel.closed
+    assert broker.stats() == {"channels": 0, "subscribers": 2}
+
+    broker.release("run", channel)
+    broker.release("run", channel)
+    assert broker.stats() == {"channels": 0, "subscribers": 0}
+
+
+def test_format_sse():
+    assert format_sse({"type": "stage", "stage": "dedup"}) == 'event: stage\ndata: {"type":"stage","stage":"dedup"}\n\n'
+
+
+def _gate_runner(monkeypatch):
+    release = threading.Event()
+    original = research.runner._execute_run
+    monkeypatch.setattr(research.runner._scheduler, "_handler", lambda run_id: (release.wait(5), original(run_id)))
+    return release
+
+
+def _sse_events(response):
+    event_type = None
+    for line in response.iter_lines():
+        if line.startswith("event: "):
+            event_type = line[len("event: "):]
+        elif line.startswith("data: "):
+            event = json.loads(line[len("data: "):])
+            assert event["type"] == event_type
+            yield event
+
+
+def test_sse_pushes_progress_until_completion(monkeypatch):
+    release = _gate_runner(monkeypatch)
+    run_id = research.runner.start_run(ResearchRequest(topic="sse topic"))
+    # The test client hands over the body once the response ends, so the run is let go from a timer.
+    threading.Timer(0.3, release.set).start()
+
+    with client.stream("GET", f"/research/{run_id}/events") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        snapshot, *received = _sse_events(response)
+
+    assert snapshot["type"] == "snapshot"
+    assert snapshot["status"] == "queued"
+
+    types = [event["type"] for event in received]
+    assert types[0] == "status"
+    assert types[-1] == "completed"
+    stages = [event["stage"] for event in received if event["type"] == "stage"]
+    assert stages[0] == "fetch"
+    assert stages[-1] == "summarize"
+    progress = [event["progress"] for event in received if event["type"] == "progress"]
+    assert progress == sorted(progress)
+    assert research.runner.event_stats()["subscribers"] == 0
+
+
+def test_sse_for_finished_run_sends_only_a_snapshot():
+    run_id = research.runner.start_run(ResearchRequest(topic="finished topic"))
+    for _ in range(500):
+        if research.runner.get_status(run_id).status == "completed":
+            break
+        time.sleep(0.01)
+
+    with client.stream("GET", f"/research/{run_id}/events") as response:
+        events = list(_sse_events(response))
+
+    assert len(events) == 1
+    assert events[0]["status"] == "completed"
+    assert events[0]["progress"] == 1.0
+
+
+def test_sse_unknown_run():
+    response = client.get("/research/nonexistent-id/events")
+    assert response.status_code == 404
+
+
+def test_websocket_streams_events(monkeypatch):
+    release = _gate_runner(monkeypatch)
+    run_id = research.runner.start_run(ResearchRequest(topic="socket topic"))
+
+    with client.websocket_connect(f"/research/{run_id}/ws") as websocket:
+        assert websocket.receive_json()["type"] == "snapshot"
+        release.set()
+        received = []
+        while not received or received[-1]["type"] not in ("completed", "failed"):
+            received.append(websocket.receive_json())
+
+    assert received[-1]["type"] == "completed"
+    assert any(event["type"] == "progress" for event in received)
+
+
+def test_websocket_unknown_run():
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/research/nonexistent-id/ws") as websocket:
+            websocket.receive_json()
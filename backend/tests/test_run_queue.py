@@ -0,0 +1,82 @@
+"""Tests for the bounded run scheduler."""
+import threading
+import time
+
+import pytest
+
+from app.services.run_queue import RunQueueFull, RunScheduler
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class BlockingHandler:
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+
+    def __call__(self, run_id):
+        self.started.append(run_id)
+        self.release.wait(timeout=5)
+
+
+class TestRunScheduler:
+    def test_runs_are_executed(self):
+        done = []
+        scheduler = RunScheduler(done.append, workers=2, max_queue_size=4)
+        scheduler.submit("a")
+        scheduler.submit("b")
+        assert wait_for(lambda: sorted(done) == ["a", "b"])
+
+    def test_lower_priority_value_runs_first(self):
+        handler = BlockingHandler()
+        scheduler = RunScheduler(handler, workers=1, max_queue_size=4)
+        scheduler.submit("busy")
+        assert wait_for(lambda: handler.started == ["busy"])
+        scheduler.submit("deep", priority=1)
+        scheduler.submit("default", priority=0)
+        assert scheduler.position("default") == 1
+        assert scheduler.position("deep") == 2
+        handler.release.set()
+        assert wait_for(lambda: handler.started == ["busy", "default", "deep"])
+
+    def test_full_queue_rejects_with_retry_after(self):
+        handler = BlockingHandler()
+        scheduler = RunScheduler(handler, workers=1, max_queue_size=1)
+        scheduler.submit("busy")
+        assert wait_for(lambda: handler.started == ["busy"])
+        scheduler.submit("queued")
+        with pytest.raises(RunQueueFull) as excinfo:
+            scheduler.submit("rejected")
+        assert excinfo.value.retry_after >= 1
+        handler.release.set()
+
+    def test_position_is_none_once_running(self):
+        handler = BlockingHandler()
+        scheduler = RunScheduler(handler, workers=1, max_queue_size=2)
+        scheduler.submit("busy")
+        assert wait_for(lambda: handler.started == ["busy"])
+        assert scheduler.position("busy") is None
+        assert scheduler.active() == 1
+        handler.release.set()
+
+    def test_submit_many_is_all_or_nothing(self):
+        handler = BlockingHandler()
+        scheduler = RunScheduler(handler, workers=1, max_queue_size=3)
+        scheduler.submit("busy")
+        assert wait_for(lambda: handler.started == ["busy"])
+        scheduler.submit("queued")
+        with pytest.raises(RunQueueFull):
+            scheduler.submit_many([("a", 0), ("b", 0), ("c", 0)])
+        assert scheduler.positions(["a", "b", "c"]) == {}
+
+        scheduler.submit_many([("deep", 1), ("default", 0)])
+        assert scheduler.positions(["deep", "default", "busy", "missing"]) == {"default": 2, "deep": 3}
+        handler.release.set()
+        assert wait_for(lambda: handler.started == ["busy", "queued", "default", "deep"])
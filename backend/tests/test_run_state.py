@@ -0,0 +1,233 @@
+"""Tests for run state shared between server worker processes."""
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app.core.config import Settings
+from app.schemas.research import ResearchRequest
+from app.services.research_runner import ResearchRunner
+from app.services.run_state import MemoryRunState, RedisRunState, SharedRunState, SQLiteRunState, build_run_state
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+class FakeRedis:
+    """The slice of the redis-py client the adapter uses, with key expiry."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.expiry = {}
+
+    def _live(self, key):
+        if key in self.expiry and self.expiry[key] <= time.time():
+            self.hashes.pop(key, None)
+            self.expiry.pop(key, None)
+        return self.hashes.get(key)
+
+    def hset(self, key, field, value):
+        self._live(key)
+        self.hashes.setdefault(key, {})[field] = value.encode("utf-8")
+
+    def hget(self, key, field):
+        fields = self._live(key)
+        return fields.get(field) if fields else None
+
+    def expire(self, key, seconds):
+        self.expiry[key] = time.time() + seconds
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+        self.expiry.pop(key, None)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def make_state(request, tmp_path):
+    def make(ttl=None):
+        if request.param == "memory":
+            return MemoryRunState(ttl)
+        if request.param == "sqlite":
+            return SQLiteRunState(str(tmp_path / "state.db"), ttl)
+        return RedisRunState(FakeRedis(), ttl)
+
+    return make
+
+
+def test_fields_round_trip_and_discard(make_state):
+    state = make_state()
+    state.set("run-1", "partial", {"items_received": 3, "clusters": [{"label": "battery"}]})
+    state.set("run-1", "other", 1)
+
+    assert state.get("run-1", "partial") == {"items_received": 3, "clusters": [{"label": "battery"}]}
+    assert state.get("run-1", "missing") is None
+    assert state.get("run-2", "partial") is None
+
+    state.discard("run-1")
+    assert state.get("run-1", "partial") is None
+    assert state.get("run-1", "other") is None
+    state.close()
+
+
+def test_state_expires_after_ttl(make_state):
+    state = make_state(ttl=0.5)
+    state.set("run-1", "partial", {"items_received": 1})
+    assert state.get("run-1", "partial") == {"items_received": 1}
+    time.sleep(1.1)
+    assert state.get("run-1", "partial") is None
+
+
+def test_sqlite_state_is_visible_to_other_processes(tmp_path):
+    path = str(tmp_path / "state.db")
+    state = SQLiteRunState(path)
+    state.set("run-1", "partial", {"items_received": 7})
+
+    probe = (
+        "from app.services.run_state import SQLiteRunState\n"
+        f"state = SQLiteRunState({path!r})\n"
+        "print(state.get('run-1', 'partial')['items_received'])\n"
+        "state.set('run-1', 'reply', 'from child')\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=60, check=True
+    )
+
+    assert completed.stdout.strip() == "7"
+    assert state.get("run-1", "reply") == "from child"
+
+
+def test_states_must_implement_every_operation():
+    class Partial(SharedRunState):
+        def get(self, run_id, field):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_build_run_state_follows_settings(monkeypatch, tmp_path, caplog):
+    from app.services import run_state
+
+    assert isinstance(build_run_state(Settings(RUN_STORE="memory", storage_path=str(tmp_path))), MemoryRunState)
+    assert isinstance(build_run_state(Settings(storage_path=str(tmp_path))), SQLiteRunState)
+    assert (tmp_path / "state.db").exists()
+
+    redis = Settings(RUN_STATE="redis", RUN_STATE_REDIS_URL="redis://localhost:6379/0", storage_path=str(tmp_path))
+    monkeypatch.setattr(run_state, "redis_available", lambda: False)
+    # Without the redis package the state is still shared through SQLite, with a warning.
+    with caplog.at_level("WARNING", logger="app.services.run_state"):
+        assert isinstance(build_run_state(redis), SQLiteRunState)
+    assert "redis package is not installed" in caplog.text
+
+    monkeypatch.setattr(run_state, "redis_available", lambda: True)
+    monkeypatch.setattr(RedisRunState, "from_url", classmethod(lambda cls, url, ttl=None: cls(FakeRedis(), ttl)))
+    state = build_run_state(redis)
+    assert isinstance(state, RedisRunState)
+    assert state.ttl == 3600
+
+
+def _blocking_pipeline(started, release):
+    def pipeline(run_id, request, raw_items, progress, partial, control=None):
+        progress("cluster", 0.5)
+        partial({"items_received": 4, "items_kept": 3, "clusters": [], "sentiment": {}})
+        started.set()
+        release.wait(10)
+        from app.pipelines import fallback_pipeline
+
+        return fallback_pipeline.run_pipeline(run_id, request, [], None, None)
+
+    return pipeline
+
+
+@pytest.fixture
+def two_workers(monkeypatch, tmp_path):
+    """Two runners sharing one SQLite run store and state file, like two server processes."""
+
+    monkeypatch.setenv("STORAGE_PATH", str(tmp_path))
+    monkeypatch.setenv("RUN_STORE", "sqlite")
+    monkeypatch.setenv("RUN_STATUS_FLUSH_INTERVAL", "0.05")
+    monkeypatch.setenv("RUN_STATE_POLL_INTERVAL", "0.05")
+    owner, other = ResearchRunner(), ResearchRunner()
+    owner.start()
+    other.start()
+    yield owner, other
+    owner.shutdown()
+    other.shutdown()
+
+
+def test_run_started_in_one_worker_is_visible_from_another(two_workers):
+    owner, other = two_workers
+    started, release = threading.Event(), threading.Event()
+    owner._pipeline_func = _blocking_pipeline(started, release)
+
+    run_id = owner.start_run(ResearchRequest(topic="shared topic"))
+    assert started.wait(5)
+    time.sleep(0.2)
+
+    status = other.get_status(run_id)
+    assert status is not None
+    assert status.status == "running"
+    assert status.stage == "cluster"
+    assert other.get_partial(run_id).items_received == 4
+
+    release.set()
+    for _ in range(200):
+        if other.get_status(run_id).status == "completed":
+            break
+        time.sleep(0.02)
+    assert other.get_status(run_id).status == "completed"
+    assert other.get_partial(run_id) is None
+    assert other.get_summary(run_id) is not None
+
+
+def test_events_of_a_run_in_another_worker_are_polled(two_workers):
+    owner, other = two_workers
+    started, release = threading.Event(), threading.Event()
+    owner._pipeline_func = _blocking_pipeline(started, release)
+    run_id = owner.start_run(ResearchRequest(topic="shared events"))
+    assert started.wait(5)
+    time.sleep(0.2)
+
+    async def collect():
+        events = []
+        async for event in other.watch(run_id, heartbeat=5):
+            events.append(event)
+            if len(events) == 1:
+                release.set()
+        return events
+
+    events = asyncio.run(asyncio.wait_for(collect(), 10))
+
+    assert all(event["type"] == "snapshot" for event in events)
+    assert events[0]["status"] == "running"
+    assert events[0]["partial"]["items_received"] == 4
+    assert events[-1]["status"] == "completed"
+    assert events[-1]["partial"] is None
+
+
+def test_cancel_from_another_worker_stops_the_run(two_workers):
+    owner, other = two_workers
+    started = threading.Event()
+
+    def endless(run_id, request, raw_items, progress, partial, control=None):
+        started.set()
+        for _ in range(1000):
+            progress("dedup", 0.3)
+            time.sleep(0.01)
+        raise AssertionError("cancellation was not observed")
+
+    owner._pipeline_func = endless
+    run_id = owner.start_run(ResearchRequest(topic="remote cancel"))
+    assert started.wait(5)
+
+    # The owner's "running" status may not have been flushed yet.
+    assert other.cancel(run_id).status in ("queued", "running")
+    for _ in range(300):
+        if other.get_status(run_id).status == "cancelled":
+            break
+        time.sleep(0.02)
+    assert other.get_status(run_id).status == "cancelled"
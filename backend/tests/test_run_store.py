@@ -0,0 +1,229 @@
+"""Tests for the run store backends."""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.schemas.research import ResearchRequest, ResearchSummary
+from app.services.run_store import MemoryRunStore, RunStore, SQLiteRunStore
+
+
+@pytest.fixture(params=["memory", "sqlite", "sqlite-columnar"])
+def make_store(request, tmp_path):
+    stores = []
+    if request.param == "sqlite-columnar":
+        pytest.importorskip("numpy")
+
+    def factory(**kwargs):
+        if request.param == "memory":
+            store = MemoryRunStore(**kwargs)
+        elif request.param == "sqlite":
+            store = SQLiteRunStore(str(tmp_path / "runs.db"), flush_interval=60, **kwargs)
+        else:
+            store = SQLiteRunStore(
+                str(tmp_path / "runs.db"),
+                flush_interval=60,
+                payload_dir=str(tmp_path / "payloads"),
+                **kwargs,
+            )
+        stores.append(store)
+        return store
+
+    yield factory
+    for store in stores:
+        store.close()
+
+
+def make_summary(run_id):
+    return ResearchSummary(run_id=run_id, topic="battery life", created_at=datetime.utcnow(), summary_text="done")
+
+
+def complete(store, run_id, finished_at=None):
+    store.create(run_id, ResearchRequest(topic="battery life"), "lite", datetime.utcnow())
+    payload = {"run_id": run_id, "items": [{"id": "1", "text": "drains fast"}]}
+    store.complete(
+        run_id,
+        make_summary(run_id),
+        payload,
+        status="completed",
+        progress=1.0,
+        finished_at=finished_at or datetime.utcnow(),
+    )
+    return payload
+
+
+def test_stores_must_implement_every_operation():
+    class Partial(RunStore):
+        def get(self, run_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_create_and_update_status(make_store):
+    store = make_store()
+    store.create("run-1", ResearchRequest(topic="battery life", depth="deep"), "full", datetime.utcnow())
+    store.update("run-1", status="running", progress=0.4, stage="dedup")
+
+    run = store.get("run-1")
+    assert run["status"] == "running"
+    assert run["progress"] == 0.4
+    assert run["stage"] == "dedup"
+    assert run["pipeline_mode"] == "full"
+    assert run["request"].depth == "deep"
+    assert store.get("missing") is None
+
+
+def test_get_statuses_reads_many_runs(make_store):
+    store = make_store()
+    created_at = datetime.utcnow()
+    store.create_many([(f"run-{idx}", ResearchRequest(topic="battery life"), "lite", created_at) for idx in range(3)])
+    store.update("run-1", status="running", progress=0.4, stage="dedup")
+
+    statuses = store.get_statuses(["run-0", "run-1", "missing"])
+    assert set(statuses) == {"run-0", "run-1"}
+    assert statuses["run-0"]["status"] == "queued"
+    assert statuses["run-1"] == {
+        "status": "running",
+        "progress": 0.4,
+        "stage": "dedup",
+        "message": None,
+        "started_at": None,
+        "finished_at": None,
+    }
+
+
+def test_completed_run_round_trips(make_store):
+    store = make_store()
+    payload = complete(store, "run-1")
+
+    assert store.get("run-1")["status"] == "completed"
+    assert store.get_summary("run-1").summary_text == "done"
+    assert store.get_payload("run-1") == payload
+
+
+def test_delete_removes_everything(make_store):
+    store = make_store()
+    complete(store, "run-1")
+    store.delete("run-1")
+    assert store.get("run-1") is None
+    assert store.get_payload("run-1") is None
+
+
+def test_expired_payloads_are_evicted(make_store):
+    store = make_store(payload_ttl=60)
+    complete(store, "run-1")
+    assert store.evict(now=datetime.utcnow() + timedelta(seconds=120)) == 1
+    assert store.get_payload("run-1") is None
+    assert store.get_summary("run-1") is not None
+
+
+def test_least_recently_read_payload_is_evicted(make_store):
+    store = make_store(max_payloads=2)
+    complete(store, "run-1")
+    complete(store, "run-2")
+    store.get_payload("run-1")
+    complete(store, "run-3")
+
+    assert store.get_payload("run-2") is None
+    assert store.get_payload("run-1") is not None
+    assert store.get_payload("run-3") is not None
+
+
+def test_sqlite_status_writes_are_batched(tmp_path):
+    path = str(tmp_path / "runs.db")
+    writer = SQLiteRunStore(path, flush_interval=60)
+    reader = SQLiteRunStore(path, flush_interval=60)
+    try:
+        writer.create("run-1", ResearchRequest(topic="battery life"), "lite", datetime.utcnow())
+        writer.update("run-1", status="running", progress=0.5)
+        assert writer.get("run-1")["progress"] == 0.5
+        assert reader.get("run-1")["progress"] == 0.0
+
+        writer.flush()
+        assert reader.get("run-1")["progress"] == 0.5
+        assert reader.get_statuses(["run-1"])["run-1"]["progress"] == 0.5
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_flush_in_progress_never_reverts_a_completed_run(tmp_path):
+    path = str(tmp_path / "runs.db")
+    store = SQLiteRunStore(path, flush_interval=60)
+    reader = SQLiteRunStore(path, flush_interval=60)
+    flushing, release = threading.Event(), threading.Event()
+
+    def pause_flush(conn, cursor, statement, parameters, context, executemany):
+        if threading.current_thread().name == "flush" and statement.startswith("UPDATE researchrun"):
+            flushing.set()
+            release.wait(5)
+
+    try:
+        store.create("run-1", ResearchRequest(topic="battery life"), "lite", datetime.utcnow())
+        store.update("run-1", status="running", progress=0.5)
+        event.listen(store._engine, "before_cursor_execute", pause_flush)
+        flusher = threading.Thread(target=store.flush, name="flush")
+        flusher.start()
+        assert flushing.wait(5)
+        # The flush has taken "running" and is about to write it when the run completes.
+        completer = threading.Thread(
+            target=store.complete,
+            args=("run-1", make_summary("run-1"), {"items": []}),
+            kwargs={"status": "completed", "progress": 1.0},
+        )
+        completer.start()
+        time.sleep(0.1)
+        release.set()
+        flusher.join(5)
+        completer.join(5)
+
+        assert reader.get("run-1")["status"] == "completed"
+    finally:
+        store.close()
+        reader.close()
+
+
+def test_buffered_progress_does_not_leave_a_terminal_status(tmp_path):
+    path = str(tmp_path / "runs.db")
+    store = SQLiteRunStore(path, flush_interval=60)
+    reader = SQLiteRunStore(path, flush_interval=60)
+    try:
+        complete(store, "run-1")
+        store.update("run-1", status="running", progress=0.9)
+        store.flush()
+        assert reader.get("run-1")["status"] == "completed"
+
+        store.create("run-2", ResearchRequest(topic="battery life"), "lite", datetime.utcnow())
+        store.update("run-2", status="failed", message="boom")
+        store.flush()
+        assert reader.get("run-2")["status"] == "failed"
+    finally:
+        store.close()
+        reader.close()
+
+
+def test_columnar_payload_files_are_removed_on_eviction(tmp_path):
+    pytest.importorskip("numpy")
+    store = SQLiteRunStore(str(tmp_path / "runs.db"), max_payloads=1, payload_dir=str(tmp_path / "payloads"))
+    try:
+        complete(store, "run-1")
+        assert (tmp_path / "payloads" / "run-1").is_dir()
+        assert store.open_payload("run-1").item_count() == 1
+        complete(store, "run-2")
+        assert not (tmp_path / "payloads" / "run-1").exists()
+        assert store.open_payload("run-1") is None
+    finally:
+        store.close()
+
+
+def test_sqlite_uses_wal_journal(tmp_path):
+    store = SQLiteRunStore(str(tmp_path / "runs.db"))
+    try:
+        with store._engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+    finally:
+        store.close()
@@ -0,0 +1,141 @@
+"""Tests for depth-driven sampling of the collected items."""
+import statistics
+
+from app.pipelines import fallback_pipeline
+from app.pipelines.sampling import (
+    APPROX_CANDIDATES,
+    DEFAULT_SAMPLE_PER_PLATFORM,
+    StratifiedSampler,
+    allocate,
+    depth_plan,
+    may_exceed,
+)
+from app.schemas.research import ResearchRequest
+from app.services.collectors import CollectionStream, source_limit
+
+
+def _raw_items(count, platform="reddit", score=lambda idx: idx % 5):
+    topics = ["battery drains fast", "checkout page crashes", "shipping is slow", "support never answers"]
+    return [
+        {
+            "id": f"{platform}{idx}",
+            "platform": platform,
+            "timestamp": "2024-03-01T00:00:00",
+            "text": f"{topics[idx % len(topics)]} on order {idx}",
+            "score": score(idx),
+        }
+        for idx in range(count)
+    ]
+
+
+def test_depth_plan_follows_the_request():
+    deep = depth_plan(ResearchRequest(topic="battery", depth="deep"))
+    assert deep.sample_per_platform is None
+    assert deep.exact
+
+    default = depth_plan(ResearchRequest(topic="battery"))
+    assert default.sample_per_platform == DEFAULT_SAMPLE_PER_PLATFORM
+    assert default.max_candidates == APPROX_CANDIDATES
+    assert default.seed == depth_plan(ResearchRequest(topic="battery")).seed
+
+
+def test_default_depth_fetches_more_than_it_analyses():
+    request = ResearchRequest(topic="battery")
+
+    assert source_limit(request) > DEFAULT_SAMPLE_PER_PLATFORM
+    assert source_limit(request) < source_limit(ResearchRequest(topic="battery", depth="deep"))
+    assert may_exceed(CollectionStream([], limit=source_limit(request)), depth_plan(request).sample_per_platform)
+
+
+def test_allocate_favours_small_strata_within_the_budget():
+    quotas = allocate({"low": 9000, "mid": 900, "high": 100}, 100)
+
+    assert sum(quotas.values()) == 100
+    # Proportional allocation would give the high tier a single item.
+    assert quotas["high"] > 5
+    assert quotas["low"] > quotas["mid"] > quotas["high"]
+    assert allocate({"low": 3, "high": 2}, 10) == {"low": 3, "high": 2}
+    assert allocate({"low": 500, "high": 2}, 100)["high"] == 2
+
+
+def test_sampler_keeps_every_tier_and_arrival_order():
+    items = _raw_items(5000, score=lambda idx: 500 if idx % 2000 == 0 else idx % 3)
+    sampler = StratifiedSampler(200, fallback_pipeline.compute_engagement, seed=1)
+    sampler.extend(items)
+    sample = sampler.sample()
+    report = sampler.report()
+
+    positions = [int(item["id"][len("reddit"):]) for item in sample]
+    assert len(sample) == 200
+    assert positions == sorted(positions)
+    assert sum(1 for item in sample if item["score"] == 500) == 3
+    assert report["items_seen"] == 5000
+    assert report["items_analysed"] == 200
+    assert report["strata"]["reddit:3"] == {"seen": 3, "sampled": 3}
+
+
+def test_sampler_is_uniform_within_a_stratum_and_seeded():
+    items = _raw_items(20000, score=lambda idx: 0)
+
+    def draw(seed):
+        sampler = StratifiedSampler(1000, fallback_pipeline.compute_engagement, seed=seed)
+        sampler.extend(items)
+        return [int(item["id"][len("reddit"):]) for item in sampler.sample()]
+
+    positions = draw(3)
+    assert draw(3) == positions
+    assert draw(4) != positions
+    assert abs(statistics.mean(positions) - 10000) < 1000
+    assert sum(1 for position in positions if position >= 10000) > 400
+
+
+def test_may_exceed_trusts_streams_that_declare_a_limit():
+    assert not may_exceed(_raw_items(10) + _raw_items(10, platform="x"), 10)
+    assert may_exceed(_raw_items(11), 10)
+    assert not may_exceed(CollectionStream([], limit=10), 10)
+    assert may_exceed(CollectionStream([], limit=11), 10)
+    assert may_exceed(iter(_raw_items(1)), 10)
+
+
+def test_default_depth_analyses_a_sample_per_platform():
+    raw_items = _raw_items(1500) + _raw_items(150, platform="x")
+    request = ResearchRequest(topic="battery checkout")
+
+    payload, summary = fallback_pipeline.run_pipeline("run", request, raw_items)
+    sampling = payload["sampling"]
+
+    assert sampling["method"] == "stratified"
+    assert sampling["items_seen"] == 1650
+    assert sampling["items_analysed"] == DEFAULT_SAMPLE_PER_PLATFORM + 150
+    assert payload["metrics"]["stages"]["normalize"]["items"] == DEFAULT_SAMPLE_PER_PLATFORM + 150
+    assert {item["platform"] for item in payload["items"]} == {"reddit", "x"}
+    assert summary.summary_text
+
+    again, _ = fallback_pipeline.run_pipeline("run", request, iter(raw_items))
+    assert [item["id"] for item in again["items"]] == [item["id"] for item in payload["items"]]
+
+
+def test_deep_depth_analyses_everything_exactly():
+    raw_items = _raw_items(1500)
+
+    payload, _ = fallback_pipeline.run_pipeline("run", ResearchRequest(topic="battery", depth="deep"), raw_items)
+
+    assert payload["sampling"] == {
+        "depth": "deep",
+        "exact": True,
+        "method": "all",
+        "items_seen": 1500,
+        "items_analysed": 1500,
+    }
+
+
+def test_full_pipeline_samples_default_runs(require_full_pipeline):
+    from app.pipelines import full_pipeline
+
+    raw_items = _raw_items(900)
+    request = ResearchRequest(topic="battery checkout")
+
+    payload, _ = full_pipeline.run_pipeline("run", request, raw_items)
+
+    assert payload["sampling"]["items_analysed"] == DEFAULT_SAMPLE_PER_PLATFORM
+    assert payload["metrics"]["stages"]["normalize"]["items"] == DEFAULT_SAMPLE_PER_PLATFORM
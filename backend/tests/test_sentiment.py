@@ -0,0 +1,48 @@
+"""Tests for the shared, batched sentiment stage."""
+import pytest
+
+from app.pipelines import sentiment
+
+
+class TestAnalyzer:
+    def test_analyzer_is_shared(self):
+        assert sentiment.get_analyzer() is sentiment.get_analyzer()
+
+
+class TestShortCircuit:
+    @pytest.mark.parametrize("text", ["", "   ", None, "https://example.com/a?b=1", " HTTP://x.io  https://y.io "])
+    def test_blank_and_url_only_texts_are_skipped(self, text):
+        assert sentiment.needs_scoring(text) is False
+
+    @pytest.mark.parametrize("text", ["great app", "see https://example.com it is awful", "\U0001f600"])
+    def test_texts_with_content_are_scored(self, text):
+        assert sentiment.needs_scoring(text) is True
+
+
+class TestScoreTexts:
+    def test_scores_align_with_inputs(self):
+        scores, timings = sentiment.score_texts(["This is absolutely wonderful!", "", "This is terrible and awful!"])
+        assert scores[0]["compound"] > 0
+        assert scores[1] == sentiment.NEUTRAL_SENTIMENT
+        assert scores[2]["compound"] < 0
+        assert timings["items"] == 3
+        assert timings["short_circuited"] == 1
+        assert timings["mode"] == "inline"
+        assert {"init_ms", "wall_ms", "per_item_us"} <= set(timings)
+
+    def test_neutral_scores_are_independent_copies(self):
+        scores, _ = sentiment.score_texts(["", ""])
+        scores[0]["compound"] = 1.0
+        assert scores[1]["compound"] == 0.0
+        assert sentiment.NEUTRAL_SENTIMENT["compound"] == 0.0
+
+    @pytest.mark.slow
+    def test_process_pool_matches_inline(self):
+        texts = ["I love this", "I hate this", "meh", "https://example.com"] * 20
+        try:
+            pooled, timings = sentiment.score_texts(texts, workers=2, pool_min_items=1)
+        finally:
+            sentiment.shutdown_pool()
+        inline, _ = sentiment.score_texts(texts, workers=1)
+        assert timings["mode"] == "process_pool"
+        assert pooled == inline
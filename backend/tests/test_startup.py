@@ -0,0 +1,171 @@
+"""Tests for application cold start and runner warm-up."""
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import research
+from app.main import create_app
+from app.pipelines import sentiment
+from app.schemas.research import ResearchRequest
+from app.services.research_runner import LazyPipeline, ResearchRunner
+
+
+# Seconds a fresh interpreter may spend importing the application, runner included.
+IMPORT_BUDGET_SECONDS = 1.0
+# Imported on first use or by the warm-up, never by ``import app.main``.
+DEFERRED_MODULES = ("numpy", "scipy", "sklearn", "pandas", "vaderSentiment", "httpx", "pyarrow")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [name for name in %r if name in sys.modules]}))
+""" % (DEFERRED_MODULES,)
+
+
+def test_app_import_stays_within_budget(tmp_path):
+    env = {"PATH": "", "STORAGE_PATH": str(tmp_path), "RUN_STORE": "memory"}
+    timings = []
+    for _ in range(2):
+        completed = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+            check=True,
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        assert result["loaded"] == []
+        timings.append(result["seconds"])
+    # The first import may also be compiling bytecode.
+    assert min(timings) < IMPORT_BUDGET_SECONDS
+
+
+def test_warm_up_loads_the_pipeline(monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    runner = ResearchRunner()
+    try:
+        runner.warm_up()
+        if isinstance(runner._pipeline_func, LazyPipeline):
+            assert runner._pipeline_mode == "full"
+            assert runner._pipeline_func._func is not None
+    finally:
+        runner.shutdown()
+
+
+def test_warm_up_falls_back_to_lite_when_import_fails(monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    runner = ResearchRunner()
+    runner._pipeline_func = LazyPipeline("app.pipelines.missing_pipeline:run_pipeline")
+    runner._pipeline_mode = "full"
+    try:
+        runner.warm_up()
+        assert runner._pipeline_mode == "lite"
+        assert not isinstance(runner._pipeline_func, LazyPipeline)
+    finally:
+        runner.shutdown()
+
+
+def test_creating_a_runner_opens_nothing(monkeypatch, tmp_path):
+    monkeypatch.setenv("STORAGE_PATH", str(tmp_path / "storage"))
+    runner = ResearchRunner()
+
+    assert not (tmp_path / "storage").exists()
+    runner.start()
+    try:
+        assert (tmp_path / "storage" / "runs.db").exists()
+    finally:
+        runner.shutdown()
+
+
+def test_lifespan_starts_warms_up_and_shuts_down_the_runner(monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    runner = ResearchRunner()
+    warmed = threading.Event()
+    stopped = []
+    monkeypatch.setattr(runner, "warm_up", warmed.set)
+    monkeypatch.setattr(runner, "shutdown", lambda: stopped.append(True))
+    monkeypatch.setattr(research, "runner", runner)
+
+    with TestClient(create_app()) as client:
+        assert runner._started
+        assert warmed.wait(5)
+        assert client.get("/research/cache").status_code == 200
+        assert not stopped
+    assert stopped == [True]
+    ResearchRunner.shutdown(runner)
+
+
+def test_runner_serves_runs_after_a_second_lifespan(monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    monkeypatch.setenv("RUN_WARM_UP", "false")
+    runner = ResearchRunner()
+    monkeypatch.setattr(research, "runner", runner)
+    app = create_app()
+
+    for _ in range(2):
+        with TestClient(app) as client:
+            response = client.post("/research/run", json={"topic": "battery life"})
+            assert response.status_code == 202
+            run_id = response.json()["run_id"]
+            for _ in range(100):
+                status = client.get(f"/research/{run_id}/status").json()
+                if status["status"] == "completed":
+                    break
+                time.sleep(0.05)
+            assert status["status"] == "completed"
+    runner.start()
+    runner.shutdown()
+    runner.shutdown()
+
+
+def test_shutdown_stops_the_sentiment_pool(monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    runner = ResearchRunner()
+    runner.start()
+    try:
+        _, timings = sentiment.score_texts(["great battery", "awful screen"], workers=2, pool_min_items=1)
+        assert timings["mode"] == "process_pool"
+        assert sentiment._pool is not None
+    finally:
+        runner.shutdown()
+
+    assert sentiment._pool is None
+
+
+def test_run_falls_back_to_lite_when_the_first_call_cannot_import(monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    runner = ResearchRunner()
+    runner.start()
+    runner._pipeline_func = LazyPipeline("app.pipelines.missing_pipeline:run_pipeline")
+    runner._pipeline_mode = "full"
+    try:
+        run_id = runner.start_run(ResearchRequest(topic="lite fallback"))
+        for _ in range(100):
+            status = runner.get_status(run_id)
+            if status.status == "completed":
+                break
+            time.sleep(0.05)
+        assert status.status == "completed"
+        assert runner._store.get(run_id)["pipeline_mode"] == "lite"
+        assert runner.get_payload(run_id).payload["pipeline_mode"] == "lite"
+    finally:
+        runner.shutdown()
+
+
+def test_lazy_pipeline_imports_on_first_call():
+    pipeline = LazyPipeline("app.pipelines.fallback_pipeline:tokenize")
+    assert pipeline._func is None
+    assert pipeline("Battery drains") == ["battery", "drains"]
+    assert pipeline._func is not None
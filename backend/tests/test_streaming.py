@@ -0,0 +1,191 @@
+"""Tests for the streaming pipeline stages."""
+import time
+from datetime import datetime, timezone
+
+from app.core.config import get_settings
+from app.pipelines import fallback_pipeline
+from app.pipelines.streaming import BATCH_SIZE, SentimentBatcher, iter_batches
+from app.schemas.research import ResearchRequest
+from app.services.collectors import build_collector
+from app.services.research_runner import ResearchRunner
+
+
+def _raw_items(count):
+    topics = ["battery drains fast", "checkout page crashes", "shipping is slow", "support never answers"]
+    return [
+        {
+            "id": str(idx),
+            "platform": "reddit",
+            "timestamp": "2024-03-01T00:00:00",
+            "text": f"{topics[idx % len(topics)]} on order {idx // 3}",
+            "score": idx % 7,
+            "url": f"https://example.com/{idx}",
+        }
+        for idx in range(count)
+    ]
+
+
+def test_iter_batches_pulls_lazily():
+    pulled = []
+
+    def source():
+        for idx in range(BATCH_SIZE * 3):
+            pulled.append(idx)
+            yield idx
+
+    batches = iter_batches(source())
+    first = next(batches)
+
+    assert len(first) == BATCH_SIZE
+    assert len(pulled) == BATCH_SIZE
+
+
+def test_lite_pipeline_streamed_matches_materialized():
+    raw_items = _raw_items(700)
+    request = ResearchRequest(topic="battery checkout")
+
+    listed, _ = fallback_pipeline.run_pipeline("run", request, raw_items)
+    streamed, _ = fallback_pipeline.run_pipeline("run", request, iter(raw_items))
+
+    assert streamed["items"] == listed["items"]
+    assert streamed["clusters"] == listed["clusters"]
+
+
+def test_lite_pipeline_reports_partial_results_before_input_ends():
+    produced = []
+    snapshots = []
+
+    def source():
+        for item in _raw_items(BATCH_SIZE * 3):
+            produced.append(item)
+            yield item
+
+    # Default depth samples the whole stream before analysing it; deep runs analyse it as it arrives.
+    fallback_pipeline.run_pipeline(
+        "run",
+        ResearchRequest(topic="battery", depth="deep"),
+        source(),
+        partial=lambda snapshot: snapshots.append((len(produced), snapshot)),
+    )
+
+    produced_at_first, first = snapshots[0]
+    assert produced_at_first == BATCH_SIZE
+    assert first["items_received"] == BATCH_SIZE
+    assert first["items_kept"] <= BATCH_SIZE
+    assert first["clusters"][0]["count"] >= first["clusters"][-1]["count"]
+    assert snapshots[-1][1]["items_received"] == BATCH_SIZE * 3
+
+
+def test_sampled_runs_report_items_read_while_sampling():
+    produced = []
+    snapshots = []
+
+    def source():
+        for item in _raw_items(BATCH_SIZE * 3):
+            produced.append(item)
+            yield item
+
+    fallback_pipeline.run_pipeline(
+        "run",
+        ResearchRequest(topic="battery"),
+        source(),
+        partial=lambda snapshot: snapshots.append((len(produced), snapshot)),
+    )
+
+    assert snapshots[0] == (BATCH_SIZE, {"items_received": BATCH_SIZE, "items_kept": None, "clusters": []})
+    received = [snapshot["items_received"] for _, snapshot in snapshots]
+    assert received == sorted(received)
+    assert received[-1] == BATCH_SIZE * 3
+    assert snapshots[-1][1]["clusters"]
+
+
+def test_full_pipeline_accepts_a_stream(require_full_pipeline):
+    from app.pipelines import full_pipeline
+
+    raw_items = _raw_items(300)
+    request = ResearchRequest(topic="battery checkout", depth="deep")
+    snapshots = []
+
+    listed, _ = full_pipeline.run_pipeline("run", request, raw_items)
+    streamed, _ = full_pipeline.run_pipeline("run", request, iter(raw_items), partial=snapshots.append)
+
+    assert [item["id"] for item in streamed["items"]] == [item["id"] for item in listed["items"]]
+    assert [item["relevance"] for item in streamed["items"]] == [item["relevance"] for item in listed["items"]]
+    assert streamed["clusters"] == listed["clusters"]
+    assert snapshots[-1]["items_received"] == 300
+
+
+def test_sentiment_batcher_scores_in_large_batches():
+    batcher = SentimentBatcher(flush_size=5)
+    items = [{"text": "I love this"} for _ in range(7)]
+
+    batcher.add(items[:3])
+    assert all("sentiment" not in item for item in items)
+    batcher.add(items[3:6])
+    assert all("sentiment" in item for item in items[:6])
+    batcher.add(items[6:])
+    timings = batcher.timings()
+
+    assert all(item["sentiment"]["compound"] > 0 for item in items)
+    assert timings["items"] == 7
+    assert timings["batches"] == 2
+
+
+def _posts(count):
+    start = datetime(2024, 3, 10, tzinfo=timezone.utc).timestamp()
+    return [
+        {
+            "id": f"p{idx}",
+            "title": f"battery issue {idx}",
+            "selftext": f"the battery drains in {idx} hours",
+            "created_utc": start - idx * 60,
+        }
+        for idx in range(count)
+    ]
+
+
+def test_collection_stream_applies_backpressure(fake_sources):
+    fake_sources.reddit_posts = _posts(1000)
+    collector = build_collector(get_settings())
+    try:
+        stream = collector.stream(
+            ResearchRequest(topic="battery", sources=["reddit"], sample_limit=1000),
+            buffer_pages=1,
+        )
+        items = iter(stream)
+        next(items)
+        time.sleep(0.3)
+        # One page taken off the buffer, one buffered and one waiting for room; nothing more is fetched.
+        assert len(fake_sources.requests) <= 3
+        assert len(list(items)) == 999
+        assert stream.outcome() is None
+    finally:
+        collector.close()
+
+
+def test_runner_exposes_partial_results_while_collecting(fake_sources, monkeypatch):
+    monkeypatch.setenv("RUN_STORE", "memory")
+    fake_sources.reddit_posts = _posts(600)
+    fake_sources.delay["reddit"] = 0.15
+    runner = ResearchRunner()
+    runner.start()
+    try:
+        run_id = runner.start_run(ResearchRequest(topic="battery", sources=["reddit"], depth="deep", sample_limit=600))
+        partial = None
+        for _ in range(300):
+            partial = runner.get_partial(run_id)
+            if partial is not None:
+                break
+            time.sleep(0.01)
+
+        assert partial is not None
+        assert 0 < partial.items_received < 600
+        for _ in range(600):
+            if runner.get_status(run_id).status in ("completed", "failed"):
+                break
+            time.sleep(0.01)
+        assert runner.get_status(run_id).status == "completed"
+        assert runner.get_partial(run_id) is None
+        assert len(runner.get_payload(run_id).payload["items"]) == 600
+    finally:
+        runner.shutdown()
@@ -0,0 +1,55 @@
+"""Property tests for the single-pass text normalizer."""
+import random
+import re
+
+from app.pipelines.fallback_pipeline import clean_text, clean_texts
+
+
+def reference_clean_text(text):
+    normalized = text or ""
+    normalized = normalized.lower()
+    normalized = re.sub(r"https?://\S+", " ", normalized)
+    normalized = re.sub(r"[^a-z0-9\s]", " ", normalized)
+    normalized = re.sub(r"\s+", " ", normalized).strip()
+    return normalized
+
+
+FRAGMENTS = [
+    "a", "Z", "q", "7", " ", "  ", "\t", "\n", "\r\n", "\xa0", " ", "\x1c", "\x1e", "\x85",
+    "!", "?", "#", "@", "-", "_", "'", ".", "/", ":", "://",
+    "http", "HTTP", "https://", "HTTPS://example.com/a?b=1", "http://x", "xhttp://y", "http:/",
+    "İ", "K", "ß", "Σ", "é", "\U0001f600", "​", "ﬁ",
+]
+
+
+ASCII_FRAGMENTS = [fragment for fragment in FRAGMENTS if fragment.isascii()]
+
+
+def random_text(rng, fragments=FRAGMENTS):
+    return "".join(rng.choice(fragments) for _ in range(rng.randint(0, 25)))
+
+
+class TestCleanTextProperties:
+    def test_clean_text_matches_reference(self):
+        rng = random.Random(1234)
+        for _ in range(5000):
+            text = random_text(rng)
+            assert clean_text(text) == reference_clean_text(text), repr(text)
+
+    def test_clean_texts_matches_clean_text(self):
+        rng = random.Random(4321)
+        for _ in range(300):
+            batch = [random_text(rng) for _ in range(rng.randint(1, 20))]
+            assert clean_texts(batch) == [reference_clean_text(text) for text in batch], repr(batch)
+
+    def test_ascii_batches_match_reference(self):
+        rng = random.Random(99)
+        for _ in range(300):
+            batch = [random_text(rng, ASCII_FRAGMENTS) for _ in range(rng.randint(1, 20))]
+            assert clean_texts(batch) == [reference_clean_text(text) for text in batch], repr(batch)
+
+    def test_clean_texts_handles_missing_text(self):
+        assert clean_texts([None, "Hello!", ""]) == ["", "hello", ""]
+
+    def test_clean_texts_empty_batch(self):
+        assert clean_texts([]) == []